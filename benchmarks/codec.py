@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+
+"""
+Measures how fast each installed codec decodes pages of resources.
+
+Run from the project directory:
+
+    python benchmarks/codec.py [iterations]
+
+Every list example from the tests is decoded from bytes,
+as the Client decodes response bodies.
+"""
+
+from glob import glob
+from os import path
+import sys
+import timeit
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..'))
+
+from pybitbucket.codec import (  # noqa
+    OrJSONCodec, StandardCodec, UltraJSONCodec)
+
+
+def list_fixtures():
+    pattern = path.join(
+        path.dirname(path.abspath(__file__)), '..', 'tests', '*_list.json')
+    bodies = []
+    for filename in sorted(glob(pattern)):
+        with open(filename, 'rb') as f:
+            body = f.read()
+        # Some examples are empty placeholders.
+        if body.strip():
+            bodies.append(body)
+    return bodies
+
+
+def installed_codecs():
+    codecs = [StandardCodec()]
+    for codec in (UltraJSONCodec, OrJSONCodec):
+        try:
+            codecs.append(codec())
+        except ImportError:
+            print('{0} is not installed'.format(codec.name))
+    return codecs
+
+
+def main(iterations):
+    bodies = list_fixtures()
+    size = sum(len(body) for body in bodies)
+    for codec in installed_codecs():
+
+        def decode():
+            for body in bodies:
+                codec.loads(body)
+
+        seconds = timeit.timeit(decode, number=iterations)
+        print('{0:<8} {1:>8.1f} MB/s'.format(
+            codec.name, size * iterations / seconds / 1e6))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
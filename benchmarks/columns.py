@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+
+"""
+Measures how fast pull requests become columns for analytics.
+
+Run from the project directory:
+
+    python benchmarks/columns.py [count]
+
+The values are made from the pull request example in the tests
+and parsed ahead, so only the conversion is measured.
+Two ways are compared:
+- resources, then their attributes one at a time, as metrics jobs did;
+- Columns, which read the values without making resources.
+"""
+
+from json import loads
+from os import path
+import sys
+import timeit
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..'))
+
+from pybitbucket.bitbucket import Client  # noqa
+from pybitbucket.columns import Columns, DATE, epoch_seconds, INT  # noqa
+import pybitbucket.pullrequest  # noqa
+
+EXAMPLE = path.join(
+    path.dirname(path.abspath(__file__)), '..', 'tests', 'PullRequest.json')
+FIELDS = [
+    ('id', 'id', INT),
+    ('state', 'state'),
+    ('author', 'author.username'),
+    ('created', 'created_on', DATE),
+    ('updated', 'updated_on', DATE),
+]
+
+
+def page(count):
+    with open(EXAMPLE) as f:
+        text = f.read()
+    return [loads(text) for _ in range(count)]
+
+
+def from_resources(values):
+    client = Client()
+    pullrequests = [client.convert_to_object(v) for v in values]
+    return {
+        'id': [p.id for p in pullrequests],
+        'state': [p.state for p in pullrequests],
+        'author': [p.author.username for p in pullrequests],
+        'created': [epoch_seconds(p.created_on) for p in pullrequests],
+        'updated': [epoch_seconds(p.updated_on) for p in pullrequests],
+    }
+
+
+def from_columns(values):
+    columns = Columns(FIELDS)
+    columns.extend(values)
+    return columns
+
+
+def main(count):
+    values = page(count)
+    for name, function in (
+            ('resources', from_resources),
+            ('columns', from_columns)):
+        seconds = min(timeit.repeat(
+            lambda: function(values), number=1, repeat=5))
+        print('{0:<10} {1:>10.0f} pull requests/s'.format(
+            name, count / seconds))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+
+"""
+Measures the throughput and memory of exporting pages of commits.
+
+Run from the project directory, with Python 3:
+
+    python benchmarks/export.py [pagelen]
+
+The pages are generated in memory, as in streaming.py,
+and written to a temporary file as NDJSON and as gzipped CSV.
+The rows per second are measured without tracing the memory,
+and the peak memory should be the same whatever the number of pages.
+"""
+
+from os import path
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..'))
+
+from pybitbucket.export import Exporter  # noqa
+from streaming import URL, client_for, peak  # noqa
+
+COLUMNS = ['hash', 'date', 'author.user.username', 'parents.0.hash']
+
+
+def main(pagelen):
+    directory = tempfile.mkdtemp()
+    try:
+        for name, columns in (
+                ('commits.ndjson', None),
+                ('commits.ndjson', COLUMNS),
+                ('commits.csv.gz', COLUMNS)):
+            filename = path.join(directory, name)
+            # Fill the bounded caches first, as in streaming.py.
+            Exporter(filename, columns=columns).export(
+                client_for(5, pagelen).remote_relationship(URL, stream=True))
+            for pages in (5, 20, 80):
+                def export():
+                    return Exporter(filename, columns=columns).export(
+                        client_for(pages, pagelen).remote_relationship(
+                            URL, stream=True))
+
+                # Tracing memory slows everything down: time another run.
+                stats = export()
+                highest = peak(export)
+                print(
+                    '{0:<15} {1:<8} {2:>3} pages {3:>8.0f} rows/s '
+                    '{4:>6.0f} KiB'.format(
+                        name,
+                        'columns' if columns else 'whole',
+                        pages,
+                        stats.rows_per_second,
+                        highest / 1024.0))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+
+"""
+Measures the pull requests of a page with and without an identity map.
+
+Run from the project directory, with Python 3:
+
+    python benchmarks/identity.py [count]
+
+The page is made from the pull request example in the tests,
+with its author taken among five users, as on a busy repository.
+Two things are reported for each client:
+- the pull requests converted per second;
+- the memory kept by each pull request when they are all retained.
+"""
+
+from json import loads
+from os import path
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..'))
+
+from pybitbucket.bitbucket import Client, IdentityMap  # noqa
+from pybitbucket.pullrequest import PullRequest  # noqa
+
+EXAMPLE = path.join(
+    path.dirname(path.abspath(__file__)), '..', 'tests', 'PullRequest.json')
+USERS = 5
+
+
+def page(count):
+    with open(EXAMPLE) as f:
+        text = f.read()
+    values = []
+    for n in range(count):
+        data = loads(text)
+        data['id'] = n
+        data['author']['username'] = 'user{0}'.format(n % USERS)
+        values.append(data)
+    return values
+
+
+def convert(client, values):
+    return [client.convert_to_object(v) for v in values]
+
+
+def kept(client, values):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    pullrequests = convert(client, values)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del pullrequests
+    return (after - before) / len(values)
+
+
+def main(count):
+    # The pages are parsed ahead, so only the conversion is measured.
+    values = page(count)
+    convert(Client(), values[:1])
+    for name, client_of in (
+            ('new objects', lambda: Client()),
+            ('identity map', lambda: Client(identity_map=IdentityMap()))):
+        seconds = min(timeit.repeat(
+            lambda: convert(client_of(), values), number=1, repeat=5))
+        print('{0:<13} {1:>8.0f} pull requests/s {2:>8.0f} bytes each'.format(
+            name, count / seconds, kept(client_of(), values)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
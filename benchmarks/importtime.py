@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+
+"""
+Measures how long importing the library takes, as a cold start pays it.
+
+Run from the project directory, with Python 3.7 or later:
+
+    python benchmarks/importtime.py [module]
+
+The module, pybitbucket.bitbucket by default, is imported in a fresh
+interpreter with -X importtime. The total and the slowest imports are
+reported, in microseconds.
+"""
+
+from os import path
+import subprocess
+import sys
+
+
+def import_times(module):
+    project_dir = path.join(path.dirname(path.abspath(__file__)), '..')
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        cwd=project_dir,
+        stderr=subprocess.PIPE)
+    _, report = process.communicate()
+    times = []
+    for line in report.decode('utf-8').splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        times.append((int(self_us), int(cumulative_us), name.strip()))
+    return times
+
+
+def main(module):
+    times = import_times(module)
+    total = [t for t in times if t[2].strip() == module]
+    print('{0}: {1} us'.format(module, total[0][1] if total else '?'))
+    print('Slowest imports by self time:')
+    for self_us, cumulative_us, name in sorted(times, reverse=True)[:10]:
+        print('{0:>8} us {1}'.format(self_us, name))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'pybitbucket.bitbucket')
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+
+"""
+Compares building payloads with chained add methods and in a batch.
+
+Run from the project directory:
+
+    python benchmarks/payload.py
+
+Two cases are measured:
+- many small pull request payloads, as a bulk job creates them;
+- one branch restriction with more and more users added one at a time,
+    where each chained call copies the users added so far.
+A batch costs a few microseconds to open and close,
+so it pays off for payloads with many items, not for small ones.
+"""
+
+from os import path
+import sys
+import timeit
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..'))
+
+from pybitbucket.branchrestriction import BranchRestrictionPayload  # noqa
+from pybitbucket.pullrequest import PullRequestPayload  # noqa
+
+USERNAMES = ['reviewer{0}'.format(n) for n in range(5)]
+
+
+def chained_pullrequest():
+    payload = PullRequestPayload() \
+        .add_title('Release') \
+        .add_description('The weekly release') \
+        .add_source_branch_name('release') \
+        .add_source_repository_full_name('team/repo') \
+        .add_destination_branch_name('master') \
+        .add_close_source_branch(True)
+    for username in USERNAMES:
+        payload = payload.add_reviewer_by_username(username)
+    return payload
+
+
+def batched_pullrequest():
+    with PullRequestPayload().batch() as batch:
+        batch.add_title('Release') \
+            .add_description('The weekly release') \
+            .add_source_branch_name('release') \
+            .add_source_repository_full_name('team/repo') \
+            .add_destination_branch_name('master') \
+            .add_close_source_branch(True)
+        for username in USERNAMES:
+            batch.add_reviewer_by_username(username)
+    return batch.payload
+
+
+def chained_restriction(usernames):
+    payload = BranchRestrictionPayload()
+    for username in usernames:
+        payload = payload.add_user_by_username(username)
+    return payload
+
+
+def batched_restriction(usernames):
+    with BranchRestrictionPayload().batch() as batch:
+        for username in usernames:
+            batch.add_user_by_username(username)
+    return batch.payload
+
+
+def rate(function, number):
+    seconds = min(timeit.repeat(function, number=number, repeat=3))
+    return number / seconds
+
+
+def main():
+    assert chained_pullrequest().build() == batched_pullrequest().build()
+    print('Pull request payloads per second:')
+    print('  chained {0:>10.0f}'.format(rate(chained_pullrequest, 2000)))
+    print('  batch   {0:>10.0f}'.format(rate(batched_pullrequest, 2000)))
+    print('Milliseconds to add users one at a time to a restriction:')
+    for count in (100, 1000, 5000):
+        usernames = ['user{0}'.format(n) for n in range(count)]
+        for name, function in (
+                ('chained', chained_restriction),
+                ('batch', batched_restriction)):
+            seconds = min(timeit.repeat(
+                lambda: function(usernames), number=1, repeat=3))
+            print('  {0:>5} users {1:<8} {2:>8.1f}'.format(
+                count, name, seconds * 1000))
+
+
+if __name__ == '__main__':
+    main()
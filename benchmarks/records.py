@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+
+"""
+Measures the memory kept by resources and by records.
+
+Run from the project directory, with Python 3:
+
+    python benchmarks/records.py [copies]
+
+Each list fixture of the tests is converted both ways,
+with its values repeated so that small lists are measured reliably.
+The JSON is parsed inside the measure,
+so what the objects keep of it is counted, and what they drop is not.
+"""
+
+from json import dumps, loads
+from os import path
+import sys
+import tracemalloc
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..'))
+
+from pybitbucket.bitbucket import Client  # noqa
+
+FIXTURES = path.join(path.dirname(path.abspath(__file__)), '..', 'tests')
+NAMES = (
+    'BranchRestriction',
+    'Branch',
+    'Comment',
+    'Commit',
+    'Hook',
+    'PullRequest',
+    'Repository',
+    'Snippet',
+    'Tag',
+    'User',
+)
+
+
+def values_text(name, copies):
+    with open(path.join(FIXTURES, name + '_list.json')) as f:
+        values = loads(f.read())['values']
+    return dumps(values * copies)
+
+
+def kept(text, convert):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [convert(value) for value in loads(text)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(objects)
+
+
+def main(copies):
+    client = Client()
+    print('{0:<18} {1:>10} {2:>10}'.format('bytes each', 'resource', 'record'))
+    for name in NAMES:
+        text = values_text(name, copies)
+        resources = kept(text, client.convert_to_object)
+        records = kept(text, client.convert_to_record)
+        print('{0:<18} {1:>10.0f} {2:>10.0f} {3:>6.0%}'.format(
+            name, resources, records, records / resources))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
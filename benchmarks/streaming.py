@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+
+"""
+Measures the memory used to iterate over many pages of commits.
+
+Run from the project directory, with Python 3:
+
+    python benchmarks/streaming.py [pagelen]
+
+The pages are generated in memory from the commit example in the tests,
+so only the client is measured. Two things are reported:
+- the peak memory while consuming 5, 20 and 80 pages
+    and discarding each commit, as an export does:
+    with stream, it is the same whatever the number of pages;
+- the memory kept by each commit when they are all retained:
+    about the same with stream, which bounds the peak memory per page
+    but does not shrink the commits that are kept.
+"""
+
+from json import dumps, loads
+from os import path
+import sys
+import tracemalloc
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..'))
+
+from pybitbucket.bitbucket import Client  # noqa
+from pybitbucket.commit import Commit  # noqa
+
+URL = 'https://api.bitbucket.org/2.0/repositories/team/repo/commits'
+
+
+class PagesAdapter(BaseAdapter):
+    """Answers each page request with a page of copies of one commit."""
+
+    def __init__(self, commit, pages, pagelen):
+        super(PagesAdapter, self).__init__()
+        self.body = dumps({
+            'pagelen': pagelen,
+            'values': [commit] * pagelen}).encode('utf-8')
+        self.pages = pages
+
+    def send(self, request, **kwargs):
+        page = int(request.url.partition('page=')[2] or 1)
+        data = loads(self.body.decode('utf-8'))
+        if page < self.pages:
+            data['next'] = '{0}?page={1}'.format(URL, page + 1)
+        response = Response()
+        response.status_code = 200
+        response.url = request.url
+        response._content = dumps(data).encode('utf-8')
+        return response
+
+    def close(self):
+        pass
+
+
+def example_commit():
+    filename = path.join(
+        path.dirname(path.abspath(__file__)), '..', 'tests', 'Commit.json')
+    with open(filename) as f:
+        return loads(f.read())
+
+
+def client_for(pages, pagelen):
+    client = Client()
+    client.session.mount(URL, PagesAdapter(example_commit(), pages, pagelen))
+    return client
+
+
+def peak(function):
+    tracemalloc.start()
+    function()
+    current, highest = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return highest
+
+
+def main(pagelen):
+    # Fill the bounded caches of urllib and uritemplate first,
+    # so that they are not counted as growth.
+    for commit in client_for(80, pagelen).remote_relationship(URL):
+        pass
+    print('Peak memory while discarding each commit:')
+    for pages in (5, 20, 80):
+        for stream in (False, True):
+            client = client_for(pages, pagelen)
+
+            def consume():
+                for commit in client.remote_relationship(URL, stream=stream):
+                    pass
+
+            print('{0:>5} pages, stream={1!s:<5} {2:>10.0f} KiB'.format(
+                pages, stream, peak(consume) / 1024.0))
+
+    print('Memory kept by each retained commit'
+          ' (stream bounds the peak per page, not the retained commits):')
+    count = 10 * pagelen
+    for stream in (False, True):
+        client = client_for(10, pagelen)
+        tracemalloc.start()
+        commits = list(client.remote_relationship(URL, stream=stream))
+        current, highest = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert count == len(commits)
+        print('stream={0!s:<5} {1:>10.0f} bytes/commit'.format(
+            stream, current / float(count)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+
+"""
+Measures how many payloads are validated per second.
+
+Run from the project directory:
+
+    python benchmarks/validation.py
+
+Build statuses are published for many revisions:
+every payload has the same key, state and name, and its own URL.
+Three ways are compared:
+- the Schema of the payload, run in full as before;
+- validate, which only checks the values it has not seen yet,
+    and again, as when a payload is validated to create and then modify;
+- validate on a trusting builder, which only checks the fields.
+"""
+
+from os import path
+import sys
+import timeit
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..'))
+
+from pybitbucket.build import BuildStatusPayload, BuildStatusStates  # noqa
+from pybitbucket.pullrequest import PullRequestPayload  # noqa
+from pybitbucket.validation import validator_for  # noqa
+
+# Fewer than the values remembered, so that they are all found again.
+COUNT = 1000
+
+
+def build_statuses():
+    payload = BuildStatusPayload() \
+        .add_key('ci') \
+        .add_state(BuildStatusStates.SUCCESSFUL) \
+        .add_name('Continuous integration')
+    return [
+        payload.add_url('https://ci.example.com/builds/{0}'.format(n))
+        for n in range(COUNT)]
+
+
+def pullrequests():
+    payload = PullRequestPayload() \
+        .add_source_repository_full_name('team/repo') \
+        .add_destination_branch_name('master') \
+        .add_close_source_branch(True) \
+        .add_reviewer_by_username('release-manager')
+    return [
+        payload
+        .add_title('Release {0}'.format(n))
+        .add_source_branch_name('release/{0}'.format(n))
+        for n in range(COUNT)]
+
+
+def rate(function, payloads, repeat=3):
+    seconds = min(timeit.repeat(
+        lambda: [function(p) for p in payloads], number=1, repeat=repeat))
+    return len(payloads) / seconds
+
+
+def main():
+    for name, payloads in (
+            ('build statuses', build_statuses()),
+            ('pull requests', pullrequests())):
+        trusting = [p.trusting() for p in payloads]
+        print('{0} validated per second:'.format(name.capitalize()))
+        print('  schema   {0:>10.0f}'.format(
+            rate(lambda p: p.schema(p._payload), payloads)))
+        validator_for(payloads[0].schema).memo.clear()
+        print('  validate {0:>10.0f}'.format(
+            rate(lambda p: p.validate(), payloads, repeat=1)))
+        print('  again    {0:>10.0f}'.format(
+            rate(lambda p: p.validate(), payloads)))
+        print('  trusted  {0:>10.0f}'.format(
+            rate(lambda p: p.validate(), trusting)))
+
+
+if __name__ == '__main__':
+    main()
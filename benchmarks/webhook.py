@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+
+"""
+Measures how many webhook events per second one core can receive.
+
+Run from the project directory:
+
+    python benchmarks/webhook.py [iterations]
+
+Three paths are timed on the repo:push example from the tests:
+- parse: decoding the header and the JSON body
+- parse + resources: also converting the actor and repository
+- WSGI: the whole WebhookReceiver application
+- dispatch: WSGI in front of a WebhookDispatcher with a no-op handler
+"""
+
+from io import BytesIO
+from os import path
+import sys
+import timeit
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..'))
+
+from pybitbucket.bitbucket import Client  # noqa
+from pybitbucket.webhook import (  # noqa
+    WebhookDispatcher, WebhookReceiver, parse_event)
+
+
+def push_body():
+    filename = path.join(
+        path.dirname(path.abspath(__file__)), '..', 'tests', 'repoPush.json')
+    with open(filename, 'rb') as f:
+        return f.read()
+
+
+def report(name, iterations, seconds):
+    print('{0:<20} {1:>10.0f} events/s'.format(name, iterations / seconds))
+
+
+def main(iterations):
+    client = Client()
+    body = push_body()
+
+    def parse():
+        parse_event('repo:push', body, client=client)
+
+    def parse_with_resources():
+        event = parse_event('repo:push', body, client=client)
+        event.actor
+        event.repository
+
+    def post(receiver):
+        environ = {
+            'REQUEST_METHOD': 'POST',
+            'CONTENT_LENGTH': str(len(body)),
+            'HTTP_X_EVENT_KEY': 'repo:push',
+            'wsgi.input': BytesIO(body),
+        }
+        receiver(environ, lambda status, headers: None)
+
+    receiver = WebhookReceiver(lambda event: None, client=client)
+    dispatcher = WebhookDispatcher(workers=4, queue_size=1000)
+    dispatcher.register(lambda event: None)
+    dispatcher.start()
+    dispatching = WebhookReceiver(dispatcher, client=client)
+
+    def dispatch():
+        post(dispatching)
+        dispatcher.join()
+
+    for name, function in (
+            ('parse', parse),
+            ('parse + resources', parse_with_resources),
+            ('WSGI', lambda: post(receiver)),
+            ('dispatch', dispatch)):
+        report(name, iterations, timeit.timeit(function, number=iterations))
+    dispatcher.stop()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Follows the pull request activity of many repositories.
+
+Bitbucket lists the activity of a repository newest first.
+Each repository has a cursor: the date of the newest activity seen,
+and which activities had that date.
+A poll reads the pages of each repository until it reaches the cursor,
+so it costs one request per repository when nothing happened.
+The cursors can be kept in a JSON file between polls.
+
+Example, for a notifier that polls every minute:
+
+    follower = ActivityFollower(
+        client=client,
+        store=FileCursorStore('activity-cursors.json'))
+    while True:
+        for event in follower.poll(full_names):
+            print(event.repository, event.kind, event.pullrequest_id)
+        time.sleep(60)
+
+Classes:
+- ActivityFollower: streams the activity that is new since the last poll
+- ActivityEvent: one approval, comment or update of a pull request
+- CursorStore: keeps the cursor of each repository in memory
+- FileCursorStore: keeps the cursors in a JSON file
+"""
+
+from collections import namedtuple
+import io
+import json
+import os
+from threading import Lock
+
+from six import text_type
+
+from pybitbucket.bitbucket import Client
+from pybitbucket.fanout import FanOut
+from pybitbucket.query import parse_datetime
+from pybitbucket.repository import full_name_of, split_full_name
+
+
+APPROVAL = 'approval'
+COMMENT = 'comment'
+UPDATE = 'update'
+
+ActivityEvent = namedtuple(
+    'ActivityEvent',
+    ['repository', 'kind', 'pullrequest_id', 'date', 'activity'])
+
+
+def kind_of(activity):
+    for kind in (APPROVAL, COMMENT, UPDATE):
+        if kind in activity:
+            return kind
+    return None
+
+
+def event_of(repository, activity):
+    """The ActivityEvent of one item of the activity of a repository."""
+    kind = kind_of(activity)
+    body = activity.get(kind) or {}
+    date = body.get('created_on') if kind == COMMENT else body.get('date')
+    return ActivityEvent(
+        repository,
+        kind,
+        (activity.get('pull_request') or {}).get('id'),
+        date,
+        activity)
+
+
+def identity_of(event):
+    """A string that tells apart the events of the same date."""
+    body = event.activity.get(event.kind) or {}
+    if event.kind == COMMENT:
+        detail = body.get('id')
+    elif event.kind == APPROVAL:
+        detail = (body.get('user') or {}).get('username')
+    else:
+        detail = (body.get('author') or {}).get('username')
+    return '{0}/{1}/{2}/{3}'.format(
+        event.kind, event.pullrequest_id, detail, event.date)
+
+
+class CursorStore(object):
+    """
+    Remembers how far the activity of each repository was read,
+    in memory, for as long as the follower lives.
+
+    A cursor is the date of the newest activity seen, with the identities
+    of the activities at that date, since several can share it.
+    The follower sets the cursor of a repository once its events are
+    generated, and saves the store at the end of each poll:
+    FileCursorStore writes them to a file, other stores override
+    get_cursor, set_cursor and save.
+    """
+
+    def __init__(self):
+        self.cursors = {}
+
+    def get_cursor(self, repository_full_name):
+        """The date of the newest activity seen and its identities, or None."""
+        return self.cursors.get(repository_full_name)
+
+    def set_cursor(self, repository_full_name, cursor):
+        self.cursors[repository_full_name] = cursor
+
+    def save(self):
+        pass
+
+
+class FileCursorStore(CursorStore):
+    """
+    Keeps the cursors in a JSON file, read when the store is made
+    and written by save.
+    The file is replaced at once, so a crash never leaves half of it.
+
+    :param path: the name of the file.
+    :type path: str
+    """
+
+    def __init__(self, path):
+        super(FileCursorStore, self).__init__()
+        self.path = path
+        self.lock = Lock()
+        if os.path.exists(path):
+            with io.open(path, encoding='utf-8') as f:
+                self.cursors = json.load(f)
+
+    def set_cursor(self, repository_full_name, cursor):
+        with self.lock:
+            self.cursors[repository_full_name] = cursor
+
+    def save(self):
+        with self.lock:
+            text = text_type(
+                json.dumps(self.cursors, indent=2, sort_keys=True))
+        temporary = self.path + '.tmp'
+        with io.open(temporary, 'w', encoding='utf-8') as f:
+            f.write(text)
+        # os.rename does not replace an existing file on Windows.
+        getattr(os, 'replace', os.rename)(temporary, self.path)
+
+
+class ActivityFollower(object):
+    """
+    Streams the pull request activity of repositories
+    that is new since the previous poll.
+
+    :param client: the configured connection to Bitbucket.
+    :type client: bitbucket.Client
+    :param store: keeps the cursors between polls.
+        If not provided, they are kept in memory.
+    :type store: CursorStore
+    :param kinds: the kinds of events to generate,
+        among approval, comment and update.
+    :type kinds: list
+    :param backfill: when true, a repository without a cursor
+        generates all of its activity.
+        Otherwise its first poll only sets the cursor.
+    :type backfill: bool
+    :param workers: the number of repositories read at a time.
+    :type workers: int
+    """
+
+    def __init__(
+            self,
+            client=None,
+            store=None,
+            kinds=(APPROVAL, COMMENT, UPDATE),
+            backfill=False,
+            workers=8):
+        self.client = client or Client.default()
+        self.store = CursorStore() if store is None else store
+        self.kinds = frozenset(kinds)
+        self.backfill = backfill
+        self.workers = workers
+        self.errors = []
+
+    def activity(self, full_name):
+        """The activity of a repository, newest first, page by page."""
+        owner, repository_name = split_full_name(full_name)
+        return self.client.get_bitbucket() \
+            .repositoryPullRequestActivitiesForWholeRepository(
+                owner=owner,
+                repository_name=repository_name)
+
+    def read(self, repository):
+        """
+        The new events of a repository, oldest first, and its next cursor.
+        Paging stops at the first event older than the cursor.
+        """
+        full_name = full_name_of(repository)
+        cursor = self.store.get_cursor(full_name)
+        since = None if cursor is None else parse_datetime(cursor['date'])
+        seen = frozenset([] if cursor is None else cursor['seen'])
+        events = []
+        for activity in self.activity(full_name):
+            event = event_of(full_name, activity)
+            if event.kind is None or event.date is None:
+                continue
+            if cursor is None and not self.backfill:
+                # Only the newest event is needed to start following.
+                return [], self.next_cursor(None, [event])
+            if since is not None:
+                date = parse_datetime(event.date)
+                if date < since:
+                    break
+                if date == since and identity_of(event) in seen:
+                    continue
+            events.append(event)
+        events.reverse()
+        return events, self.next_cursor(cursor, events)
+
+    @staticmethod
+    def next_cursor(cursor, events):
+        """The cursor after the events, which are oldest first."""
+        if not events:
+            return cursor
+        dates = [parse_datetime(e.date) for e in events]
+        newest = max(dates)
+        newest_events = [e for (e, d) in zip(events, dates) if d == newest]
+        identities = set(identity_of(e) for e in newest_events)
+        if cursor is not None and parse_datetime(cursor['date']) == newest:
+            identities.update(cursor['seen'])
+        return {'date': newest_events[0].date, 'seen': sorted(identities)}
+
+    def poll(self, repositories):
+        """
+        Generate the new ActivityEvents of each repository, oldest first,
+        as each repository is read.
+        The cursor of a repository moves once its events are generated,
+        and the store is saved at the end of the poll,
+        so an event is generated again if the poll is interrupted.
+        An error on a repository is added to errors
+        and does not stop the others.
+
+        :param repositories: full names or Repository objects.
+        :type repositories: iterable
+        """
+        fanout = FanOut(self.read, workers=self.workers)
+        for result in fanout.results(repositories):
+            events, cursor = result.value
+            for event in events:
+                if event.kind in self.kinds:
+                    yield event
+            if cursor is not None:
+                self.store.set_cursor(
+                    full_name_of(result.repository), cursor)
+        self.errors = fanout.errors
+        self.store.save()
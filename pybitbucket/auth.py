@@ -9,7 +9,6 @@ Classes for abstracting over different forms of Bitbucket authentication.
 from requests.utils import default_user_agent
 from requests import Session
 from requests.auth import HTTPBasicAuth
-from requests_oauthlib import OAuth1Session, OAuth2Session
 from uritemplate import expand
 
 from pybitbucket import metadata
@@ -119,6 +118,8 @@ class OAuth1Authenticator(Authenticator):
         return self.username
 
     def start_http_session(self, session=None):
+        # oauthlib is only imported by the clients that need it.
+        from requests_oauthlib import OAuth1Session
         session = session or OAuth1Session(
             self.client_key,
             client_secret=self.client_secret,
@@ -175,6 +176,7 @@ class OAuth2Authenticator(Authenticator):
         )
 
     def start_http_session(self, session=None):
+        from requests_oauthlib import OAuth2Session
         session = session or OAuth2Session(self.client_id)
         if not isinstance(session, OAuth2Session):
             raise TypeError('session argument shall be of OAuth2Session type instead of {}'.format(type(session)))
@@ -8,24 +8,36 @@ Core classes for communicating with the Bitbucket API.
 Classes:
 - Enumeration: abstraction for a set of enumerated values
 - Client: abstraction over HTTP requests to Bitbucket API
+- IdentityMap: shares one object among the embedded resources with an id
 - BitbucketSpecialAction: an enum of special actions to be handled by children
 - RepositoryType: an enum of repository types (Git, Hg)
 - BitbucketBase: parent class for Bitbucket resources
 - PayloadBuilder: parent class for payloads
+- PayloadBatch: applies many changes to a payload without copying it
 - Bitbucket: root resource for the whole Bitbucket instance
 - BadRequestError: exception wrapping bad HTTP requests
 - ServerError: exception wrapping server errors
+- LegacyModule: this module, before Python 3.7
 """
 
+from collections import OrderedDict
+from copy import copy
 from enum import Enum as EnumBase
-from json import loads, dumps, JSONEncoder as JSONEncoderBase
+from importlib import import_module
+from json import loads
 from functools import partial
-from requests import codes, models as requests_models
+import sys
+from threading import Lock
+from types import ModuleType
+import weakref
+from requests import codes
 from requests.exceptions import HTTPError
+from six import integer_types, string_types
+from six.moves.urllib.parse import urlencode, urlsplit
 from uritemplate import expand
-from voluptuous import Schema
 
 from pybitbucket.auth import Anonymous
+from pybitbucket.codec import JSONEncoder, default_codec  # noqa: F401
 from pybitbucket.entrypoints import entrypoints_json
 
 
@@ -35,19 +47,184 @@ class Enum(EnumBase):
         return self is o or self.__class__(o).value == self.value
 
 
-class JSONEncoder(JSONEncoderBase):
-    def default(self, obj):
-        if isinstance(obj, Enum):
-            return obj.value
-        return super(JSONEncoder, self).default(obj)
-
+class IdentityMap(object):
+    """
+    Resolves the embedded resources of the same type and id
+    to one shared object, as long as their data is the same.
+
+    A page of pull requests embeds the same few users and repositories
+    many times: each one is built once and then found again.
+    The objects are held by weak references,
+    so the map never keeps alive a resource that nothing else uses,
+    and it forgets the oldest ones beyond max_size.
+    Since other resources may hold them, the objects it shares
+    keep their raw data when a streaming finder releases the rest.
+
+    :param max_size: the number of resources to remember.
+    :type max_size: int
+    """
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        # Every object handed out, even those forgotten since.
+        self.shared = weakref.WeakSet()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def resolve(self, resource_type, data, build):
+        """
+        The shared resource for data, or the one built by build.
 
-# monkey patch request's json handler
-requests_models.complexjson.dumps = partial(dumps, cls=JSONEncoder)
+        :param resource_type: the class that categorized the data.
+        :param build: a function that returns a new resource for data.
+        :type build: function
+        """
+        identifier = data.get(resource_type.id_attribute)
+        if not isinstance(identifier, string_types + integer_types):
+            return build()
+        key = (resource_type, identifier)
+        with self.lock:
+            reference = self.entries.get(key)
+        resource = None if reference is None else reference()
+        # A partial or newer view of the resource is not the same object.
+        if resource is not None and resource.data == data:
+            with self.lock:
+                self.hits += 1
+            return resource
+        resource = build()
+        with self.lock:
+            self.misses += 1
+            self.entries.pop(key, None)
+            self.entries[key] = weakref.ref(resource)
+            self.shared.add(resource)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return resource
+
+    def holds(self, resource):
+        """Whether resource may be shared by other resources."""
+        with self.lock:
+            return resource in self.shared
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
 
 
 class Client(object):
     bitbucket_types = set()
+    # The client of the resources and finders not given one,
+    # made on first use and shared so that they share its connections.
+    default_client = None
+    default_client_lock = Lock()
+    # The modules that register resource types, by the resource path
+    # in the self link of their resources.
+    # A module is imported the first time a resource with its path
+    # is categorized, so that scripts only load the types they use.
+    resource_modules = {
+        'branch-restrictions': 'pybitbucket.branchrestriction',
+        'branches': 'pybitbucket.ref',
+        'build': 'pybitbucket.build',
+        'comments': 'pybitbucket.comment',
+        'commit': 'pybitbucket.commit',
+        'hooks': 'pybitbucket.hook',
+        'pullrequests': 'pybitbucket.pullrequest',
+        'repositories': 'pybitbucket.repository',
+        'snippets': 'pybitbucket.snippet',
+        'tags': 'pybitbucket.ref',
+        'teams': 'pybitbucket.team',
+        'users': 'pybitbucket.user',
+    }
+    # The modules of the resources listed at a path
+    # that is not the resource path in their self links.
+    collection_modules = {
+        'commits': 'pybitbucket.commit',
+        'default-reviewers': 'pybitbucket.user',
+        'followers': 'pybitbucket.user',
+        'following': 'pybitbucket.user',
+        'members': 'pybitbucket.user',
+        'refs': 'pybitbucket.ref',
+        'statuses': 'pybitbucket.build',
+        'user': 'pybitbucket.user',
+        'watchers': 'pybitbucket.user',
+    }
+    # The modules for 1.0 resources, which have no self link.
+    legacy_resource_modules = [
+        'pybitbucket.consumer',
+        'pybitbucket.repository',
+        'pybitbucket.user',
+    ]
+
+    @staticmethod
+    def default():
+        """
+        The anonymous client shared by everything not given a client,
+        made the first time it is needed.
+        """
+        if Client.default_client is None:
+            with Client.default_client_lock:
+                if Client.default_client is None:
+                    Client.default_client = Client()
+        return Client.default_client
+
+    @staticmethod
+    def register_resource_module(resource_path, module_name):
+        """
+        Import module_name to categorize resources
+        whose self link includes resource_path.
+        """
+        Client.resource_modules[resource_path] = module_name
+
+    @staticmethod
+    def resource_modules_for(data):
+        href = ((data.get('links') or {}).get('self') or {}).get('href')
+        if not isinstance(href, string_types):
+            return Client.legacy_resource_modules
+        return [
+            Client.resource_modules[part]
+            for part
+            in urlsplit(href).path.split('/')
+            if part in Client.resource_modules]
+
+    @staticmethod
+    def resource_modules_at(url):
+        """
+        The modules with the types of the resources at a URL,
+        or an empty list if none is known for its path.
+        """
+        names = []
+        for part in urlsplit(url).path.split('/'):
+            name = (
+                Client.resource_modules.get(part) or
+                Client.collection_modules.get(part))
+            if name and name not in names:
+                names.append(name)
+        return names
+
+    @staticmethod
+    def load_resource_modules(data=None):
+        """
+        Import the modules with the types that may categorize data,
+        or all of them.
+        """
+        if data is None:
+            names = (
+                list(Client.resource_modules.values()) +
+                Client.legacy_resource_modules)
+        else:
+            names = Client.resource_modules_for(data)
+        Client.import_modules(names)
+
+    @staticmethod
+    def import_modules(names):
+        for name in names:
+            if name not in sys.modules:
+                import_module(name)
 
     @staticmethod
     def expect_ok(response, code=codes.ok):
@@ -60,31 +237,183 @@ class Client(object):
         else:
             response.raise_for_status()
 
+    @staticmethod
+    def type_of(data):
+        """The resource type that categorizes data, or None."""
+        if isinstance(data, dict):
+            Client.load_resource_modules(data)
+        for t in list(Client.bitbucket_types):
+            if t.is_type(data):
+                return t
+        return None
+
     def convert_to_object(self, data):
         if isinstance(data, Enum):
             return data.value()
-        for t in Client.bitbucket_types:
-            if t.is_type(data):
-                return t(data, client=self)
-        return data
+        t = Client.type_of(data)
+        if t is None:
+            return data
+        return t(data, client=self)
+
+    def convert_to_record(self, data):
+        """
+        Convert data to the Record of its type,
+        or to a resource if its type has no record fields.
+        """
+        from pybitbucket.record import record_class
+        t = Client.type_of(data)
+        if t is None:
+            return data
+        if t.record_fields is None:
+            return t(data, client=self)
+        return record_class(t)(data, client=self)
+
+    def convert_embedded(self, data):
+        """
+        Convert a resource embedded in another one,
+        shared through the identity map if the client has one.
+        """
+        if self.identity_map is None or not isinstance(data, dict):
+            return self.convert_to_object(data)
+        t = Client.type_of(data)
+        if t is None:
+            return data
+        return self.identity_map.resolve(
+            t, data, lambda: t(data, client=self))
 
-    def remote_relationship(self, template, **keywords):
+    @staticmethod
+    def add_query_parameters(url, **parameters):
+        """
+        Append the parameters that have a value to the query string of url.
+        """
+        query = [
+            (name, value)
+            for (name, value)
+            in sorted(parameters.items())
+            if value is not None]
+        if not query:
+            return url
+        separator = '&' if '?' in url else '?'
+        return url + separator + urlencode(query)
+
+    @staticmethod
+    def fields_expression(fields, url=None):
+        """
+        Build the value of the fields query parameter for partial responses.
+
+        A string is passed through untouched, for callers who want
+        the full Bitbucket syntax (like `-values.owner`).
+        A list of dotted attribute paths is expanded so that it works for
+        both single resources and pages of resources,
+        and so that the links and identifiers needed to categorize
+        the resource are always part of the response.
+
+        :param url: the URL the fields are asked of.
+            Only the modules with the types of its resources are imported,
+            for their identifiers. Without it, or when its path is unknown,
+            the identifiers of every type are asked for.
+        :type url: str
+        """
+        if fields is None or isinstance(fields, string_types):
+            return fields
+        names = Client.resource_modules_at(url) if url else []
+        if names:
+            Client.import_modules(names)
+        else:
+            Client.load_resource_modules()
+        required = ['links.self.href'] + [
+            t.id_attribute
+            for t in list(Client.bitbucket_types)
+            if not names or t.__module__ in names]
+        expression = set(['next'])
+        for path in set(fields).union(required):
+            expression.add(path)
+            expression.add('values.' + path)
+        return ','.join(sorted(expression))
+
+    @staticmethod
+    def release_data(resource):
+        """
+        Drop the raw data kept by a resource and its embedded resources.
+        The attributes and relationships of the resource remain,
+        since they are all that is left of the data,
+        so a released resource is hardly smaller than the original.
+        An embedded resource shared through the identity map of the client
+        is left as it is, with its data, since others may hold it too.
+        """
+        identity_map = getattr(
+            getattr(resource, 'client', None), 'identity_map', None)
+        if identity_map is not None and identity_map.holds(resource):
+            return resource
+        if isinstance(resource, BitbucketBase):
+            resource.data = None
+            for value in list(resource.__dict__.values()):
+                for item in (value if isinstance(value, list) else [value]):
+                    Client.release_data(item)
+        return resource
+
+    def pages(self, template, fields=None, q=None, sort=None, **keywords):
+        """
+        Generate the list of raw values on each page at a URL,
+        following the pages.
+        """
         url = expand(template, keywords)
+        url = Client.add_query_parameters(
+            url,
+            fields=Client.fields_expression(fields, url),
+            q=q,
+            sort=sort,
+            pagelen=self.pagelen)
         while url:
             response = self.session.get(url)
             self.expect_ok(response)
-            json_data = response.json()
+            json_data = self.decode(response)
             if isinstance(json_data, list):
-                for item in json_data:
-                    yield self.convert_to_object(item)
-                url = None
-            elif json_data.get('values'):
-                for item in json_data['values']:
-                    yield self.convert_to_object(item)
-                url = json_data.get('next')
+                values, url = json_data, None
+            # A filtered page can be empty: it is still a page.
+            elif 'values' in json_data:
+                values, url = json_data['values'], json_data.get('next')
             else:
-                yield self.convert_to_object(json_data)
-                url = None
+                values, url = [json_data], None
+            del response, json_data
+            yield values
+
+    def remote_relationship(
+            self,
+            template,
+            fields=None,
+            q=None,
+            sort=None,
+            stream=False,
+            records=False,
+            **keywords):
+        """
+        Generate the resources at a URL, following the pages.
+
+        With stream, the peak memory is bounded by one page
+        however many pages there are:
+        each page is freed as soon as its last value is converted,
+        and the resources do not retain their raw data.
+        At most one page of raw data and the resource being consumed
+        are alive at a time.
+        Streaming does not shrink the resources that are kept:
+        they still have every attribute unpacked from the data.
+        Use records for a smaller copy of each.
+
+        With records, each resource is a compact read-only Record
+        with only the fields of its type, for listings and analytics.
+        """
+        convert = self.convert_to_record if records else self.convert_to_object
+        for values in self.pages(
+                template, fields=fields, q=q, sort=sort, **keywords):
+            if not stream:
+                for item in values:
+                    yield convert(item)
+                continue
+            # Pop from the end, so each value is freed once converted.
+            values.reverse()
+            while values:
+                yield self.release_data(convert(values.pop()))
 
     def get_bitbucket_url(self):
         return self.config.server_base_uri
@@ -92,9 +421,58 @@ class Client(object):
     def get_username(self):
         return self.config.get_username()
 
-    def __init__(self, config=None):
+    def get_bitbucket(self):
+        """
+        The root resource for this client.
+        It is built on first use and then shared by every finder,
+        so the entrypoint relationships are only bound once per client.
+        """
+        if self._bitbucket is None:
+            self._bitbucket = Bitbucket(client=self)
+        return self._bitbucket
+
+    def decode(self, response):
+        """The JSON body of a response, decoded by the codec."""
+        return self.codec.loads(response.content)
+
+    def json_arguments(self, json, **kwargs):
+        """
+        The arguments for a session request that sends json as the body,
+        encoded by the codec.
+        """
+        if json is None:
+            return kwargs
+        if kwargs.get('files'):
+            # A multipart request has no JSON body.
+            return kwargs
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.setdefault('Content-Type', 'application/json')
+        kwargs.update(data=self.codec.dumps(json), headers=headers)
+        return kwargs
+
+    def __init__(
+            self,
+            config=None,
+            codec=None,
+            pagelen=None,
+            identity_map=None):
+        """
+        :param config: the authenticator. If not provided, Anonymous.
+        :param codec: the JSON codec. If not provided, the fastest one.
+        :param pagelen: the number of resources to ask for on each page.
+            If not provided, Bitbucket chooses.
+        :type pagelen: int
+        :param identity_map: shares the embedded resources,
+            like the authors and repositories of pull requests.
+            If not provided, each one is a new object.
+        :type identity_map: IdentityMap
+        """
         self.config = config or Anonymous()
         self.session = self.config.session
+        self.codec = codec or default_codec()
+        self.pagelen = pagelen
+        self.identity_map = identity_map
+        self._bitbucket = None
 
 
 class BitbucketSpecialAction(Enum):
@@ -111,6 +489,8 @@ class RepositoryType(Enum):
 
 class BitbucketBase(object):
     id_attribute = 'id'
+    # The fields kept by a Record of the type, or None for no Record.
+    record_fields = None
 
     @staticmethod
     def expect_bool(name, value):
@@ -168,8 +548,9 @@ class BitbucketBase(object):
         return cls._has_v2_self_url(data, cls.resource_type, cls.id_attribute)
 
     def add_remote_relationship_methods(self, data):
+        special_actions = [a.value for a in BitbucketSpecialAction]
         for name, url in BitbucketBase.links_from(data):
-            if (name not in BitbucketSpecialAction):
+            if (name not in special_actions):
                 setattr(self, name, partial(
                     self.client.remote_relationship,
                     template=url))
@@ -182,21 +563,21 @@ class BitbucketBase(object):
                 # a full User resource.
                 if (body.get('raw') and body.get('user')):
                     setattr(self, 'raw_author', body['raw'])
-                    setattr(self, 'author', self.client.convert_to_object(
+                    setattr(self, 'author', self.client.convert_embedded(
                         body['user']))
                 # For PullRequests, author is just a User resource.
                 else:
-                    setattr(self, name, self.client.convert_to_object(body))
+                    setattr(self, name, self.client.convert_embedded(body))
             # If an attribute has a dictionary for a body,
             # then descend to check for embedded resources.
             elif isinstance(body, dict):
-                setattr(self, name, self.client.convert_to_object(body))
+                setattr(self, name, self.client.convert_embedded(body))
             # If an attribute has a list for a body,
             # then descend into the array to check for embedded resources.
             elif isinstance(body, list):
                 if (body and isinstance(body[0], dict)):
                     setattr(self, name, [
-                        self.client.convert_to_object(i)
+                        self.client.convert_embedded(i)
                         for i in body])
                 else:
                     setattr(self, name, body)
@@ -237,7 +618,8 @@ class BitbucketBase(object):
         templates = [v for k, v in cls.links_from(links) if k == name]
         return templates[0]
 
-    def __init__(self, data, client=Client()):
+    def __init__(self, data, client=None):
+        client = client or Client.default()
         self.data = data
         self.client = client
         self.__dict__.update(data)
@@ -253,43 +635,72 @@ class BitbucketBase(object):
 
     def put(self, json=None, **kwargs):
         url = self.links['self']['href']
-        response = self.client.session.put(url, json=json, **kwargs)
+        response = self.client.session.put(
+            url,
+            **self.client.json_arguments(json, **kwargs))
         Client.expect_ok(response)
-        return self.client.convert_to_object(response.json())
+        return self.client.convert_to_object(self.client.decode(response))
 
     @staticmethod
-    def post(url, json=None, data=None, client=Client(), **kwargs):
+    def post(url, json=None, data=None, client=None, **kwargs):
+        client = client or Client.default()
         if data:
             response = client.session.post(url, data=data, **kwargs)
         else:
-            response = client.session.post(url, json=json, **kwargs)
+            response = client.session.post(
+                url,
+                **client.json_arguments(json, **kwargs))
         Client.expect_ok(response)
-        return client.convert_to_object(response.json())
+        return client.convert_to_object(client.decode(response))
 
     def post_approval(self, template):
-        response = self.client.session.post(template)
+        return BitbucketBase.approve_url(template, client=self.client)
+
+    def delete_approval(self, template):
+        return BitbucketBase.unapprove_url(template, client=self.client)
+
+    # The approve and unapprove methods of a resource are bound to these
+    # instead of its own methods, so that the resource is not a cycle
+    # and is freed as soon as it is no longer used.
+    @staticmethod
+    def approve_url(url, client=None):
+        client = client or Client.default()
+        response = client.session.post(url)
         Client.expect_ok(response)
-        json_data = response.json()
+        json_data = client.decode(response)
         return json_data.get('approved')
 
-    def delete_approval(self, template):
-        response = self.client.session.delete(template)
+    @staticmethod
+    def unapprove_url(url, client=None):
+        client = client or Client.default()
+        response = client.session.delete(url)
         # Deletes the approval and returns 204 (No Content).
         Client.expect_ok(response, 204)
         return True
 
     def attributes(self):
+        if self.data is None:
+            # The raw data was released: use what was unpacked from it.
+            return [
+                name
+                for (name, value)
+                in self.__dict__.items()
+                if name not in ('data', 'client') and not callable(value)]
         return list(self.data.keys())
 
     def relationships(self):
+        data = self.__dict__ if self.data is None else self.data
         return (
-            list(self.data.get('_links', {}).keys()) +
-            list(self.data.get('links', {}).keys()))
+            list((data.get('_links') or {}).keys()) +
+            list((data.get('links') or {}).keys()))
 
     def __repr__(self):
         return u'{name}({data})'.format(
             name=type(self).__name__,
-            data=repr(self.data))
+            data=repr(self.data if self.data is not None else {
+                name: getattr(self, name)
+                for name
+                in self.attributes()}))
 
     def __str__(self):
         return u'{name} {id}:{data}'.format(
@@ -298,11 +709,103 @@ class BitbucketBase(object):
             data=getattr(self, self.id_attribute))
 
 
+class BatchPayload(dict):
+    """
+    The payload of the builders in a batch.
+    No builder outside of the batch shares it,
+    so it is changed in place instead of being copied.
+    """
+    def copy(self):
+        return self
+
+
+def copy_payload(value):
+    """A copy of a payload that shares no dict or list with it."""
+    if isinstance(value, dict):
+        return {k: copy_payload(v) for (k, v) in value.items()}
+    if isinstance(value, list):
+        return [copy_payload(v) for v in value]
+    return value
+
+
+class PayloadBatch(object):
+    """
+    Applies the add methods of a builder to one payload, in place.
+    Each method returns the batch, so calls can be chained or not.
+    The payload is frozen into a regular builder at the end:
+
+        with PullRequestPayload().batch() as batch:
+            batch.add_title('Release').add_source_branch_name('release')
+            for username in usernames:
+                batch.add_reviewer_by_username(username)
+        payload = batch.payload
+    """
+
+    def __init__(self, builder):
+        self.builder = builder.with_payload(
+            BatchPayload(copy_payload(builder._payload)))
+        self.payload = None
+
+    def __getattr__(self, name):
+        attribute = getattr(self.builder, name)
+        if not callable(attribute):
+            return attribute
+
+        def apply(*args, **kwargs):
+            result = getattr(self.builder, name)(*args, **kwargs)
+            if not isinstance(result, PayloadBuilder):
+                return result
+            self.builder = result
+            return self
+        # Found once per name: the next calls skip __getattr__.
+        setattr(self, name, apply)
+        return apply
+
+    def freeze(self):
+        """The builder with all the changes, which is immutable again."""
+        # Only the batch held the parts of its payload,
+        # and the add methods copy a part before they change it.
+        self.payload = self.builder.with_payload(dict(self.builder._payload))
+        self.builder = self.payload
+        return self.payload
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.freeze()
+
+
 class PayloadBuilder(object):
-    schema = Schema({})
+    # Each payload defines a voluptuous Schema.
+    schema = None
+    _trusted = False
 
     def __init__(self, payload=None):
-        self._payload = payload or {}
+        self._payload = payload if payload is not None else {}
+
+    def with_payload(self, payload):
+        """A builder like this one, with another payload."""
+        builder = self.__class__.__new__(self.__class__)
+        builder.__dict__.update(self.__dict__)
+        builder._payload = payload
+        return builder
+
+    def batch(self):
+        """
+        A batch of changes to this payload.
+        Each add method otherwise copies the payload into a new builder.
+        """
+        return PayloadBatch(self)
+
+    def copy_of(self, part):
+        """
+        A copy of a part of the payload, to be changed by an add method.
+        In a batch, the part itself.
+        """
+        if isinstance(self._payload, BatchPayload):
+            return part
+        return copy(part)
 
     def build(self):
         payload = {}
@@ -313,13 +816,41 @@ class PayloadBuilder(object):
                 payload[k] = v
         return payload
 
-    def validate(self):
-        self.schema(self._payload)
+    def trusting(self):
+        """
+        A builder like this one whose values are not validated again,
+        only its fields, for payloads made with the add methods.
+        """
+        builder = self.with_payload(self._payload)
+        builder._trusted = True
+        return builder
+
+    def validate(self, trusted=False):
+        """
+        Raise MultipleInvalid if the payload does not match the schema.
+        The values already found valid for a field are not checked again.
+
+        :param trusted: when true, only check the fields, not their values.
+        :type trusted: bool
+        """
+        from pybitbucket.validation import empty_schema, validator_for
+        validator_for(self.schema or empty_schema).validate(
+            self._payload,
+            trusted=trusted or self._trusted)
         return self
 
+    def validated(self):
+        """
+        The payload to send, once validated.
+        Every create, modify and update sends this,
+        so they all share the memo of valid values and the trusted path.
+        """
+        return self.validate().build()
+
 
 class Bitbucket(BitbucketBase):
-    def __init__(self, client=Client()):
+    def __init__(self, client=None):
+        client = client or Client.default()
         self.data = loads(entrypoints_json)
         self.client = client
         self.add_remote_relationship_methods(self.data)
@@ -369,15 +900,63 @@ class ServerError(BitbucketError):
     def __init__(self, response):
         super(ServerError, self).__init__(response)
 
-from pybitbucket.repository import Repository
-from pybitbucket.branchrestriction import BranchRestriction
-from pybitbucket.build import BuildStatus
-from pybitbucket.comment import Comment
-from pybitbucket.commit import Commit
-from pybitbucket.consumer import Consumer
-from pybitbucket.hook import Hook
-from pybitbucket.pullrequest import PullRequest
-from pybitbucket.ref import Ref
-from pybitbucket.snippet import Snippet
-from pybitbucket.team import Team
-from pybitbucket.user import User
+
+# The resource classes by the name of their module.
+# They used to be imported by this module, and still can be.
+resource_classes = {
+    'BranchRestriction': 'pybitbucket.branchrestriction',
+    'BuildStatus': 'pybitbucket.build',
+    'Comment': 'pybitbucket.comment',
+    'Commit': 'pybitbucket.commit',
+    'Consumer': 'pybitbucket.consumer',
+    'Hook': 'pybitbucket.hook',
+    'PullRequest': 'pybitbucket.pullrequest',
+    'Ref': 'pybitbucket.ref',
+    'Repository': 'pybitbucket.repository',
+    'Snippet': 'pybitbucket.snippet',
+    'Team': 'pybitbucket.team',
+    'User': 'pybitbucket.user',
+}
+
+
+def __getattr__(name):
+    # Called on Python 3.7 or later, or by LegacyModule,
+    # for names not defined here.
+    if name in resource_classes:
+        return getattr(import_module(resource_classes[name]), name)
+    raise AttributeError(
+        "module {0!r} has no attribute {1!r}".format(__name__, name))
+
+
+class LegacyModule(ModuleType):
+    """
+    Stands for this module in sys.modules before Python 3.7,
+    which does not call a module __getattr__.
+    Every attribute is read from and written to the module itself,
+    and the resource classes are imported when first read.
+    """
+
+    def __init__(self, module):
+        super(LegacyModule, self).__init__(module.__name__, module.__doc__)
+        self.__dict__['_module'] = module
+
+    def __getattr__(self, name):
+        module = self.__dict__['_module']
+        try:
+            return getattr(module, name)
+        except AttributeError:
+            return module.__getattr__(name)
+
+    def __setattr__(self, name, value):
+        setattr(self.__dict__['_module'], name, value)
+
+    def __delattr__(self, name):
+        delattr(self.__dict__['_module'], name)
+
+    def __dir__(self):
+        return sorted(set(dir(self.__dict__['_module'])).union(
+            resource_classes))
+
+
+if sys.version_info < (3, 7):
+    sys.modules[__name__] = LegacyModule(sys.modules[__name__])
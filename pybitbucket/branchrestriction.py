@@ -16,7 +16,7 @@ from uritemplate import expand
 from voluptuous import Schema, Required, Optional, In, Invalid
 
 from pybitbucket.bitbucket import (
-    Bitbucket, BitbucketBase, Client, PayloadBuilder, Enum)
+    BitbucketBase, Client, PayloadBuilder, Enum)
 
 
 class BranchRestrictionKind(Enum):
@@ -95,7 +95,7 @@ class BranchRestrictionPayload(PayloadBuilder):
 
     def add_group_by_username_and_groupname(self, username, groupname):
         new = self._payload.copy()
-        groups = self._payload.get('groups', [])
+        groups = self.copy_of(self._payload.get('groups', []))
         groups.append({
             'owner': {'username': username},
             'slug': groupname})
@@ -110,7 +110,7 @@ class BranchRestrictionPayload(PayloadBuilder):
 
     def add_user_by_username(self, username):
         new = self._payload.copy()
-        users = self._payload.get('users', [])
+        users = self.copy_of(self._payload.get('users', []))
         users.append({'username': username})
         new['users'] = users
         return BranchRestrictionPayload(
@@ -120,7 +120,7 @@ class BranchRestrictionPayload(PayloadBuilder):
 
     def add_users_from_usernames(self, usernames):
         new = self._payload.copy()
-        users = self._payload.get('users', [])
+        users = self.copy_of(self._payload.get('users', []))
         for username in usernames:
             if {'username': username} not in users:
                 users.append({'username': username})
@@ -134,6 +134,7 @@ class BranchRestrictionPayload(PayloadBuilder):
 class BranchRestriction(BitbucketBase):
     id_attribute = 'id'
     resource_type = 'branch-restrictions'
+    record_fields = ('id', 'kind', 'pattern', 'users', 'groups')
     templates = {
         'create': (
             '{+bitbucket_url}' +
@@ -170,12 +171,12 @@ class BranchRestriction(BitbucketBase):
         :rtype: BranchRestriction
         :raises: MultipleInvalid, Invalid
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or payload.owner
         repository_name = repository_name or payload.repository_name
         if not (owner and repository_name):
             raise Invalid('owner and repository_name are required')
-        json = payload.validate().build()
+        json = payload.validated()
         api_url = expand(
             cls.templates['create'], {
                 'bitbucket_url': client.get_bitbucket_url(),
@@ -189,44 +190,51 @@ class BranchRestriction(BitbucketBase):
         A convenience method for changing the current branch-restriction.
         The parameters make it easier to know what can be changed.
         """
-        json = payload.validate().build()
+        json = payload.validated()
         return self.put(json=json)
 
     @staticmethod
     def find_branchrestrictions_for_repository(
             repository_name,
             owner=None,
-            client=None):
+            client=None,
+            fields=None,
+            q=None,
+            sort=None):
         """
         A convenience method for finding branch-restrictions for a repository.
         The method is a generator BranchRestriction objects.
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or client.get_username()
-        return Bitbucket(client=client).repositoryBranchRestrictions(
+        return client.get_bitbucket().repositoryBranchRestrictions(
             owner=owner,
-            repository_name=repository_name)
+            repository_name=repository_name,
+            fields=fields,
+            q=q,
+            sort=sort)
 
     @staticmethod
     def find_branchrestriction_for_repository_by_id(
             repository_name,
             restriction_id,
             owner=None,
-            client=None):
+            client=None,
+            fields=None):
         """
         A convenience method for finding a specific branch-restriction.
         In contrast to the pure hypermedia driven method on the Bitbucket
         class, this method returns a BranchRestriction object, instead of the
         generator.
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or client.get_username()
         return next(
-            Bitbucket(
-                client=client).repositoryBranchRestrictionByRestrictionId(
-                    owner=owner,
-                    repository_name=repository_name,
-                    restriction_id=restriction_id))
+            client.get_bitbucket().repositoryBranchRestrictionByRestrictionId(
+                owner=owner,
+                repository_name=repository_name,
+                restriction_id=restriction_id,
+                fields=fields))
 
 
 Client.bitbucket_types.add(BranchRestriction)
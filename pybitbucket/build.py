@@ -16,7 +16,7 @@ from uritemplate import expand
 from voluptuous import Schema, Required, Optional, In, Url
 
 from pybitbucket.bitbucket import (
-    Bitbucket, BitbucketBase, Client, PayloadBuilder, Enum)
+    BitbucketBase, Client, PayloadBuilder, Enum)
 
 
 class BuildStatusStates(Enum):
@@ -134,6 +134,10 @@ class BuildStatus(BitbucketBase):
 
     id_attribute = 'key'
     resource_type = 'build'
+    record_fields = (
+        'key', 'state', 'name', 'url', 'description', 'refname', 'created_on',
+        'updated_on', 'type',
+    )
     templates = {
         'create': (
             '{+bitbucket_url}' +
@@ -174,7 +178,7 @@ class BuildStatus(BitbucketBase):
         :rtype: BuildStatus
         :raises: ValueError
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or payload.owner or client.get_username()
         repository_name = repository_name or payload.repository_name
         revision = revision or payload.revision
@@ -182,7 +186,7 @@ class BuildStatus(BitbucketBase):
             raise ValueError(
                 'owner, repository_name, and revision'
                 ' are required')
-        json = payload.validate().build()
+        json = payload.validated()
         api_url = expand(
             cls.templates['create'], {
                 'bitbucket_url': client.get_bitbucket_url(),
@@ -196,7 +200,7 @@ class BuildStatus(BitbucketBase):
         """
         A convenience method for changing the current build status.
         """
-        return self.put(json=payload.validate().build())
+        return self.put(json=payload.validated())
 
     @staticmethod
     def find_buildstatus_for_repository_commit_by_key(
@@ -204,39 +208,47 @@ class BuildStatus(BitbucketBase):
             revision,
             key,
             owner=None,
-            client=None):
+            client=None,
+            fields=None):
         """
         A convenience method for finding a specific build status.
         In contrast to the pure hypermedia driven method on the Bitbucket
         class, this method returns a BuildStatus object, instead of the
         generator.
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or client.get_username()
         return next(
-            Bitbucket(client=client).repositoryCommitBuildStatusByKey(
+            client.get_bitbucket().repositoryCommitBuildStatusByKey(
                 owner=owner,
                 repository_name=repository_name,
                 revision=revision,
-                key=key))
+                key=key,
+                fields=fields))
 
     @staticmethod
     def find_buildstatuses_for_repository_commit(
             repository_name,
             revision,
             owner=None,
-            client=None):
+            client=None,
+            fields=None,
+            q=None,
+            sort=None):
         """
         A convenience method for finding build statuses
         for a repository's commit.
         The method is a generator BuildStatus objects.
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or client.get_username()
-        return Bitbucket(client=client).repositoryCommitBuildStatuses(
+        return client.get_bitbucket().repositoryCommitBuildStatuses(
             owner=owner,
             repository_name=repository_name,
-            revision=revision)
+            revision=revision,
+            fields=fields,
+            q=q,
+            sort=sort)
 
 
 Client.bitbucket_types.add(BuildStatus)
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Approves, unapproves, declines or merges many pull requests at once.
+
+Each pull request gets a BulkResult, whether the action worked or not,
+so one failure does not hide the others.
+Pull requests given by id are acted on through their action URL,
+without getting them first, except for merges.
+Merges into the same destination branch run one after the other,
+each on the branch left by the one before,
+while merges into other branches run in parallel.
+
+Example, to merge the pull requests of a release:
+
+    bulk = BulkPullRequests(client=client, workers=8)
+    for result in bulk.merge(['teamsinspace/api#12', 'teamsinspace/web#7']):
+        print(result.target, result.ok, result.error, result.seconds)
+
+Classes:
+- BulkPullRequests: runs one action on many pull requests
+- BulkResult: the outcome of the action for one pull request
+"""
+
+from collections import namedtuple, OrderedDict
+from operator import itemgetter
+import time
+
+from six import integer_types, string_types
+from uritemplate import expand
+
+from pybitbucket.bitbucket import BitbucketBase, Client
+from pybitbucket.fanout import FanOut
+from pybitbucket.pullrequest import PullRequest
+
+
+APPROVE = 'approve'
+UNAPPROVE = 'unapprove'
+DECLINE = 'decline'
+MERGE = 'merge'
+
+first = itemgetter(0)
+
+
+class BulkResult(namedtuple(
+        'BulkResult',
+        ['target', 'action', 'value', 'error', 'seconds'])):
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class BulkPullRequests(object):
+    """
+    Runs an action on many pull requests with bounded concurrency.
+
+    A pull request is given as a PullRequest object,
+    as owner/name#id, or as an id in the repository of the executor.
+
+    :param repository_name: the repository of the pull requests
+        given by id alone.
+    :type repository_name: str
+    :param owner: the owner of that repository.
+        If not provided, assumes the current user.
+    :type owner: str
+    :param client: the configured connection to Bitbucket.
+    :type client: bitbucket.Client
+    :param workers: the number of actions in flight at a time.
+    :type workers: int
+    """
+    actions = (APPROVE, UNAPPROVE, DECLINE, MERGE)
+    template = (
+        '{+bitbucket_url}' +
+        '/2.0/repositories/{owner}/{repository_name}' +
+        '/pullrequests/{pullrequest_id}/{action}')
+    # The fields that tell where a pull request merges.
+    destination_fields = [
+        'id',
+        'destination.branch.name',
+        'destination.repository.full_name',
+    ]
+
+    def __init__(
+            self,
+            repository_name=None,
+            owner=None,
+            client=None,
+            workers=8):
+        self.client = client or Client.default()
+        self.repository_name = repository_name
+        self.owner = owner
+        self.workers = workers
+
+    def locate(self, target):
+        """The owner, repository name and id of a pull request."""
+        if isinstance(target, PullRequest):
+            full_name = target.destination['repository']['full_name']
+            owner, repository_name = full_name.split('/', 1)
+            return owner, repository_name, target.id
+        if isinstance(target, string_types) and '#' in target:
+            full_name, _, pullrequest_id = target.partition('#')
+            if '/' not in full_name or not pullrequest_id.isdigit():
+                raise ValueError(
+                    "Pull request must be in the form: username/name#id")
+            owner, repository_name = full_name.split('/', 1)
+            return owner, repository_name, int(pullrequest_id)
+        if isinstance(target, integer_types) or (
+                isinstance(target, string_types) and target.isdigit()):
+            if not self.repository_name:
+                raise ValueError(
+                    'repository_name is required for a pull request id')
+            return (
+                self.owner or self.client.get_username(),
+                self.repository_name,
+                int(target))
+        raise ValueError('Not a pull request: {}'.format(target))
+
+    def url(self, target, action):
+        owner, repository_name, pullrequest_id = self.locate(target)
+        return expand(self.template, {
+            'bitbucket_url': self.client.get_bitbucket_url(),
+            'owner': owner,
+            'repository_name': repository_name,
+            'pullrequest_id': pullrequest_id,
+            # Unapprove is a DELETE on the approve URL.
+            'action': APPROVE if action == UNAPPROVE else action,
+        })
+
+    def act(self, target, action):
+        url = self.url(target, action)
+        if action == APPROVE:
+            return BitbucketBase.approve_url(url, client=self.client)
+        if action == UNAPPROVE:
+            return BitbucketBase.unapprove_url(url, client=self.client)
+        return BitbucketBase.post(url, json=None, client=self.client)
+
+    def perform(self, target, action):
+        """The BulkResult of an action on one pull request."""
+        started = time.time()
+        try:
+            value = self.act(target, action)
+        except Exception as e:
+            return BulkResult(target, action, None, e, time.time() - started)
+        return BulkResult(target, action, value, None, time.time() - started)
+
+    def destination_of(self, target):
+        """The full name of the repository and the branch merged into."""
+        if not isinstance(target, PullRequest):
+            owner, repository_name, pullrequest_id = self.locate(target)
+            target = PullRequest.find_pullrequest_by_id_in_repository(
+                pullrequest_id,
+                repository_name,
+                owner=owner,
+                client=self.client,
+                fields=self.destination_fields)
+        destination = target.destination
+        return (
+            destination['repository']['full_name'],
+            destination['branch']['name'])
+
+    def merge_in_order(self, targets):
+        """Merge the pull requests one after the other."""
+        return [self.perform(target, MERGE) for target in targets]
+
+    def run(self, action, targets):
+        """
+        Generate a BulkResult for each pull request, as they complete.
+
+        :param action: one of approve, unapprove, decline or merge.
+        :type action: str
+        :param targets: PullRequest objects, owner/name#id, or ids.
+        :type targets: iterable
+        """
+        if action not in self.actions:
+            raise ValueError(
+                'action must be one of: ' + ', '.join(self.actions))
+        if action != MERGE:
+            fanout = FanOut(
+                lambda target: self.perform(target, action),
+                workers=self.workers)
+            for result in fanout.results(targets):
+                yield result.value
+            return
+        branches = OrderedDict()
+        located = FanOut(
+            lambda item: self.destination_of(item[1]),
+            workers=self.workers)
+        for result in located.results(enumerate(targets)):
+            branches.setdefault(result.value, []).append(result.repository)
+        for error in located.errors:
+            yield BulkResult(
+                error.repository[1], MERGE, None, error.error, 0.0)
+        # Each branch is one job, so its merges never run at the same time,
+        # and they run in the order they were given.
+        merges = FanOut(self.merge_in_order, workers=self.workers)
+        for result in merges.results(
+                [target for (_, target) in sorted(items, key=first)]
+                for items in branches.values()):
+            yield result.value
+
+    def approve(self, targets):
+        return self.run(APPROVE, targets)
+
+    def unapprove(self, targets):
+        return self.run(UNAPPROVE, targets)
+
+    def decline(self, targets):
+        return self.run(DECLINE, targets)
+
+    def merge(self, targets):
+        return self.run(MERGE, targets)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Encodes and decodes the JSON exchanged with Bitbucket.
+
+A Client uses the fastest codec installed, unless it is given one:
+
+    client = Client(codec=StandardCodec())
+
+Classes:
+- JSONEncoder: a standard library encoder that also encodes Enum values
+- StandardCodec: the json module of the standard library
+- UltraJSONCodec: decodes with ujson
+- OrJSONCodec: encodes and decodes with orjson
+
+Functions:
+- default_codec: the fastest codec installed
+"""
+
+from enum import Enum
+import json
+
+
+class JSONEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Enum):
+            return obj.value
+        return super(JSONEncoder, self).default(obj)
+
+
+class StandardCodec(object):
+    name = 'json'
+
+    def loads(self, content):
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        return json.loads(content)
+
+    def dumps(self, data):
+        return json.dumps(data, cls=JSONEncoder)
+
+
+class UltraJSONCodec(StandardCodec):
+    """
+    Decodes with ujson.
+    Payloads are small, so they are still encoded by the standard library,
+    which knows how to encode Enum values.
+    """
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self.ujson = ujson
+
+    def loads(self, content):
+        return self.ujson.loads(content)
+
+
+class OrJSONCodec(StandardCodec):
+    """Encodes and decodes with orjson, which encodes Enum values too."""
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self.orjson = orjson
+
+    def loads(self, content):
+        return self.orjson.loads(content)
+
+    def dumps(self, data):
+        return self.orjson.dumps(data).decode('utf-8')
+
+
+def find_default_codec():
+    for codec in (OrJSONCodec, UltraJSONCodec):
+        try:
+            return codec()
+        except ImportError:
+            pass
+    return StandardCodec()
+
+
+# Codecs hold no state, so the one found first is shared.
+installed = []
+
+
+def default_codec():
+    """The fastest codec installed: orjson, then ujson, then json."""
+    if not installed:
+        installed.append(find_default_codec())
+    return installed[0]
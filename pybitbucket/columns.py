@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Converts pages of resources straight into columns, for analytics.
+
+No resource object is made: each value of a page is read once,
+at the dotted paths of the fields, into one array per field.
+Dates are parsed into seconds since the epoch,
+so that cycle times and throughput are simple arithmetic,
+with the standard library or, when it is installed, with NumPy:
+
+    columns = remote_columns(
+        client,
+        '{+bitbucket_url}/2.0/repositories/{owner}/{repository_name}'
+        '/pullrequests?state=MERGED',
+        [('id', 'id', INT),
+         ('state', 'state'),
+         ('author', 'author.username'),
+         ('created', 'created_on', DATE),
+         ('updated', 'updated_on', DATE)],
+        bitbucket_url=client.get_bitbucket_url(),
+        owner='teamsinspace',
+        repository_name='api')
+    cycle_times = columns.difference('updated', 'created')
+    merged_per_week = columns.counts_per_period('updated', 7 * 24 * 3600)
+    arrays = columns.to_numpy()
+
+Classes:
+- Field: the name, dotted path and kind of a column
+- Columns: the columns of the values read so far
+
+Functions:
+- epoch_seconds: an ISO-8601 timestamp as seconds since the epoch
+- remote_columns: the columns of every page at a URL
+"""
+
+import array
+from calendar import timegm
+from collections import namedtuple, OrderedDict
+from math import isnan
+
+from pybitbucket.export import field_value
+from pybitbucket.query import parse_datetime
+
+
+OBJECT = 'object'
+STRING = 'string'
+INT = 'int'
+FLOAT = 'float'
+BOOL = 'bool'
+DATE = 'date'
+
+# The array type of each kind: there is no 'q' before Python 3.3.
+INTEGER_TYPECODE = str(
+    'q' if 'q' in getattr(array, 'typecodes', '') else 'l')
+typecodes = {
+    INT: INTEGER_TYPECODE,
+    DATE: INTEGER_TYPECODE,
+    FLOAT: str('d'),
+    BOOL: str('b'),
+}
+
+Field = namedtuple('Field', ['name', 'path', 'kind'])
+
+
+def epoch_seconds(text):
+    """An ISO-8601 timestamp, like created_on, as seconds since the epoch."""
+    return timegm(parse_datetime(text).utctimetuple())
+
+
+def field_of(spec):
+    """A Field from a Field, or from a tuple of its name, path and kind."""
+    if isinstance(spec, Field):
+        return spec
+    name, path = spec[0], spec[1]
+    kind = spec[2] if len(spec) > 2 else OBJECT
+    if kind not in (OBJECT, STRING) and kind not in typecodes:
+        raise ValueError('Unknown kind of column: {0}'.format(kind))
+    return Field(name, path, kind)
+
+
+class Columns(object):
+    """
+    One column per field, in the order of the fields.
+    The columns of numbers and dates are arrays of the standard library,
+    the others are lists.
+
+    :param fields: Fields, or tuples of a name, a dotted path like
+        source.branch.name, and optionally a kind:
+        int, float, bool, date, string or object.
+        A step into a list is its index, like reviewers.0.username.
+    :type fields: list
+    :param missing: the value of a number or date that is not there.
+        A missing float is NaN.
+    :type missing: int
+    """
+
+    def __init__(self, fields, missing=-1):
+        self.fields = [field_of(f) for f in fields]
+        self.missing = missing
+        self.paths = [tuple(f.path.split('.')) for f in self.fields]
+        self.columns = OrderedDict(
+            (f.name, array.array(typecodes[f.kind])
+                if f.kind in typecodes else [])
+            for f in self.fields)
+        self.converters = [self.converter(f.kind) for f in self.fields]
+        self.length = 0
+
+    def converter(self, kind):
+        missing = float('nan') if kind == FLOAT else self.missing
+        convert = {
+            DATE: epoch_seconds,
+            INT: int,
+            FLOAT: float,
+            BOOL: int,
+            STRING: lambda value: '{0}'.format(value),
+        }.get(kind)
+        if convert is None:
+            return lambda value: value
+        if kind == STRING:
+            return lambda value: None if value is None else convert(value)
+        return lambda value: missing if value is None else convert(value)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def names(self):
+        return list(self.columns)
+
+    def extend(self, values):
+        """Add the raw JSON values of a page to the columns."""
+        appenders = [c.append for c in self.columns.values()]
+        steps = list(zip(self.paths, self.converters, appenders))
+        for value in values:
+            for path, convert, append in steps:
+                append(convert(field_value(value, path)))
+            self.length += 1
+
+    def is_missing(self, name):
+        """A function that tells the missing values of a column of numbers."""
+        if self.columns[name].typecode == typecodes[FLOAT]:
+            return isnan
+        missing = self.missing
+        return lambda value: value == missing
+
+    def difference(self, end, start):
+        """
+        An array of the end minus the start of each value,
+        like the cycle time from created to merged,
+        or the missing value where either one is missing.
+        The difference is a float column if either one is.
+        """
+        typecode = self.columns[end].typecode
+        if typecodes[FLOAT] in (typecode, self.columns[start].typecode):
+            typecode = typecodes[FLOAT]
+        missing = (
+            float('nan') if typecode == typecodes[FLOAT] else self.missing)
+        end_missing = self.is_missing(end)
+        start_missing = self.is_missing(start)
+        return array.array(typecode, (
+            missing if end_missing(e) or start_missing(s) else e - s
+            for (e, s) in zip(self.columns[end], self.columns[start])))
+
+    def counts_per_period(self, name, seconds):
+        """
+        The number of values in each period of a date column,
+        like the pull requests merged each week,
+        keyed by the start of the period in seconds since the epoch.
+        """
+        counts = {}
+        for date in self.columns[name]:
+            if date != self.missing:
+                period = date - date % seconds
+                counts[period] = counts.get(period, 0) + 1
+        return OrderedDict(sorted(counts.items()))
+
+    def to_numpy(self):
+        """
+        The columns as NumPy arrays, which must be installed.
+        The arrays of numbers share the memory of the columns.
+        """
+        import numpy
+        return OrderedDict(
+            (name, numpy.frombuffer(column, dtype=column.typecode)
+                if isinstance(column, array.array)
+                else numpy.array(column, dtype=object))
+            for (name, column) in self.columns.items())
+
+
+def partial_fields(fields):
+    """The fields to ask Bitbucket for, without the steps into lists."""
+    return sorted(set(
+        '.'.join(step for step in f.path.split('.') if not step.isdigit())
+        for f in fields))
+
+
+def remote_columns(
+        client,
+        template,
+        fields,
+        q=None,
+        sort=None,
+        missing=-1,
+        **keywords):
+    """
+    The Columns of every value on every page at a URL.
+    Bitbucket is only asked for the fields of the columns,
+    and each page is freed once read.
+
+    :param client: the configured connection to Bitbucket.
+    :type client: bitbucket.Client
+    :param template: the URL, or a URI template expanded with keywords.
+    :type template: str
+    :param fields: the fields of the columns, as for Columns.
+    :type fields: list
+    """
+    columns = Columns(fields, missing=missing)
+    for values in client.pages(
+            template,
+            fields=partial_fields(columns.fields),
+            q=q,
+            sort=sort,
+            **keywords):
+        columns.extend(values)
+    return columns
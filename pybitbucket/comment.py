@@ -7,12 +7,16 @@ Provides classes for manipulating Comment resources.
 """
 from uritemplate import expand
 
-from pybitbucket.bitbucket import Bitbucket, BitbucketBase, Client
+from pybitbucket.bitbucket import BitbucketBase, Client
 
 
 class Comment(BitbucketBase):
     id_attribute = 'id'
     resource_type = 'comments'
+    record_fields = (
+        'id', 'content', 'user', 'parent', 'inline', 'created_on',
+        'updated_on', 'type',
+    )
 
     @staticmethod
     def is_type(data):
@@ -28,7 +32,8 @@ class Comment(BitbucketBase):
             content,
             snippet_id,
             username=None,
-            client=Client()):
+            client=None):
+        client = client or Client.default()
         if username is None:
             username = client.get_username()
         template = (
@@ -44,26 +49,29 @@ class Comment(BitbucketBase):
         payload = Comment.make_payload(content)
         response = client.session.post(api_url, data=payload)
         Client.expect_ok(response)
-        return Comment(response.json(), client=client)
+        return Comment(client.decode(response), client=client)
 
     @staticmethod
     def find_comment_for_snippet_by_id(
             snippet_id,
             comment_id,
             username=None,
-            client=Client()):
+            client=None,
+            fields=None):
         """
         A convenience method for finding a specific comment on a snippet.
         In contrast to the pure hypermedia driven method on the Bitbucket
         class, this method returns a Comment object, instead of the
         generator.
         """
+        client = client or Client.default()
         if username is None:
             username = client.get_username()
-        return next(Bitbucket(client=client).snippetCommentByCommentId(
+        return next(client.get_bitbucket().snippetCommentByCommentId(
             username=username,
             snippet_id=snippet_id,
-            comment_id=comment_id))
+            comment_id=comment_id,
+            fields=fields))
 
     @staticmethod
     def find_comment_for_repository_commit_by_id(
@@ -71,19 +79,22 @@ class Comment(BitbucketBase):
             repository_name,
             revision,
             comment_id,
-            client=Client()):
+            client=None,
+            fields=None):
         """
         A convenience method for finding a specific comment on a commit.
         In contrast to the pure hypermedia driven method on the Bitbucket
         class, this method returns a Comment object, instead of the
         generator.
         """
+        client = client or Client.default()
         return next(
-            Bitbucket(client=client).repositoryCommitCommentByCommentId(
+            client.get_bitbucket().repositoryCommitCommentByCommentId(
                 owner=owner,
                 repository_name=repository_name,
                 revision=revision,
-                comment_id=comment_id))
+                comment_id=comment_id,
+                fields=fields))
 
     @staticmethod
     def find_comment_for_repository_pullrequest_by_id(
@@ -91,19 +102,22 @@ class Comment(BitbucketBase):
             repository_name,
             pullrequest_id,
             comment_id,
-            client=Client()):
+            client=None,
+            fields=None):
         """
         A convenience method for finding a specific comment on a pull request.
         In contrast to the pure hypermedia driven method on the Bitbucket
         class, this method returns a Comment object, instead of the
         generator.
         """
+        client = client or Client.default()
         return next(
-            Bitbucket(client=client).repositoryPullRequestCommentsByCommentId(
+            client.get_bitbucket().repositoryPullRequestCommentsByCommentId(
                 owner=owner,
                 repository_name=repository_name,
                 pullrequest_id=pullrequest_id,
-                comment_id=comment_id))
+                comment_id=comment_id,
+                fields=fields))
 
 
 Client.bitbucket_types.add(Comment)
@@ -17,28 +17,34 @@ from pybitbucket.bitbucket import BitbucketBase, Client
 class Commit(BitbucketBase):
     id_attribute = 'hash'
     resource_type = 'commit'
+    record_fields = (
+        'hash', 'date', 'author', 'message', 'parents', 'repository', 'type',
+    )
 
     @staticmethod
     def is_type(data):
         return (Commit.has_v2_self_url(data))
 
     # Must override base constructor to account for approve and unapprove
-    def __init__(self, data, client=Client()):
+    def __init__(self, data, client=None):
+        client = client or Client.default()
         super(Commit, self).__init__(data, client=client)
         # approve and unapprove are just different verbs for same url
         if data.get('links', {}).get('approve', {}).get('href', {}):
             url = data['links']['approve']['href']
             setattr(self, 'approve', partial(
-                self.post_approval, template=url))
+                self.approve_url, url=url, client=client))
             setattr(self, 'unapprove', partial(
-                self.delete_approval, template=url))
+                self.unapprove_url, url=url, client=client))
 
     @staticmethod
     def find_commit_in_repository_by_revision(
             username,
             repository_name,
             revision,
-            client=Client()):
+            client=None,
+            fields=None):
+        client = client or Client.default()
         template = (
             '{+bitbucket_url}' +
             '/2.0/repositories/{username}/{repository_name}' +
@@ -51,17 +57,22 @@ class Commit(BitbucketBase):
                 'repository_name': repository_name,
                 'revision': revision
             })
+        url = Client.add_query_parameters(
+            url,
+            fields=Client.fields_expression(fields, url))
         response = client.session.get(url)
         if 404 == response.status_code:
             return
         Client.expect_ok(response)
-        return Commit(response.json(), client=client)
+        return Commit(client.decode(response), client=client)
 
     @staticmethod
     def find_commit_in_repository_full_name_by_revision(
             repository_full_name,
             revision,
-            client=Client()):
+            client=None,
+            fields=None):
+        client = client or Client.default()
         if '/' not in repository_full_name:
             raise NameError(
                 "Repository full name must be in the form: username/name")
@@ -70,7 +81,8 @@ class Commit(BitbucketBase):
             username,
             repository_name,
             revision,
-            client=client)
+            client=client,
+            fields=fields)
 
     @staticmethod
     def find_commits_in_repository(
@@ -79,7 +91,26 @@ class Commit(BitbucketBase):
             branch=None,
             include=None,
             exclude=None,
-            client=Client()):
+            client=None,
+            fields=None,
+            q=None,
+            sort=None,
+            stream=False,
+            records=False):
+        """
+        A generator of the commits in a repository.
+
+        :param stream: when true, each page is freed once consumed
+            and the commits do not retain their raw data,
+            so the peak memory is bounded by one page
+            however long the history is.
+            The commits that are kept are not smaller.
+        :type stream: bool
+        :param records: when true, generate compact read-only Records
+            with only the fields of a commit.
+        :type records: bool
+        """
+        client = client or Client.default()
         include = include or []
         exclude = exclude or []
         template = (
@@ -96,7 +127,13 @@ class Commit(BitbucketBase):
                 'include': include,
                 'exclude': exclude
             })
-        for commit in client.remote_relationship(url):
+        for commit in client.remote_relationship(
+                url,
+                fields=fields,
+                q=q,
+                sort=sort,
+                stream=stream,
+                records=records):
             yield commit
 
     @staticmethod
@@ -105,7 +142,13 @@ class Commit(BitbucketBase):
             branch=None,
             include=None,
             exclude=None,
-            client=Client()):
+            client=None,
+            fields=None,
+            q=None,
+            sort=None,
+            stream=False,
+            records=False):
+        client = client or Client.default()
         include = include or []
         exclude = exclude or []
         if '/' not in repository_full_name:
@@ -118,7 +161,12 @@ class Commit(BitbucketBase):
             branch=branch,
             include=include,
             exclude=exclude,
-            client=client)
+            client=client,
+            fields=fields,
+            q=q,
+            sort=sort,
+            stream=stream,
+            records=records)
 
 
 Client.bitbucket_types.add(Commit)
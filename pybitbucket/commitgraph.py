@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Walks the ancestry of commits by following their parents.
+
+Classes:
+- CommitGraph: traverses the commit graph of one repository
+- FrontierLimitError: raised when a walk has too many pending commits
+"""
+
+from binascii import Error as BinasciiError, unhexlify
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from uritemplate import expand
+
+from pybitbucket.bitbucket import Client
+from pybitbucket.commit import Commit
+
+
+class FrontierLimitError(Exception):
+    """Raise when a walk would keep more pending commits than allowed."""
+    pass
+
+
+def compact_hash(commit_hash):
+    """
+    The bytes of a hexadecimal commit hash, which take half the memory.
+    Abbreviated hashes of odd length are kept as encoded text.
+    """
+    try:
+        return unhexlify(commit_hash)
+    except (BinasciiError, TypeError, ValueError):
+        return commit_hash.encode('utf-8')
+
+
+def revision_key(revision):
+    """
+    The key of a revision to start from, like a branch or tag name.
+    It is tagged, so that a name that looks hexadecimal
+    is never taken for the commit with that hash.
+    """
+    return ('revision', revision)
+
+
+class CommitGraph(object):
+    """
+    Traverses the ancestry of commits in one repository.
+
+    Each request for an unknown commit returns a page of it and its
+    ancestors, so the walk only asks for the commits it has not seen yet.
+    When several branches of the walk need commits,
+    their pages are fetched concurrently by a few threads.
+
+    Memory stays bounded:
+    - the seen hashes are kept as bytes instead of text,
+    - fetched commits are dropped once they are walked,
+      and the oldest beyond max_known are dropped before,
+      to be fetched again if the walk reaches them,
+    - the pending commits are limited by max_frontier.
+
+    Example, the commits on release that are not on master,
+    until the one that bumped the version:
+
+        graph = CommitGraph('teamsinspace/teamsinspace.bitbucket.org')
+        for commit in graph.walk(
+                ['release'],
+                exclude=['master'],
+                stop=lambda c: c.message.startswith('Bump version')):
+            print(commit.hash)
+    """
+
+    def __init__(
+            self,
+            repository_full_name,
+            client=None,
+            workers=4,
+            max_frontier=10000,
+            max_known=10000,
+            pagelen=None):
+        if '/' not in repository_full_name:
+            raise NameError(
+                "Repository full name must be in the form: username/name")
+        self.username, self.repository_name = repository_full_name.split('/')
+        self.client = client or Client.default()
+        self.workers = workers
+        self.max_frontier = max_frontier
+        self.max_known = max_known
+        self.pagelen = pagelen
+
+    def page_url(self, revision, exclude):
+        template = (
+            '{+bitbucket_url}' +
+            '/2.0/repositories/{username}/{repository_name}' +
+            '/commits/{revision}{?exclude*}')
+        url = expand(
+            template,
+            {
+                'bitbucket_url': self.client.get_bitbucket_url(),
+                'username': self.username,
+                'repository_name': self.repository_name,
+                'revision': revision,
+                'exclude': exclude
+            })
+        return Client.add_query_parameters(
+            url,
+            pagelen=self.pagelen or self.client.pagelen)
+
+    def fetch_page(self, revision, exclude):
+        """The first page of commits from the revision, as data."""
+        response = self.client.session.get(self.page_url(revision, exclude))
+        Client.expect_ok(response)
+        return self.client.decode(response).get('values', [])
+
+    def prefetch(self, executor, keys, revisions, exclude, known):
+        pages = executor.map(
+            lambda revision: self.fetch_page(revision, exclude),
+            revisions)
+        heads = []
+        for key, page in zip(keys, pages):
+            for data in page:
+                known.setdefault(compact_hash(data['hash']), data)
+            if page:
+                heads.append((key, page[0]))
+        # The commits asked for are the newest, so they are kept,
+        # and a branch or tag name resolves to its head.
+        for key, data in heads:
+            known.pop(key, None)
+            known[key] = data
+        while len(known) > max(self.max_known, len(keys)):
+            known.popitem(last=False)
+
+    def push(self, frontier, pending, key, revision):
+        if len(frontier) >= self.max_frontier:
+            raise FrontierLimitError(
+                'More than {0} commits are pending'.format(
+                    self.max_frontier))
+        frontier.append(key)
+        pending[key] = revision
+
+    def walk(self, heads, exclude=None, stop=None):
+        """
+        Generate each commit reachable from the heads once,
+        in breadth-first order.
+
+        :param heads: the revisions (hashes, branches or tags) to start from.
+        :type heads: list
+        :param exclude: the revisions whose ancestors are not walked.
+            Bitbucket filters them out of each page.
+        :type exclude: list
+        :param stop: a predicate on a Commit.
+            A commit that matches is not generated,
+            nor are the ancestors that are only reachable through it.
+        :raises: FrontierLimitError when more than max_frontier commits
+            are pending.
+        """
+        exclude = list(exclude or [])
+        seen = set()
+        known = OrderedDict()
+        frontier = deque()
+        # The revision to ask for, by key, for pending commits.
+        pending = {}
+        for head in heads:
+            if revision_key(head) not in pending:
+                self.push(frontier, pending, revision_key(head), head)
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            while frontier:
+                key = frontier.popleft()
+                revision = pending.pop(key)
+                if key in seen:
+                    continue
+                if key not in known:
+                    # Also fetch for the next pending commits that need it.
+                    batch = [key] + list(islice(
+                        (k for k in frontier
+                         if k not in known and k not in seen),
+                        self.workers - 1))
+                    self.prefetch(
+                        executor,
+                        batch,
+                        [revision] + [pending[k] for k in batch[1:]],
+                        exclude,
+                        known)
+                    for k in batch:
+                        if k not in known:
+                            # Excluded or missing: nothing to walk.
+                            seen.add(k)
+                data = known.pop(key, None)
+                seen.add(key)
+                if data is None:
+                    continue
+                hash_key = compact_hash(data['hash'])
+                if hash_key != key:
+                    # A revision resolves to the hash of its head,
+                    # which may have been walked already.
+                    if hash_key in seen:
+                        continue
+                    known.pop(hash_key, None)
+                    seen.add(hash_key)
+                commit = Commit(data, client=self.client)
+                if stop is not None and stop(commit):
+                    continue
+                yield commit
+                for parent in data.get('parents', []):
+                    parent_key = compact_hash(parent['hash'])
+                    if parent_key not in seen and parent_key not in pending:
+                        self.push(
+                            frontier, pending, parent_key, parent['hash'])
+        finally:
+            executor.shutdown(wait=False)
@@ -103,7 +103,7 @@ class ConsumerPayload(PayloadBuilder):
 
     def add_scope(self, scope):
         new = self._payload.copy()
-        new_scopes = self._payload.get('scopes', [])
+        new_scopes = self.copy_of(self._payload.get('scopes', []))
         if scope not in new_scopes:
             new_scopes.append(scope)
         new['scopes'] = new_scopes
@@ -113,7 +113,7 @@ class ConsumerPayload(PayloadBuilder):
 
     def add_scopes(self, scopes):
         new = self._payload.copy()
-        new_scopes = self._payload.get('scopes', [])
+        new_scopes = self.copy_of(self._payload.get('scopes', []))
         for scope in scopes:
             if scope not in new_scopes:
                 new_scopes.append(scope)
@@ -167,7 +167,7 @@ class Consumer(BitbucketBase):
             (data.get('key') is not None))
 
     def __init__(self, data={}, client=None):
-        client = client or Client()
+        client = client or Client.default()
         super(Consumer, self).__init__(data, client=client)
         expanded_links = self.expand_link_urls(
             bitbucket_url=client.get_bitbucket_url(),
@@ -193,11 +193,11 @@ class Consumer(BitbucketBase):
         :rtype: Consumer
         :raises: ValueError
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = client.get_username()
         if not owner:
             raise ValueError('owner is required')
-        data = payload.validate().build()
+        data = payload.validated()
         templates = cls.extract_templates_from_json()
         api_url = expand(
             templates['create'], {
@@ -221,14 +221,15 @@ class Consumer(BitbucketBase):
         """
         # Note: The Bitbucket API expects a urlencoded-form, not json.
         # Hence, use `data` instead of `json`.
-        return self.put(data=payload.validate().build())
+        return self.put(data=payload.validated())
 
     @staticmethod
-    def find_consumers(client=Client()):
+    def find_consumers(client=None):
         """
         Find consumers for the authenticated user.
         The method is a generator Consumer objects.
         """
+        client = client or Client.default()
         url = expand(
             Consumer.get_link_template('consumers'), {
                 'bitbucket_url': client.get_bitbucket_url(),
@@ -237,10 +238,11 @@ class Consumer(BitbucketBase):
         return client.remote_relationship(url)
 
     @staticmethod
-    def find_consumer_by_id(consumer_id, client=Client()):
+    def find_consumer_by_id(consumer_id, client=None):
         """
         Finding a specific consumer by id for the authenticated user.
         """
+        client = client or Client.default()
         url = expand(
             Consumer.get_link_template('self'), {
                 'bitbucket_url': client.get_bitbucket_url(),
@@ -75,7 +75,7 @@ entrypoints_json = """
       "href": "https://api.bitbucket.org/2.0/repositories{/owner,repository_name}/refs/branches{/ref_name}"
     },
     "repositoryPullRequestsInState": {
-      "href": "https://api.bitbucket.org/2.0/repositories{/owner,repository_name}/pullrequests{?state}"
+      "href": "https://api.bitbucket.org/2.0/repositories{/owner,repository_name}/pullrequests{?state*}"
     },
     "repositoryPullRequestActivitiesForWholeRepository": {
       "href": "https://api.bitbucket.org/2.0/repositories{/owner,repository_name}/pullrequests/activity"
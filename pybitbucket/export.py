@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Writes the resources generated by a finder to a file, one row at a time.
+
+Rows are written as they are generated, so memory stays constant
+when the finder streams its pages:
+
+    commits = Commit.find_commits_in_repository(
+        'teamsinspace', 'teamsinspace.bitbucket.org',
+        client=client, stream=True)
+    stats = Exporter(
+        'commits.csv.gz',
+        columns=['hash', 'date', 'author.user.username']).export(commits)
+    print(stats.rows, stats.rows_per_second)
+
+Classes:
+- Exporter: writes NDJSON or CSV, optionally compressed with gzip
+- ExportStats: the rows written and how long it took
+- TextCsvWriter: writes CSV to a text file on Python 2
+
+Functions:
+- record_of: the data of a resource, even when it was released,
+  or of a Record
+- field_value: the value at a dotted path like source.branch.name
+"""
+
+from collections import namedtuple
+import csv
+import gzip
+import io
+import time
+
+from six import PY2, integer_types, string_types, text_type
+
+from pybitbucket.bitbucket import BitbucketBase
+from pybitbucket.codec import default_codec
+from pybitbucket.record import Record
+
+
+# The values that are written as they are.
+scalar_types = string_types + integer_types + (float, bool, type(None))
+# Users and repositories keep a view of themselves in the other API version.
+shadow_attributes = frozenset(['v1', 'v2'])
+
+
+def released_record(resource):
+    record = {}
+    for name in resource.attributes():
+        if name in shadow_attributes:
+            continue
+        value = getattr(resource, name)
+        if isinstance(value, scalar_types + (BitbucketBase, dict, list)):
+            record[name] = record_of(value)
+    # A commit unpacks its author into raw_author and the user.
+    if 'raw_author' in record:
+        record['author'] = {
+            'raw': record.pop('raw_author'),
+            'user': record.get('author')}
+    return record
+
+
+def record_of(value):
+    """
+    The plain data of a value.
+    A resource streamed by a finder no longer has its raw data,
+    so it is rebuilt from the attributes that were unpacked from it.
+    A Record has only its fields and links.
+    """
+    if isinstance(value, BitbucketBase):
+        if value.data is not None:
+            return value.data
+        return released_record(value)
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {name: record_of(item) for (name, item) in value.items()}
+    if isinstance(value, list):
+        return [record_of(item) for item in value]
+    return value
+
+
+def field_value(value, path):
+    """
+    The value at a path, or None if any step of the path is missing.
+
+    :param path: the names of the steps, like ('source', 'branch', 'name').
+        A step into a list is its index, like ('reviewers', '0').
+    :type path: tuple
+    """
+    for step in path:
+        if value is None:
+            return None
+        if isinstance(value, (BitbucketBase, Record)):
+            value = record_of(value)
+        if isinstance(value, dict):
+            value = value.get(step)
+        elif isinstance(value, list) and step.isdigit():
+            index = int(step)
+            value = value[index] if index < len(value) else None
+        else:
+            return None
+    return record_of(value)
+
+
+class TextCsvWriter(object):
+    """
+    Writes CSV rows to a text file on Python 2,
+    where the csv module only writes bytes.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = io.BytesIO()
+        self.writer = csv.writer(self.buffer)
+
+    def writerow(self, row):
+        self.writer.writerow([
+            value.encode('utf-8') if isinstance(value, text_type) else value
+            for value in row])
+        self.f.write(self.buffer.getvalue().decode('utf-8'))
+        self.buffer.seek(0)
+        self.buffer.truncate()
+
+
+class ExportStats(namedtuple('ExportStats', ['rows', 'seconds'])):
+    __slots__ = ()
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class Exporter(object):
+    """
+    Writes resources as NDJSON, one JSON object per line, or as CSV.
+
+    :param output: a file name, compressed with gzip when it ends with .gz,
+        or a file object opened for text.
+    :type output: str or file
+    :param format: 'ndjson' or 'csv'.
+        If not provided, 'csv' when the file name has a .csv extension.
+    :type format: str
+    :param columns: the dotted paths to export, like source.branch.name.
+        Required for CSV. For NDJSON, each row is an object keyed by path;
+        without columns, each row is the whole resource.
+    :type columns: list
+    :param flush_every: the number of rows between flushes of the output,
+        or 0 to only flush at the end.
+    :type flush_every: int
+    :param progress: called with the ExportStats so far at each flush.
+    :type progress: function
+    :param codec: encodes the JSON. If not provided, the fastest one.
+    """
+    formats = ('ndjson', 'csv')
+
+    def __init__(
+            self,
+            output,
+            format=None,
+            columns=None,
+            flush_every=1000,
+            progress=None,
+            codec=None):
+        self.output = output
+        self.format = format or self.format_of(output)
+        if self.format not in self.formats:
+            raise ValueError(
+                'format must be one of: ' + ', '.join(self.formats))
+        if self.format == 'csv' and not columns:
+            raise ValueError('columns are required for CSV')
+        self.columns = list(columns or [])
+        self.paths = [tuple(column.split('.')) for column in self.columns]
+        self.flush_every = flush_every
+        self.progress = progress
+        self.codec = codec or default_codec()
+
+    @staticmethod
+    def format_of(output):
+        name = getattr(output, 'name', output)
+        if not isinstance(name, string_types):
+            return 'ndjson'
+        if name.endswith('.gz'):
+            name = name[:-len('.gz')]
+        return 'csv' if name.endswith('.csv') else 'ndjson'
+
+    @staticmethod
+    def open_file(path):
+        # The csv module writes its own line endings.
+        if path.endswith('.gz'):
+            return io.TextIOWrapper(
+                gzip.open(path, 'wb'), 'utf-8', newline='')
+        return io.open(path, 'w', encoding='utf-8', newline='')
+
+    def row(self, resource):
+        # A released resource is rebuilt once, not once per column.
+        record = record_of(resource)
+        if not self.paths:
+            return record
+        return [field_value(record, path) for path in self.paths]
+
+    def cell(self, value):
+        if value is None:
+            return ''
+        if isinstance(value, (dict, list)):
+            return self.codec.dumps(value)
+        return value
+
+    def writer(self, f):
+        """A function that writes one row to the file."""
+        if self.format == 'csv':
+            writer = TextCsvWriter(f) if PY2 else csv.writer(f)
+            writer.writerow(self.columns)
+            return lambda row: writer.writerow([self.cell(v) for v in row])
+
+        def write(row):
+            if self.paths:
+                row = dict(zip(self.columns, row))
+            # The standard library encodes to bytes on Python 2.
+            f.write(text_type(self.codec.dumps(row)))
+            f.write('\n')
+        return write
+
+    def write(self, f, resources):
+        write = self.writer(f)
+        started = time.time()
+        rows = 0
+        for resource in resources:
+            write(self.row(resource))
+            rows += 1
+            if self.flush_every and rows % self.flush_every == 0:
+                f.flush()
+                if self.progress:
+                    self.progress(ExportStats(rows, time.time() - started))
+        f.flush()
+        return ExportStats(rows, time.time() - started)
+
+    def export(self, resources):
+        """
+        Write every resource and return the ExportStats.
+
+        :param resources: resources or plain dicts,
+            typically the generator of a finder.
+        :type resources: iterable
+        """
+        if not isinstance(self.output, string_types):
+            return self.write(self.output, resources)
+        with self.open_file(self.output) as f:
+            return self.write(f, resources)
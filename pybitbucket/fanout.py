@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Runs a finder against many repositories at once.
+
+Classes:
+- FanOut: calls a per-repository finder with bounded concurrency
+- FanOutResult: one value found for one repository
+- FanOutError: the error raised by the finder for one repository
+- Descending: reverses the order of a sort key
+
+Functions:
+- team_repositories: the repositories of a team, to fan out over
+"""
+
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from heapq import merge
+from itertools import islice
+from types import GeneratorType
+
+from pybitbucket.bitbucket import Client
+from pybitbucket.repository import Repository, RepositoryRole
+
+
+FanOutResult = namedtuple('FanOutResult', ['repository', 'value'])
+FanOutError = namedtuple('FanOutError', ['repository', 'error'])
+
+
+class Descending(object):
+    """Wraps a sort key so that larger keys come first."""
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+
+def team_repositories(username, client=None, fields=None):
+    """
+    The repositories of a team that the current user can see.
+
+    :param username: the username of the team.
+    :type username: str
+    """
+    return Repository.find_repositories_by_owner_and_role(
+        owner=username,
+        role=RepositoryRole.MEMBER,
+        client=client or Client.default(),
+        fields=fields)
+
+
+class FanOut(object):
+    """
+    Calls a finder for each repository on a bounded pool of threads.
+
+    The finder takes a repository and returns a resource,
+    a list or a generator of resources, or None.
+    Any other value, a tuple included, is a single value.
+    The repositories are read lazily from their iterator,
+    so no more than workers calls are in flight at a time.
+    An error raised by the finder is recorded in errors
+    and does not stop the other repositories.
+
+    Example, the open pull requests of a team:
+
+        fanout = FanOut(
+            lambda r: PullRequest.find_pullrequests_for_repository_by_state(
+                *reversed(r.full_name.split('/', 1)), client=client),
+            workers=8)
+        for result in fanout.results(team_repositories('teamsinspace')):
+            print(result.repository.full_name, result.value.title)
+        for error in fanout.errors:
+            print(error.repository.full_name, error.error)
+    """
+
+    def __init__(self, finder, workers=8):
+        self.finder = finder
+        self.workers = workers
+        self.errors = []
+
+    def call(self, repository):
+        values = self.finder(repository)
+        if values is None:
+            return []
+        if isinstance(values, (GeneratorType, list)):
+            return list(values)
+        return [values]
+
+    def completed(self, repositories):
+        """
+        Generate the repository and its values, or its error,
+        as soon as each finder completes.
+        """
+        repositories = iter(repositories)
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        running = {}
+
+        def submit(count):
+            for repository in islice(repositories, count):
+                future = executor.submit(self.call, repository)
+                running[future] = repository
+
+        try:
+            submit(self.workers)
+            while running:
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                finished = [(running.pop(f), f) for f in done]
+                submit(len(finished))
+                for repository, future in finished:
+                    try:
+                        yield repository, future.result(), None
+                    except Exception as e:
+                        yield repository, None, e
+        finally:
+            executor.shutdown(wait=False)
+
+    def results(self, repositories):
+        """
+        Generate a FanOutResult for each value, in order of arrival.
+        """
+        self.errors = []
+        for repository, values, error in self.completed(repositories):
+            if error is not None:
+                self.errors.append(FanOutError(repository, error))
+                continue
+            for value in values:
+                yield FanOutResult(repository, value)
+
+    def sorted_results(self, repositories, key, reverse=False):
+        """
+        Generate a FanOutResult for each value, ordered by key.
+
+        The values of each repository are sorted, which costs little when
+        the finder already asked Bitbucket to sort them,
+        and the sorted lists are merged with a heap.
+
+        :param key: a function of a value that returns its sort key.
+        :type key: function
+        :param reverse: when true, the largest keys come first.
+        :type reverse: bool
+        """
+        def sort_key(value):
+            return Descending(key(value)) if reverse else key(value)
+
+        self.errors = []
+        lists = []
+        for repository, values, error in self.completed(repositories):
+            if error is not None:
+                self.errors.append(FanOutError(repository, error))
+                continue
+            index = len(lists)
+            lists.append(sorted(
+                (sort_key(value), index, position, repository, value)
+                for (position, value) in enumerate(values)))
+        for _, _, _, repository, value in merge(*lists):
+            yield FanOutResult(repository, value)
@@ -16,7 +16,7 @@ from uritemplate import expand
 from voluptuous import Schema, Required, Optional, In
 
 from pybitbucket.bitbucket import (
-    Bitbucket, BitbucketBase, Client, PayloadBuilder, Enum)
+    BitbucketBase, Client, PayloadBuilder, Enum)
 
 
 class HookEvent(Enum):
@@ -125,7 +125,7 @@ class HookPayload(PayloadBuilder):
 
     def add_event(self, event):
         new = self._payload.copy()
-        new_events = self._payload.get('events', [])
+        new_events = self.copy_of(self._payload.get('events', []))
         if event not in new_events:
             new_events.append(event)
         new['events'] = new_events
@@ -136,7 +136,7 @@ class HookPayload(PayloadBuilder):
 
     def add_events(self, events):
         new = self._payload.copy()
-        new_events = self._payload.get('events', [])
+        new_events = self.copy_of(self._payload.get('events', []))
         for event in events:
             if event not in new_events:
                 new_events.append(event)
@@ -166,6 +166,10 @@ class HookPayload(PayloadBuilder):
 class Hook(BitbucketBase):
     id_attribute = 'uuid'
     resource_type = 'hooks'
+    record_fields = (
+        'uuid', 'url', 'description', 'events', 'active', 'subject_type',
+        'created_at', 'type',
+    )
     templates = {
         'create': (
             '{+bitbucket_url}' +
@@ -204,7 +208,7 @@ class Hook(BitbucketBase):
         :rtype: Hook
         :raises: MultipleInvalid
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = (
             owner or
             payload.owner or
@@ -214,7 +218,7 @@ class Hook(BitbucketBase):
             payload.repository_name)
         if not (owner and repository_name):
             raise ValueError('owner and repository_name are required')
-        json = payload.validate().build()
+        json = payload.validated()
         api_url = expand(
             cls.templates['create'], {
                 'bitbucket_url': client.get_bitbucket_url(),
@@ -234,43 +238,51 @@ class Hook(BitbucketBase):
         :rtype: Hook
         :raises: MultipleInvalid
         """
-        return self.put(json=payload.validate().build())
+        return self.put(json=payload.validated())
 
     @staticmethod
     def find_hook_by_uuid_in_repository(
             uuid,
             repository_name,
             owner=None,
-            client=None):
+            client=None,
+            fields=None):
         """
         A convenience method for finding a specific hook.
         In contrast to the pure hypermedia driven method on the Bitbucket
         class, this method returns a Hook object, instead of the
         generator.
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or client.get_username()
         return next(
-            Bitbucket(client=client).repositoryHookById(
+            client.get_bitbucket().repositoryHookById(
                 owner=owner,
                 repository_name=repository_name,
-                uuid=uuid))
+                uuid=uuid,
+                fields=fields))
 
     @staticmethod
     def find_hooks_for_repository(
             repository_name,
             owner=None,
-            client=None):
+            client=None,
+            fields=None,
+            q=None,
+            sort=None):
         """
         A convenience method for finding hooks for a repository.
         The method is a generator Hooks objects.
         If no owner is provided, this method assumes client can provide one.
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or client.get_username()
-        return Bitbucket(client=client).repositoryHooks(
+        return client.get_bitbucket().repositoryHooks(
             owner=owner,
-            repository_name=repository_name)
+            repository_name=repository_name,
+            fields=fields,
+            q=q,
+            sort=sort)
 
 
 Client.bitbucket_types.add(Hook)
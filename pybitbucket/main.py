@@ -3,15 +3,297 @@
 
 from __future__ import print_function, unicode_literals
 
-"""Program entry point"""
+"""
+Program entry point
+
+Each command writes one JSON object per line on standard output.
+Errors are written the same way on standard error,
+and the exit status is 1 if there were any.
+The commands that act on several targets run up to --jobs at a time.
+
+Credentials are read from the options, or from the environment variables
+BITBUCKET_USERNAME, BITBUCKET_PASSWORD and BITBUCKET_EMAIL.
+Without them, the requests are anonymous.
+
+To keep the startup fast, the library is only imported by the command
+that needs it.
+"""
 
 import argparse
+import os
 import sys
 
 from pybitbucket import metadata
 
 
-def main(argv):
+def split_pullrequest(target):
+    """Split owner/name#id into the repository full name and the id."""
+    from pybitbucket.repository import split_full_name
+    full_name, _, pullrequest_id = target.partition('#')
+    if not pullrequest_id.isdigit():
+        raise ValueError(
+            "Pull request must be in the form: username/name#id")
+    split_full_name(full_name)
+    return full_name, int(pullrequest_id)
+
+
+def comma_separated(text):
+    return [name for name in text.split(',') if name]
+
+
+def make_client(args):
+    """One client per invocation, with a connection pool for every job."""
+    from requests.adapters import HTTPAdapter
+    from pybitbucket.auth import Anonymous, BasicAuthenticator
+    from pybitbucket.bitbucket import Client
+    if args.username and args.password:
+        config = BasicAuthenticator(
+            args.username,
+            args.password,
+            args.email)
+    else:
+        config = Anonymous()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=args.jobs)
+    for prefix in ('https://', 'http://'):
+        config.session.mount(prefix, adapter)
+    return Client(config, pagelen=args.pagelen)
+
+
+class Output(object):
+    """Writes resources and errors as lines of JSON."""
+
+    def __init__(self, client, out=None, err=None):
+        self.client = client
+        self.out = out or sys.stdout
+        self.err = err or sys.stderr
+        self.errors = 0
+
+    def line(self, stream, data):
+        stream.write(self.client.codec.dumps(data))
+        stream.write('\n')
+        stream.flush()
+
+    def resource(self, resource):
+        self.line(self.out, getattr(resource, 'data', resource))
+
+    def error(self, target, error):
+        self.errors += 1
+        self.line(self.err, {'target': target, 'error': '{0}'.format(error)})
+
+    def fanned_out(self, fanout, targets):
+        for result in fanout.results(targets):
+            self.resource(result.value)
+        for error in fanout.errors:
+            self.error(error.repository, error.error)
+
+
+def list_repositories(args, client, output):
+    from pybitbucket.repository import Repository
+    repositories = Repository.find_repositories_by_owner_and_role(
+        owner=args.owner,
+        role=args.role,
+        client=client,
+        fields=args.fields,
+        q=args.q,
+        sort=args.sort)
+    for repository in repositories:
+        output.resource(repository)
+
+
+def list_pullrequests(args, client, output):
+    from pybitbucket.fanout import FanOut
+    from pybitbucket.pullrequest import PullRequest
+    from pybitbucket.repository import split_full_name
+
+    def find(full_name):
+        owner, repository_name = split_full_name(full_name)
+        return PullRequest.find_pullrequests_for_repository_by_state(
+            repository_name,
+            owner=owner,
+            state=args.state,
+            client=client,
+            fields=args.fields,
+            q=args.q,
+            sort=args.sort)
+
+    output.fanned_out(FanOut(find, workers=args.jobs), args.repositories)
+
+
+def list_commits(args, client, output):
+    from pybitbucket.commit import Commit
+    from pybitbucket.repository import split_full_name
+    owner, repository_name = split_full_name(args.repository)
+    commits = Commit.find_commits_in_repository(
+        owner,
+        repository_name,
+        branch=args.branch,
+        client=client,
+        fields=args.fields,
+        q=args.q,
+        sort=args.sort)
+    for commit in commits:
+        output.resource(commit)
+
+
+def post_build_statuses(args, client, output):
+    from pybitbucket.build import (
+        BuildStatus, BuildStatusPayload, BuildStatusStates)
+    from pybitbucket.fanout import FanOut
+    from pybitbucket.repository import split_full_name
+    owner, repository_name = split_full_name(args.repository)
+    payload = BuildStatusPayload() \
+        .add_key(args.key) \
+        .add_state(BuildStatusStates(args.state)) \
+        .add_url(args.url)
+    if args.name:
+        payload = payload.add_name(args.name)
+    if args.description:
+        payload = payload.add_description(args.description)
+
+    def post(revision):
+        return BuildStatus.create(
+            payload,
+            revision=revision,
+            repository_name=repository_name,
+            owner=owner,
+            client=client)
+
+    output.fanned_out(FanOut(post, workers=args.jobs), args.revisions)
+
+
+def create_hooks(args, client, output):
+    from pybitbucket.fanout import FanOut
+    from pybitbucket.hook import Hook, HookEvent, HookPayload
+    from pybitbucket.repository import split_full_name
+    payload = HookPayload() \
+        .add_description(args.description) \
+        .add_callback_url(args.url) \
+        .add_events([HookEvent(event) for event in args.events]) \
+        .activate()
+
+    def create(full_name):
+        owner, repository_name = split_full_name(full_name)
+        return Hook.create(
+            payload,
+            repository_name=repository_name,
+            owner=owner,
+            client=client)
+
+    output.fanned_out(FanOut(create, workers=args.jobs), args.repositories)
+
+
+def approve_pullrequests(args, client, output):
+    from uritemplate import expand
+    from pybitbucket.bitbucket import BitbucketBase
+    from pybitbucket.fanout import FanOut
+    from pybitbucket.repository import split_full_name
+    template = (
+        '{+bitbucket_url}' +
+        '/2.0/repositories/{owner}/{repository_name}' +
+        '/pullrequests/{pullrequest_id}/approve')
+
+    def approve(target):
+        full_name, pullrequest_id = split_pullrequest(target)
+        owner, repository_name = split_full_name(full_name)
+        url = expand(template, {
+            'bitbucket_url': client.get_bitbucket_url(),
+            'owner': owner,
+            'repository_name': repository_name,
+            'pullrequest_id': pullrequest_id})
+        approved = BitbucketBase.approve_url(url, client=client)
+        return {'pullrequest': target, 'approved': approved}
+
+    output.fanned_out(FanOut(approve, workers=args.jobs), args.pullrequests)
+
+
+def add_finder_arguments(parser):
+    parser.add_argument(
+        '--fields',
+        type=comma_separated,
+        help='comma-separated attributes to ask for, like name,links')
+    parser.add_argument(
+        '--q',
+        help='a filter expression evaluated by Bitbucket')
+    parser.add_argument(
+        '--sort',
+        help='the attribute to sort by, prefixed by - to reverse')
+
+
+def add_commands(arg_parser):
+    commands = arg_parser.add_subparsers(title='commands')
+
+    parser = commands.add_parser(
+        'repositories',
+        help='list the repositories of an owner')
+    parser.add_argument(
+        '--owner',
+        help='the owner of the repositories, by default the current user')
+    parser.add_argument(
+        '--role',
+        default='owner',
+        choices=['owner', 'admin', 'contributor', 'member'])
+    add_finder_arguments(parser)
+    parser.set_defaults(command=list_repositories)
+
+    parser = commands.add_parser(
+        'pullrequests',
+        help='list the pull requests of repositories')
+    parser.add_argument('repositories', nargs='+', metavar='owner/name')
+    parser.add_argument(
+        '--state',
+        action='append',
+        choices=['OPEN', 'MERGED', 'DECLINED'])
+    add_finder_arguments(parser)
+    parser.set_defaults(command=list_pullrequests)
+
+    parser = commands.add_parser(
+        'commits',
+        help='list the commits of a repository')
+    parser.add_argument('repository', metavar='owner/name')
+    parser.add_argument('--branch')
+    add_finder_arguments(parser)
+    parser.set_defaults(command=list_commits)
+
+    parser = commands.add_parser(
+        'build-status',
+        help='post a build status on revisions of a repository')
+    parser.add_argument('repository', metavar='owner/name')
+    parser.add_argument('revisions', nargs='+', metavar='revision')
+    parser.add_argument('--key', required=True)
+    parser.add_argument(
+        '--state',
+        required=True,
+        choices=['INPROGRESS', 'SUCCESSFUL', 'FAILED'])
+    parser.add_argument('--url', required=True)
+    parser.add_argument('--name')
+    parser.add_argument('--description')
+    parser.set_defaults(command=post_build_statuses)
+
+    parser = commands.add_parser(
+        'create-hook',
+        help='create a webhook on repositories')
+    parser.add_argument('repositories', nargs='+', metavar='owner/name')
+    parser.add_argument('--url', required=True)
+    parser.add_argument('--description', required=True)
+    parser.add_argument(
+        '--event',
+        dest='events',
+        action='append',
+        default=[],
+        help='an event key like repo:push, repeatable')
+    parser.set_defaults(command=create_hooks)
+
+    parser = commands.add_parser(
+        'approve',
+        help='approve pull requests')
+    parser.add_argument(
+        'pullrequests',
+        nargs='+',
+        metavar='owner/name#id')
+    parser.set_defaults(command=approve_pullrequests)
+
+
+def main(argv, out=None, err=None):
     """Program entry point.
 
     :param argv: command-line arguments
@@ -41,12 +323,42 @@ URL: <{url}>
         '-V', '--version',
         action='version',
         version='{0} {1}'.format(metadata.project, metadata.version))
+    arg_parser.add_argument(
+        '--username',
+        default=os.environ.get('BITBUCKET_USERNAME'))
+    arg_parser.add_argument(
+        '--password',
+        default=os.environ.get('BITBUCKET_PASSWORD'),
+        help='a password or an app password')
+    arg_parser.add_argument(
+        '--email',
+        default=os.environ.get('BITBUCKET_EMAIL'))
+    arg_parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=4,
+        help='the number of requests to run at a time')
+    arg_parser.add_argument(
+        '--pagelen',
+        type=int,
+        help='the number of resources on each page')
+    add_commands(arg_parser)
 
-    arg_parser.parse_args(args=argv[1:])
+    args = arg_parser.parse_args(args=argv[1:])
 
-    print(epilog)
+    if not getattr(args, 'command', None):
+        print(epilog)
+        return 0
 
-    return 0
+    from requests.exceptions import RequestException
+    client = make_client(args)
+    output = Output(client, out=out, err=err)
+    try:
+        args.command(args, client, output)
+    # Bitbucket's errors are HTTP errors of requests.
+    except (ValueError, RequestException) as e:
+        output.error(argv[0], e)
+    return 1 if output.errors else 0
 
 
 def entry_point():
@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Mirrors slowly changing Bitbucket data into an indexed SQLite database.
+
+Reporting queries can then be answered locally in milliseconds.
+The mirror keeps the JSON of each resource alongside indexed columns,
+so queries return the same resource classes as the finders,
+bound to a Client for navigating relationships or writing back.
+
+Classes:
+- Mirror: a local SQLite copy of repositories, pull requests,
+    commits, refs, and build statuses
+"""
+
+import sqlite3
+from json import dumps, loads
+
+from pybitbucket.bitbucket import Client
+from pybitbucket.build import BuildStatus
+from pybitbucket.commitgraph import CommitGraph
+from pybitbucket.export import field_value, record_of
+from pybitbucket.record import Record
+from pybitbucket.ref import Branch, Tag
+from pybitbucket.repository import Repository
+from pybitbucket.sync import PullRequestSync
+
+
+# Bitbucket abbreviates commit hashes inside pull requests.
+SHORT_HASH_LENGTH = 12
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repositories (
+    full_name TEXT PRIMARY KEY,
+    owner TEXT,
+    updated_on TEXT,
+    language TEXT,
+    data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS repositories_owner
+    ON repositories (owner);
+
+CREATE TABLE IF NOT EXISTS pullrequests (
+    repository TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    state TEXT,
+    updated_on TEXT,
+    author TEXT,
+    source_branch TEXT,
+    source_commit TEXT,
+    destination_branch TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (repository, id));
+CREATE INDEX IF NOT EXISTS pullrequests_state
+    ON pullrequests (state, updated_on);
+CREATE INDEX IF NOT EXISTS pullrequests_source_commit
+    ON pullrequests (repository, source_commit);
+
+CREATE TABLE IF NOT EXISTS commits (
+    repository TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    date TEXT,
+    author TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (repository, hash));
+CREATE INDEX IF NOT EXISTS commits_date
+    ON commits (repository, date);
+
+CREATE TABLE IF NOT EXISTS refs (
+    repository TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    target TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (repository, kind, name));
+
+CREATE TABLE IF NOT EXISTS build_statuses (
+    repository TEXT NOT NULL,
+    revision TEXT NOT NULL,
+    short_revision TEXT NOT NULL,
+    key TEXT NOT NULL,
+    state TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (repository, revision, key));
+CREATE INDEX IF NOT EXISTS build_statuses_state
+    ON build_statuses (state, repository, short_revision);
+
+CREATE TABLE IF NOT EXISTS watermarks (
+    repository TEXT PRIMARY KEY,
+    updated_on TEXT NOT NULL);
+"""
+
+
+# The kind of each class of ref, as Bitbucket types them.
+ref_kinds = {Branch: 'branch', Tag: 'tag'}
+
+
+def kind_of_ref(ref):
+    """
+    The kind of a ref from its class,
+    since a response with partial fields may not have its type.
+    """
+    if isinstance(ref, Record):
+        resource_type = ref.resource_type
+    elif isinstance(ref, dict):
+        resource_type = Client.type_of(ref)
+    else:
+        resource_type = type(ref)
+    return ref_kinds.get(resource_type) or data_of(ref).get('type')
+
+
+def data_of(resource):
+    """
+    The plain data of a resource or of a dict,
+    rebuilt from its attributes if a finder streamed it.
+    """
+    return record_of(resource)
+
+
+class Mirror(object):
+    """
+    A local SQLite copy of Bitbucket resources.
+
+    The mirror is also a store for PullRequestSync,
+    so refresh_pullrequests only downloads what changed.
+    """
+
+    def __init__(self, path=':memory:', client=None):
+        self.client = client or Client.default()
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def _upsert(self, table, columns, rows):
+        statement = 'INSERT OR REPLACE INTO {0} ({1}) VALUES ({2})'.format(
+            table,
+            ', '.join(columns),
+            ', '.join('?' for c in columns))
+        with self.connection:
+            cursor = self.connection.executemany(statement, rows)
+        return cursor.rowcount
+
+    def _select(self, statement, parameters=()):
+        return [
+            self.client.convert_to_object(loads(row[0]))
+            for row
+            in self.connection.execute(statement, parameters)]
+
+    @staticmethod
+    def _where(conditions):
+        clauses = [c for (c, v) in conditions if v is not None]
+        parameters = [v for (c, v) in conditions if v is not None]
+        if not clauses:
+            return '', parameters
+        return ' WHERE ' + ' AND '.join(clauses), parameters
+
+    # Bulk upserts
+
+    def upsert_repositories(self, repositories):
+        rows = []
+        for repository in repositories:
+            data = data_of(repository)
+            rows.append((
+                data['full_name'],
+                data['full_name'].split('/', 1)[0],
+                data.get('updated_on'),
+                data.get('language'),
+                dumps(data)))
+        return self._upsert(
+            'repositories',
+            ('full_name', 'owner', 'updated_on', 'language', 'data'),
+            rows)
+
+    def upsert_pullrequests(self, repository_full_name, pullrequests):
+        rows = []
+        for pullrequest in pullrequests:
+            data = data_of(pullrequest)
+            source_commit = field_value(data, ('source', 'commit', 'hash'))
+            rows.append((
+                repository_full_name,
+                data['id'],
+                data.get('state'),
+                data.get('updated_on'),
+                field_value(data, ('author', 'username')),
+                field_value(data, ('source', 'branch', 'name')),
+                source_commit and source_commit[:SHORT_HASH_LENGTH],
+                field_value(data, ('destination', 'branch', 'name')),
+                dumps(data)))
+        return self._upsert(
+            'pullrequests',
+            ('repository', 'id', 'state', 'updated_on', 'author',
+             'source_branch', 'source_commit', 'destination_branch', 'data'),
+            rows)
+
+    def upsert_commits(self, repository_full_name, commits):
+        rows = []
+        for commit in commits:
+            data = data_of(commit)
+            rows.append((
+                repository_full_name,
+                data['hash'],
+                data.get('date'),
+                field_value(data, ('author', 'raw')),
+                dumps(data)))
+        return self._upsert(
+            'commits',
+            ('repository', 'hash', 'date', 'author', 'data'),
+            rows)
+
+    def upsert_refs(self, repository_full_name, refs):
+        rows = []
+        for ref in refs:
+            data = data_of(ref)
+            rows.append((
+                repository_full_name,
+                kind_of_ref(ref),
+                data['name'],
+                field_value(data, ('target', 'hash')),
+                dumps(data)))
+        return self._upsert(
+            'refs',
+            ('repository', 'kind', 'name', 'target', 'data'),
+            rows)
+
+    def upsert_buildstatuses(self, repository_full_name, buildstatuses):
+        rows = []
+        for buildstatus in buildstatuses:
+            data = data_of(buildstatus)
+            # The commit is only known from the link to it,
+            # so a build status without one cannot be stored.
+            href = field_value(data, ('links', 'commit', 'href'))
+            if not href:
+                continue
+            revision = href.rstrip('/').split('/')[-1]
+            rows.append((
+                repository_full_name,
+                revision,
+                revision[:SHORT_HASH_LENGTH],
+                data['key'],
+                data.get('state'),
+                dumps(data)))
+        return self._upsert(
+            'build_statuses',
+            ('repository', 'revision', 'short_revision', 'key', 'state',
+             'data'),
+            rows)
+
+    # The store interface of PullRequestSync
+
+    def get_watermark(self, repository_full_name):
+        row = self.connection.execute(
+            'SELECT updated_on FROM watermarks WHERE repository = ?',
+            (repository_full_name,)).fetchone()
+        return row and row[0]
+
+    def set_watermark(self, repository_full_name, updated_on):
+        self._upsert(
+            'watermarks',
+            ('repository', 'updated_on'),
+            [(repository_full_name, updated_on)])
+
+    def upsert(self, repository_full_name, pullrequest):
+        self.upsert_pullrequests(repository_full_name, [pullrequest])
+
+    # Refreshing from Bitbucket
+
+    def refresh_repositories(self, owner=None, **kwargs):
+        return self.upsert_repositories(
+            Repository.find_repositories_by_owner_and_role(
+                owner=owner,
+                client=self.client,
+                **kwargs))
+
+    def refresh_pullrequests(self, repositories, states=None):
+        """
+        Download the pull requests changed since the previous refresh.
+        Returns the changed pull requests.
+        """
+        sync = PullRequestSync(client=self.client, store=self, states=states)
+        return list(sync.changes(repositories))
+
+    def has_commit(self, repository_full_name, commit_hash):
+        return self.connection.execute(
+            'SELECT 1 FROM commits WHERE repository = ? AND hash = ?',
+            (repository_full_name, commit_hash)).fetchone() is not None
+
+    def refresh_commits(self, repository_full_name, branch=None):
+        """
+        Download the commits of a branch, or of every branch,
+        that the mirror does not have yet.
+        The walk stops at the commits the mirror has,
+        since their ancestors were stored with them.
+        """
+        owner, repository_name = repository_full_name.split('/', 1)
+        if branch is None:
+            heads = [
+                b.name
+                for b in Branch.find_branches_in_repository(
+                    repository_name,
+                    owner=owner,
+                    client=self.client)]
+        else:
+            heads = [branch]
+        graph = CommitGraph(repository_full_name, client=self.client)
+        return self.upsert_commits(
+            repository_full_name,
+            graph.walk(
+                heads,
+                stop=lambda c: self.has_commit(
+                    repository_full_name, c.hash)))
+
+    def refresh_refs(self, repository_full_name):
+        owner, repository_name = repository_full_name.split('/', 1)
+        return self.upsert_refs(
+            repository_full_name,
+            list(Branch.find_branches_in_repository(
+                repository_name,
+                owner=owner,
+                client=self.client)) +
+            list(Tag.find_tags_in_repository(
+                repository_name,
+                owner=owner,
+                client=self.client)))
+
+    def refresh_buildstatuses(self, repository_full_name, revision):
+        owner, repository_name = repository_full_name.split('/', 1)
+        return self.upsert_buildstatuses(
+            repository_full_name,
+            BuildStatus.find_buildstatuses_for_repository_commit(
+                repository_name,
+                revision,
+                owner=owner,
+                client=self.client))
+
+    # Queries
+
+    def repositories(self, owner=None, language=None):
+        where, parameters = self._where([
+            ('owner = ?', owner),
+            ('language = ?', language)])
+        return self._select(
+            'SELECT data FROM repositories' + where +
+            ' ORDER BY full_name',
+            parameters)
+
+    def pullrequests(
+            self,
+            repository_full_name=None,
+            state=None,
+            updated_since=None):
+        where, parameters = self._where([
+            ('repository = ?', repository_full_name),
+            ('state = ?', state),
+            ('updated_on > ?', updated_since)])
+        return self._select(
+            'SELECT data FROM pullrequests' + where +
+            ' ORDER BY updated_on DESC',
+            parameters)
+
+    def commits(self, repository_full_name=None):
+        where, parameters = self._where([
+            ('repository = ?', repository_full_name)])
+        return self._select(
+            'SELECT data FROM commits' + where + ' ORDER BY date DESC',
+            parameters)
+
+    def refs(self, repository_full_name=None, kind=None):
+        where, parameters = self._where([
+            ('repository = ?', repository_full_name),
+            ('kind = ?', kind)])
+        return self._select(
+            'SELECT data FROM refs' + where + ' ORDER BY name',
+            parameters)
+
+    def buildstatuses(
+            self,
+            repository_full_name=None,
+            revision=None,
+            state=None):
+        where, parameters = self._where([
+            ('repository = ?', repository_full_name),
+            ('revision = ?', revision),
+            ('state = ?', state)])
+        return self._select(
+            'SELECT data FROM build_statuses' + where, parameters)
+
+    def failing_buildstatuses_on_open_pullrequests(self):
+        """
+        The failed build statuses on the source commit
+        of every open pull request in the mirror.
+        """
+        return self._select(
+            'SELECT b.data FROM build_statuses b'
+            ' JOIN pullrequests p'
+            ' ON p.repository = b.repository'
+            ' AND p.source_commit = b.short_revision'
+            ' WHERE b.state = ? AND p.state = ?'
+            ' ORDER BY p.updated_on DESC',
+            ('FAILED', 'OPEN'))
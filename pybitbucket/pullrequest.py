@@ -17,7 +17,7 @@ from uritemplate import expand
 from voluptuous import Schema, Required, Optional
 
 from pybitbucket.bitbucket import (
-        Bitbucket, BitbucketBase, Client, PayloadBuilder, Enum)
+        BitbucketBase, Client, PayloadBuilder, Enum)
 
 
 class PullRequestState(Enum):
@@ -101,7 +101,7 @@ class PullRequestPayload(PayloadBuilder):
 
     def add_reviewer_by_username(self, username):
         new = self._payload.copy()
-        reviewers = self._payload.get('reviewers', [])
+        reviewers = self.copy_of(self._payload.get('reviewers', []))
         if {'username': username} not in reviewers:
             reviewers.append({'username': username})
         new['reviewers'] = reviewers
@@ -115,7 +115,7 @@ class PullRequestPayload(PayloadBuilder):
 
     def add_reviewers_from_usernames(self, usernames):
         new = self._payload.copy()
-        reviewers = self._payload.get('reviewers', [])
+        reviewers = self.copy_of(self._payload.get('reviewers', []))
         for username in usernames:
             if {'username': username} not in reviewers:
                 reviewers.append({'username': username})
@@ -153,8 +153,8 @@ class PullRequestPayload(PayloadBuilder):
 
     def add_destination_branch_name(self, name):
         new = self._payload.copy()
-        destination = self._payload.get('destination', {})
-        destination['branch'] = destination.get('branch', {})
+        destination = self.copy_of(self._payload.get('destination', {}))
+        destination['branch'] = self.copy_of(destination.get('branch', {}))
         destination['branch']['name'] = name
         new['destination'] = destination
         return PullRequestPayload(
@@ -172,8 +172,8 @@ class PullRequestPayload(PayloadBuilder):
 
     def add_destination_commit_by_hash(self, hash):
         new = self._payload.copy()
-        destination = self._payload.get('destination', {})
-        destination['commit'] = destination.get('commit', {})
+        destination = self.copy_of(self._payload.get('destination', {}))
+        destination['commit'] = self.copy_of(destination.get('commit', {}))
         destination['commit']['hash'] = hash
         new['destination'] = destination
         return PullRequestPayload(
@@ -191,8 +191,8 @@ class PullRequestPayload(PayloadBuilder):
 
     def add_source_branch_name(self, name):
         new = self._payload.copy()
-        source = self._payload.get('source', {})
-        source['branch'] = source.get('branch', {})
+        source = self.copy_of(self._payload.get('source', {}))
+        source['branch'] = self.copy_of(source.get('branch', {}))
         source['branch']['name'] = name
         new['source'] = source
         return PullRequestPayload(
@@ -202,8 +202,8 @@ class PullRequestPayload(PayloadBuilder):
 
     def add_source_repository_full_name(self, full_name):
         new = self._payload.copy()
-        source = self._payload.get('source', {})
-        source['repository'] = source.get('repository', {})
+        source = self.copy_of(self._payload.get('source', {}))
+        source['repository'] = self.copy_of(source.get('repository', {}))
         source['repository']['full_name'] = full_name
         new['source'] = source
         return PullRequestPayload(
@@ -217,8 +217,8 @@ class PullRequestPayload(PayloadBuilder):
 
     def add_source_commit_by_hash(self, hash):
         new = self._payload.copy()
-        source = self._payload.get('source', {})
-        source['commit'] = source.get('commit', {})
+        source = self.copy_of(self._payload.get('source', {}))
+        source['commit'] = self.copy_of(source.get('commit', {}))
         source['commit']['hash'] = hash
         new['source'] = source
         return PullRequestPayload(
@@ -234,6 +234,12 @@ class PullRequestPayload(PayloadBuilder):
 class PullRequest(BitbucketBase):
     id_attribute = 'id'
     resource_type = 'pullrequests'
+    record_fields = (
+        'id', 'title', 'description', 'state', 'author', 'source',
+        'destination', 'merge_commit', 'close_source_branch', 'closed_by',
+        'reason', 'reviewers', 'participants', 'comment_count', 'task_count',
+        'created_on', 'updated_on', 'type',
+    )
     templates = {
         'create': (
             '{+bitbucket_url}' +
@@ -251,10 +257,11 @@ class PullRequest(BitbucketBase):
             setattr(
                 self,
                 target_attribute,
-                self.client.convert_to_object(
+                self.client.convert_embedded(
                     self.data[child][child_object]))
 
-    def __init__(self, data, client=Client()):
+    def __init__(self, data, client=None):
+        client = client or Client.default()
         super(PullRequest, self).__init__(data, client=client)
         self.attr_from_subchild(
             'source_commit', 'source', 'commit')
@@ -269,10 +276,10 @@ class PullRequest(BitbucketBase):
             url = data['links']['approve']['href']
             # Approve is a POST on the approve link
             setattr(self, 'approve', partial(
-                self.post_approval, template=url))
+                self.approve_url, url=url, client=client))
             # Unapprove is a DELETE on the approve link
             setattr(self, 'unapprove', partial(
-                self.delete_approval, template=url))
+                self.unapprove_url, url=url, client=client))
         if data.get('links', {}).get('decline', {}).get('href', {}):
             url = data['links']['decline']['href']
             # Decline is a POST
@@ -287,10 +294,15 @@ class PullRequest(BitbucketBase):
             url = data['links']['diff']['href']
             # Diff returns plain text
             setattr(self, 'diff', partial(
-                self.content, url=url))
+                self.content_of, url=url, client=client))
 
     def content(self, url):
-        response = self.client.session.get(url)
+        return PullRequest.content_of(url, client=self.client)
+
+    @staticmethod
+    def content_of(url, client=None):
+        client = client or Client.default()
+        response = client.session.get(url)
         Client.expect_ok(response)
         return response.content
 
@@ -318,7 +330,7 @@ class PullRequest(BitbucketBase):
         :rtype: PullRequest
         :raises: ValueError
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = (
             owner or
             payload.destination_repository_owner)
@@ -327,7 +339,7 @@ class PullRequest(BitbucketBase):
             payload.destination_repository_name)
         if not (owner and repository_name):
             raise ValueError('owner and repository_name are required')
-        json = payload.validate().build()
+        json = payload.validated()
         api_url = expand(
             cls.templates['create'], {
                 'bitbucket_url': client.get_bitbucket_url(),
@@ -341,41 +353,52 @@ class PullRequest(BitbucketBase):
             pullrequest_id,
             repository_name,
             owner=None,
-            client=None):
+            client=None,
+            fields=None):
         """
         A convenience method for finding a specific pull request.
         In contrast to the pure hypermedia driven method on the Bitbucket
         class, this method returns a PullRequest object, instead of the
         generator.
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or client.get_username()
         return next(
-            Bitbucket(client=client).repositoryPullRequestByPullRequestId(
+            client.get_bitbucket().repositoryPullRequestByPullRequestId(
                 owner=owner,
                 repository_name=repository_name,
-                pullrequest_id=pullrequest_id))
+                pullrequest_id=pullrequest_id,
+                fields=fields))
 
     @staticmethod
     def find_pullrequests_for_repository_by_state(
             repository_name,
             owner=None,
             state=None,
-            client=None):
+            client=None,
+            fields=None,
+            q=None,
+            sort=None):
         """
         A convenience method for finding pull requests for a repository.
         The method is a generator PullRequest objects.
         If no owner is provided, this method assumes client can provide one.
         If no state is provided, the server will assume open pull requests.
+        A list of states finds pull requests in any of them.
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or client.get_username()
-        if (state is not None):
+        if isinstance(state, (list, tuple)):
+            state = [PullRequestState(s).value for s in state]
+        elif (state is not None):
             PullRequestState(state)
-        return Bitbucket(client=client).repositoryPullRequestsInState(
+        return client.get_bitbucket().repositoryPullRequestsInState(
             owner=owner,
             repository_name=repository_name,
-            state=state)
+            state=state,
+            fields=fields,
+            q=q,
+            sort=sort)
 
 
 Client.bitbucket_types.add(PullRequest)
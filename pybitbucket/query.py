@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Builds the filter and sort expressions evaluated by Bitbucket.
+
+Every paginated finder accepts `q` and `sort`,
+so filtering happens on the server and fewer pages are fetched.
+
+Classes:
+- QueryOperator: enumerates the comparison operators for filters
+- QueryBuilder: encapsulates the q and sort parameters of a query
+
+Functions:
+- parse_datetime: reads a Bitbucket timestamp as a naive UTC datetime
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from json import dumps
+
+from six import string_types
+from voluptuous import Schema, Required, Optional, In, Match, Any
+
+from pybitbucket.bitbucket import PayloadBuilder, Enum
+
+
+class QueryOperator(Enum):
+    EQUAL = '='
+    NOT_EQUAL = '!='
+    CONTAINS = '~'
+    NOT_CONTAINS = '!~'
+    GREATER = '>'
+    GREATER_OR_EQUAL = '>='
+    LESS = '<'
+    LESS_OR_EQUAL = '<='
+
+
+TIMESTAMP = re.compile(
+    r'^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d+))?'
+    r'(Z|[+-]\d{2}:?\d{2})?$')
+
+
+def parse_datetime(text):
+    """
+    Read an ISO-8601 timestamp, like the updated_on of a resource,
+    as a naive datetime in UTC.
+    The result can be compared and used as a value in a query.
+    """
+    match = TIMESTAMP.match(text)
+    if match is None:
+        raise ValueError('{0} is not an ISO-8601 timestamp'.format(text))
+    fraction = (match.group(7) or '0')[:6].ljust(6, '0')
+    moment = datetime(*[int(g) for g in match.groups()[:6]] + [int(fraction)])
+    offset = match.group(8)
+    if offset and offset != 'Z':
+        sign = -1 if offset[0] == '-' else 1
+        moment -= sign * timedelta(
+            hours=int(offset[1:3]),
+            minutes=int(offset[-2:]))
+    return moment
+
+
+ATTRIBUTE_PATH = r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$'
+
+condition_schema = Schema({
+    Required('field'): Match(ATTRIBUTE_PATH),
+    Required('operator'): In([o.value for o in QueryOperator]),
+    Required('value'): Any(
+        None, bool, int, float, datetime, date, *string_types),
+})
+
+
+class QueryBuilder(PayloadBuilder):
+    """
+    A builder object to help create the q and sort parameters
+    of a paginated finder.
+
+    All conditions must hold for a resource to be returned.
+    Use add_any_of for alternatives on one attribute.
+    """
+
+    schema = Schema({
+        Optional('conditions'): [Any(
+            condition_schema,
+            {Required('any'): [condition_schema]})],
+        Optional('sort'): Match(r'^-?' + ATTRIBUTE_PATH[1:]),
+    })
+
+    @staticmethod
+    def make_condition(field, operator, value):
+        if isinstance(value, Enum):
+            value = value.value
+        return {
+            'field': field,
+            'operator': QueryOperator(operator).value,
+            'value': value}
+
+    @staticmethod
+    def format_value(value):
+        if value is None:
+            return 'null'
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if isinstance(value, (int, float)):
+            return repr(value)
+        if isinstance(value, (datetime, date)):
+            # Bitbucket compares unquoted ISO-8601 values as dates.
+            return value.isoformat()
+        return dumps(value)
+
+    @staticmethod
+    def format_condition(condition):
+        return '{field} {operator} {value}'.format(
+            field=condition['field'],
+            operator=condition['operator'],
+            value=QueryBuilder.format_value(condition['value']))
+
+    def add_condition(self, field, operator, value):
+        new = self._payload.copy()
+        conditions = self.copy_of(self._payload.get('conditions', []))
+        conditions.append(QueryBuilder.make_condition(field, operator, value))
+        new['conditions'] = conditions
+        return QueryBuilder(payload=new)
+
+    def add_any_of(self, field, values, operator=QueryOperator.EQUAL):
+        new = self._payload.copy()
+        conditions = self.copy_of(self._payload.get('conditions', []))
+        conditions.append({
+            'any': [
+                QueryBuilder.make_condition(field, operator, value)
+                for value in values]})
+        new['conditions'] = conditions
+        return QueryBuilder(payload=new)
+
+    def add_updated_since(self, since):
+        return self.add_condition(
+            'updated_on', QueryOperator.GREATER, since)
+
+    def add_sort(self, field, descending=False):
+        new = self._payload.copy()
+        new['sort'] = ('-' if descending else '') + field
+        return QueryBuilder(payload=new)
+
+    def build(self):
+        """
+        The keyword arguments for a paginated finder,
+        like `find_pullrequests_for_repository_by_state(**query.build())`.
+        """
+        clauses = []
+        for condition in self._payload.get('conditions', []):
+            if 'any' in condition:
+                clauses.append('(' + ' OR '.join(
+                    QueryBuilder.format_condition(c)
+                    for c in condition['any']) + ')')
+            else:
+                clauses.append(QueryBuilder.format_condition(condition))
+        parameters = {}
+        if clauses:
+            parameters['q'] = ' AND '.join(clauses)
+        if self._payload.get('sort'):
+            parameters['sort'] = self._payload['sort']
+        return parameters
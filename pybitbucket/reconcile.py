@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Brings the same policy to many repositories with as few calls as possible.
+
+A reconciler lists the current resources of each repository once,
+compares them with the desired payloads by key,
+and only creates, modifies or deletes what differs.
+Repositories are reconciled concurrently, with a bounded pool of threads,
+and the calls can be spaced and retried with a RateLimit.
+
+Example, to check a policy without changing anything:
+
+    reconciler = BranchRestrictionReconciler([
+        BranchRestrictionPayload()
+            .add_kind(BranchRestrictionKind.PUSH)
+            .add_pattern('master')
+            .add_users_from_usernames(['release-manager']),
+        BranchRestrictionPayload()
+            .add_kind(BranchRestrictionKind.FORCE)
+            .add_pattern('master'),
+    ], client=client)
+    for result in reconciler.reconcile(full_names, dry_run=True):
+        print(result.repository, result.seconds, result.changes)
+    print(reconciler.errors)
+
+Or to review the changes first and apply them later:
+
+    reconciler = HookReconciler([
+        HookPayload()
+            .add_description('Continuous integration')
+            .add_callback_url('https://ci.example.com/hook')
+            .add_events([HookEvent.REPOSITORY_PUSH])
+            .activate(),
+    ], client=client, rate_limit=RateLimit(calls_per_second=5))
+    plans = [plan for plan in reconciler.plan_all(full_names) if plan.changes]
+    results = list(reconciler.apply_all(plans))
+
+Classes:
+- Reconciler: plans and applies the changes, for any kind of resource
+- BranchRestrictionReconciler: reconciles branch restrictions
+- HookReconciler: reconciles webhooks
+- RateLimit: spaces the calls and retries those rejected as too many
+- Change: one resource to create, modify or delete
+- ReconcileResult: the changes for one repository and how long it took
+"""
+
+import abc
+from collections import namedtuple
+from threading import Lock
+import time
+
+from requests import codes
+from requests.exceptions import HTTPError
+from six import add_metaclass
+
+from pybitbucket.bitbucket import Client
+from pybitbucket.branchrestriction import BranchRestriction
+from pybitbucket.fanout import FanOut
+from pybitbucket.hook import Hook
+from pybitbucket.repository import full_name_of, split_full_name
+
+
+CREATE = 'create'
+MODIFY = 'modify'
+DELETE = 'delete'
+
+Change = namedtuple('Change', ['action', 'key', 'current', 'desired'])
+ReconcileResult = namedtuple(
+    'ReconcileResult',
+    ['repository', 'changes', 'applied', 'seconds'])
+
+
+class RateLimit(object):
+    """
+    Spaces the calls of every thread, and retries the calls
+    that Bitbucket rejects with 429 Too Many Requests.
+    After a rejection, no thread calls again before the Retry-After delay,
+    or an exponential backoff when there is none.
+
+    :param calls_per_second: the most calls to start in a second.
+        If not provided, calls are only held back after a rejection.
+    :type calls_per_second: float
+    :param retries: the number of times a rejected call is retried.
+    :type retries: int
+    :param backoff: the seconds to wait after the first rejection,
+        doubled after each one.
+    :type backoff: float
+    """
+
+    def __init__(
+            self,
+            calls_per_second=None,
+            retries=3,
+            backoff=1.0,
+            sleep=time.sleep):
+        self.interval = 1.0 / calls_per_second if calls_per_second else 0
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.lock = Lock()
+        self.next_call = 0
+        self.rejected = 0
+
+    def wait(self):
+        """Wait for the turn of the calling thread."""
+        with self.lock:
+            now = time.time()
+            start = max(now, self.next_call)
+            self.next_call = start + self.interval
+        if start > now:
+            self.sleep(start - now)
+
+    def hold(self, seconds):
+        """Hold back every call for some seconds."""
+        with self.lock:
+            self.rejected += 1
+            self.next_call = max(self.next_call, time.time() + seconds)
+
+    @staticmethod
+    def retry_after(response):
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+
+    def call(self, function, *args, **kwargs):
+        for attempt in range(self.retries + 1):
+            self.wait()
+            try:
+                return function(*args, **kwargs)
+            except HTTPError as e:
+                response = e.response
+                if (response is None or
+                        response.status_code != codes.too_many_requests or
+                        attempt == self.retries):
+                    raise
+                delay = self.retry_after(response)
+                self.hold(
+                    self.backoff * 2 ** attempt
+                    if delay is None
+                    else delay)
+
+
+@add_metaclass(abc.ABCMeta)
+class Reconciler(object):
+    """
+    Reconciles one kind of resource across repositories.
+
+    Subclasses must define how to find, key, compare, create
+    and modify the resources, or they cannot be instantiated.
+    Resources are deleted with their delete method.
+
+    :param desired: the payloads every repository should have,
+        or a function of the repository full name that returns them.
+    :type desired: list or function
+    :param client: the configured connection to Bitbucket.
+    :type client: bitbucket.Client
+    :param workers: the number of repositories reconciled at a time.
+    :type workers: int
+    :param prune: when true, the resources not desired are deleted.
+    :type prune: bool
+    :param rate_limit: spaces and retries the calls to Bitbucket.
+    :type rate_limit: RateLimit
+    """
+
+    def __init__(
+            self,
+            desired,
+            client=None,
+            workers=8,
+            prune=True,
+            rate_limit=None):
+        self.desired = desired
+        self.client = client or Client.default()
+        self.workers = workers
+        self.prune = prune
+        self.rate_limit = rate_limit
+        self.errors = []
+
+    @abc.abstractmethod
+    def find(self, owner, repository_name):
+        """The current resources of a repository."""
+
+    @abc.abstractmethod
+    def key_of_resource(self, resource):
+        """What identifies a current resource among the desired ones."""
+
+    @abc.abstractmethod
+    def key_of_payload(self, payload):
+        """What identifies a desired payload among the current ones."""
+
+    @abc.abstractmethod
+    def differs(self, resource, payload):
+        """Whether a current resource must be modified to the payload."""
+
+    @abc.abstractmethod
+    def create(self, payload, owner, repository_name):
+        """Create the resource of a payload in a repository."""
+
+    @abc.abstractmethod
+    def modify(self, resource, payload):
+        """Modify a current resource to the payload."""
+
+    def delete(self, resource):
+        resource.delete()
+
+    def call(self, function, *args, **kwargs):
+        if self.rate_limit is None:
+            return function(*args, **kwargs)
+        return self.rate_limit.call(function, *args, **kwargs)
+
+    def desired_for(self, repository):
+        if callable(self.desired):
+            return self.desired(repository)
+        return self.desired
+
+    def plan(self, repository):
+        """
+        The changes that bring a repository to the desired state.
+        The current resources are listed once.
+
+        :param repository: the full name of the repository.
+        :type repository: str
+        """
+        owner, repository_name = split_full_name(repository)
+        current = {}
+        extra = []
+        resources = self.call(
+            lambda: list(self.find(owner, repository_name)))
+        for resource in resources:
+            key = self.key_of_resource(resource)
+            if key in current:
+                # Only one resource is kept for a key.
+                extra.append(resource)
+            else:
+                current[key] = resource
+        changes = []
+        desired_keys = set()
+        for payload in self.desired_for(repository):
+            key = self.key_of_payload(payload)
+            desired_keys.add(key)
+            resource = current.get(key)
+            if resource is None:
+                changes.append(Change(CREATE, key, None, payload))
+            elif self.differs(resource, payload):
+                changes.append(Change(MODIFY, key, resource, payload))
+        if self.prune:
+            changes.extend(
+                Change(DELETE, key, resource, None)
+                for (key, resource) in current.items()
+                if key not in desired_keys)
+            changes.extend(
+                Change(DELETE, self.key_of_resource(resource), resource, None)
+                for resource in extra)
+        return changes
+
+    def apply(self, repository, changes):
+        """Make the changes planned for a repository, in order."""
+        owner, repository_name = split_full_name(repository)
+        for change in changes:
+            if change.action == CREATE:
+                self.call(self.create, change.desired, owner, repository_name)
+            elif change.action == MODIFY:
+                self.call(self.modify, change.current, change.desired)
+            else:
+                self.call(self.delete, change.current)
+
+    def reconcile_repository(self, repository, dry_run=False):
+        repository = full_name_of(repository)
+        started = time.time()
+        changes = self.plan(repository)
+        if not dry_run:
+            self.apply(repository, changes)
+        return ReconcileResult(
+            repository,
+            changes,
+            not dry_run,
+            time.time() - started)
+
+    def apply_plan(self, plan):
+        started = time.time()
+        self.apply(plan.repository, plan.changes)
+        return plan._replace(applied=True, seconds=time.time() - started)
+
+    def run(self, function, items):
+        fanout = FanOut(function, workers=self.workers)
+        for result in fanout.results(items):
+            yield result.value
+        self.errors = fanout.errors
+
+    def reconcile(self, repositories, dry_run=False):
+        """
+        Generate a ReconcileResult for each repository, as they complete.
+        The error of a repository is added to errors
+        and does not stop the others.
+
+        :param repositories: full names or Repository objects.
+        :type repositories: iterable
+        :param dry_run: when true, plan the changes without making them.
+        :type dry_run: bool
+        """
+        return self.run(
+            lambda r: self.reconcile_repository(r, dry_run=dry_run),
+            repositories)
+
+    def plan_all(self, repositories):
+        """
+        Generate the plan of each repository, as a ReconcileResult
+        that is not applied, to be reviewed before apply_all.
+        """
+        return self.run(
+            lambda r: self.reconcile_repository(r, dry_run=True),
+            repositories)
+
+    def apply_all(self, plans):
+        """
+        Apply the plans made by plan_all,
+        and generate a ReconcileResult for each one that had changes.
+        """
+        return self.run(self.apply_plan, (p for p in plans if p.changes))
+
+
+class BranchRestrictionReconciler(Reconciler):
+    """
+    Reconciles branch restrictions, keyed on their kind and pattern.
+    A restriction is modified when its users or groups differ.
+    """
+
+    def find(self, owner, repository_name):
+        return BranchRestriction.find_branchrestrictions_for_repository(
+            repository_name,
+            owner=owner,
+            client=self.client)
+
+    @staticmethod
+    def key_of(data):
+        kind = data.get('kind')
+        return (getattr(kind, 'value', kind), data.get('pattern'))
+
+    @staticmethod
+    def state_of(data):
+        return (
+            frozenset(
+                user['username']
+                for user in data.get('users') or []),
+            frozenset(
+                (group['owner']['username'], group['slug'])
+                for group in data.get('groups') or []))
+
+    def key_of_resource(self, resource):
+        return self.key_of(resource.data)
+
+    def key_of_payload(self, payload):
+        return self.key_of(payload.build())
+
+    def differs(self, resource, payload):
+        return self.state_of(resource.data) != self.state_of(payload.build())
+
+    def create(self, payload, owner, repository_name):
+        return BranchRestriction.create(
+            payload,
+            repository_name=repository_name,
+            owner=owner,
+            client=self.client)
+
+    def modify(self, resource, payload):
+        return resource.modify(payload)
+
+
+class HookReconciler(Reconciler):
+    """
+    Reconciles webhooks, keyed on their URL.
+    A hook is updated when a field of the payload that Bitbucket returns
+    differs, its events being compared as a set.
+    Hooks with other URLs belong to other integrations,
+    so they are only deleted with prune.
+    """
+
+    def __init__(
+            self,
+            desired,
+            client=None,
+            workers=8,
+            prune=False,
+            rate_limit=None):
+        super(HookReconciler, self).__init__(
+            desired,
+            client=client,
+            workers=workers,
+            prune=prune,
+            rate_limit=rate_limit)
+
+    def find(self, owner, repository_name):
+        return Hook.find_hooks_for_repository(
+            repository_name,
+            owner=owner,
+            client=self.client)
+
+    def key_of_resource(self, resource):
+        return resource.data.get('url')
+
+    def key_of_payload(self, payload):
+        return payload.build().get('url')
+
+    @staticmethod
+    def comparable(name, value):
+        value = getattr(value, 'value', value)
+        if name == 'events':
+            return frozenset(getattr(e, 'value', e) for e in value or [])
+        return value
+
+    def differs(self, resource, payload):
+        # Bitbucket does not echo every field of the payload back,
+        # like skip_cert_verification: those are not compared.
+        return any(
+            self.comparable(name, value) !=
+            self.comparable(name, resource.data[name])
+            for (name, value) in payload.build().items()
+            if name in resource.data)
+
+    def create(self, payload, owner, repository_name):
+        return Hook.create(
+            payload,
+            repository_name=repository_name,
+            owner=owner,
+            client=self.client)
+
+    def modify(self, resource, payload):
+        return resource.update(payload)
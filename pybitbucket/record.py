@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Compact read-only records of resources, for listings and analytics.
+
+A resource keeps its raw data, a copy of it in its attributes,
+a bound method for each link, and objects for the resources it embeds.
+A Record keeps only the fields listed by the record_fields of its type,
+in slots, and its links.
+The values are kept as they were in the JSON,
+so an embedded author is a dict, not a User.
+The relationships are bound when they are used.
+
+Example, to list the titles and states of many pull requests:
+
+    for pr in client.get_bitbucket().repositoryPullRequestsInState(
+            owner='teamsinspace', repository_name='api', records=True):
+        print(pr.id, pr.title, pr.state)
+    full = pr.to_resource()
+
+Classes:
+- Record: the parent class of the records of each resource type
+
+Functions:
+- record_class: the Record class of a resource type, made once
+"""
+
+from functools import partial
+from threading import Lock
+
+from pybitbucket.bitbucket import BitbucketBase, BitbucketSpecialAction
+
+
+# The links that are actions, not relationships to follow.
+special_actions = frozenset(a.value for a in BitbucketSpecialAction)
+
+
+class Record(object):
+    """
+    The fields of one resource, read-only by convention.
+    Only its fields can be set.
+
+    :param data: the JSON of the resource.
+    :type data: dict
+    :param client: the configured connection to Bitbucket.
+    :type client: bitbucket.Client
+    """
+    __slots__ = ('client', 'links')
+    resource_type = None
+    fields = ()
+
+    def __init__(self, data, client=None):
+        # The slots are set directly, without checking each name.
+        initialize = object.__setattr__
+        initialize(self, 'client', client)
+        initialize(self, 'links', data.get('links'))
+        for name in self.fields:
+            initialize(self, name, data.get(name))
+
+    def __setattr__(self, name, value):
+        if name not in self.fields and name not in Record.__slots__:
+            raise AttributeError(
+                '{0} has no field {1}; its fields are: {2}'.format(
+                    type(self).__name__, name, ', '.join(self.fields)))
+        object.__setattr__(self, name, value)
+
+    def __getattr__(self, name):
+        # Only called for a name that is neither a field nor a method.
+        href = (
+            self.links.get(name, {}).get('href')
+            if isinstance(self.links, dict) and name not in special_actions
+            else None)
+        if href is None:
+            raise AttributeError(name)
+        return partial(self.client.remote_relationship, template=href)
+
+    def attributes(self):
+        return list(self.fields)
+
+    def relationships(self):
+        return [
+            name
+            for (name, _) in BitbucketBase.links_from({'links': self.links})
+            if name not in special_actions]
+
+    def to_dict(self):
+        """The data of the record, with only its fields and links."""
+        data = dict(
+            (name, getattr(self, name))
+            for name in self.fields
+            if getattr(self, name) is not None)
+        if self.links is not None:
+            data['links'] = self.links
+        return data
+
+    def to_resource(self):
+        """
+        A full resource object from the fields of the record.
+        For every attribute Bitbucket has, follow its self relationship.
+        """
+        return self.resource_type(self.to_dict(), client=self.client)
+
+    def __repr__(self):
+        return '{0}({1})'.format(
+            type(self).__name__,
+            ', '.join(
+                '{0}={1!r}'.format(name, getattr(self, name))
+                for name in self.fields
+                if name == self.resource_type.id_attribute))
+
+
+record_classes = {}
+record_classes_lock = Lock()
+
+
+def record_class(resource_type):
+    """
+    The Record class of a resource type,
+    with a slot for each of its record_fields.
+    """
+    cls = record_classes.get(resource_type)
+    if cls is None:
+        fields = tuple(
+            name
+            for name in resource_type.record_fields
+            if name not in Record.__slots__)
+        with record_classes_lock:
+            cls = record_classes.setdefault(resource_type, type(
+                str(resource_type.__name__ + 'Record'),
+                (Record,),
+                {
+                    '__slots__': fields,
+                    'fields': fields,
+                    'resource_type': resource_type,
+                }))
+    return cls
@@ -11,7 +11,7 @@ Classes:
 - Tag: represents the tag resource that references a specific commit
 - Branch: represents the branch resource that references a set of commits
 """
-from pybitbucket.bitbucket import Bitbucket, BitbucketBase, Client
+from pybitbucket.bitbucket import BitbucketBase, Client
 
 
 class Ref(BitbucketBase):
@@ -26,18 +26,26 @@ class Ref(BitbucketBase):
     def find_refs_in_repository(
             owner,
             repository_name,
-            client=Client()):
+            client=None,
+            fields=None,
+            q=None,
+            sort=None):
         """
         A convenience method for finding refs in a repository.
         The method is a generator Ref subtypes of Tag and Branch.
         """
-        return Bitbucket(client=client).repositoryRefs(
+        client = client or Client.default()
+        return client.get_bitbucket().repositoryRefs(
             owner=owner,
-            repository_name=repository_name)
+            repository_name=repository_name,
+            fields=fields,
+            q=q,
+            sort=sort)
 
 
 class Tag(Ref):
     resource_type = 'tags'
+    record_fields = ('name', 'target', 'type')
 
     @staticmethod
     def is_type(data):
@@ -47,37 +55,48 @@ class Tag(Ref):
     def find_tags_in_repository(
             repository_name,
             owner=None,
-            client=Client()):
+            client=None,
+            fields=None,
+            q=None,
+            sort=None):
         """
         A convenience method for finding tags in a repository.
         The method is a generator Tag objects.
         """
+        client = client or Client.default()
         owner = owner or client.get_username()
-        return Bitbucket(client=client).repositoryTags(
+        return client.get_bitbucket().repositoryTags(
             owner=owner,
-            repository_name=repository_name)
+            repository_name=repository_name,
+            fields=fields,
+            q=q,
+            sort=sort)
 
     @staticmethod
     def find_tag_by_ref_name_in_repository(
             ref_name,
             repository_name,
             owner=None,
-            client=Client()):
+            client=None,
+            fields=None):
         """
         A convenience method for finding a specific tag.
         In contrast to the pure hypermedia driven method on the Bitbucket
         class, this method returns a Tag object, instead of the
         generator.
         """
+        client = client or Client.default()
         owner = owner or client.get_username()
-        return next(Bitbucket(client=client).repositoryTagByName(
+        return next(client.get_bitbucket().repositoryTagByName(
             owner=owner,
             repository_name=repository_name,
-            ref_name=ref_name))
+            ref_name=ref_name,
+            fields=fields))
 
 
 class Branch(Ref):
     resource_type = 'branches'
+    record_fields = ('name', 'target', 'type')
 
     @staticmethod
     def is_type(data):
@@ -87,33 +106,43 @@ class Branch(Ref):
     def find_branches_in_repository(
             repository_name,
             owner=None,
-            client=Client()):
+            client=None,
+            fields=None,
+            q=None,
+            sort=None):
         """
         A convenience method for finding branches in a repository.
         The method is a generator Branch objects.
         """
+        client = client or Client.default()
         owner = owner or client.get_username()
-        return Bitbucket(client=client).repositoryBranches(
+        return client.get_bitbucket().repositoryBranches(
             owner=owner,
-            repository_name=repository_name)
+            repository_name=repository_name,
+            fields=fields,
+            q=q,
+            sort=sort)
 
     @staticmethod
     def find_branch_by_ref_name_in_repository(
             ref_name,
             repository_name,
             owner=None,
-            client=Client()):
+            client=None,
+            fields=None):
         """
         A convenience method for finding a specific branch.
         In contrast to the pure hypermedia driven method on the Bitbucket
         class, this method returns a Branch object, instead of the
         generator.
         """
+        client = client or Client.default()
         owner = owner or client.get_username()
-        return next(Bitbucket(client=client).repositoryBranchByName(
+        return next(client.get_bitbucket().repositoryBranchByName(
             owner=owner,
             repository_name=repository_name,
-            ref_name=ref_name))
+            ref_name=ref_name,
+            fields=fields))
 
 
 Client.bitbucket_types.add(Ref)
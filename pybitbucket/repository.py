@@ -14,15 +14,37 @@ Classes:
 - Repository: represents a repository
 - RepositoryAdapter: a bridge between 1.0 and 2.0 API representations
 - RepositoryV1: represents a repository in the 1.0 API
+
+Functions:
+- full_name_of: the full name of a repository or of its full name
+- split_full_name: the owner and name of a repository
 """
 from uritemplate import expand
 from voluptuous import Schema, Required, Optional, In
 
 from pybitbucket.bitbucket import (
-    Bitbucket, BitbucketBase, Client, PayloadBuilder, RepositoryType, Enum)
+    BitbucketBase, Client, PayloadBuilder, RepositoryType, Enum)
 from pybitbucket.user import User
 
 
+def full_name_of(repository):
+    """The full name of a Repository, or the full name itself."""
+    return getattr(repository, 'full_name', repository)
+
+
+def split_full_name(repository):
+    """
+    The owner and name of a Repository, or of a full name like owner/name.
+
+    :raises: ValueError when the full name has no owner.
+    """
+    full_name = full_name_of(repository)
+    if '/' not in full_name:
+        raise ValueError(
+            "Repository full name must be in the form: username/name")
+    return full_name.split('/', 1)
+
+
 class RepositoryRole(Enum):
     OWNER = 'owner'
     ADMIN = 'admin'
@@ -143,6 +165,12 @@ class Repository(BitbucketBase):
 
     id_attribute = 'full_name'
     resource_type = 'repositories'
+    record_fields = (
+        'full_name', 'name', 'uuid', 'owner', 'description', 'is_private',
+        'scm', 'language', 'size', 'fork_policy', 'has_issues', 'has_wiki',
+        'mainbranch', 'parent', 'project', 'website', 'created_on',
+        'updated_on', 'type',
+    )
     templates = {
         'create': (
             '{+bitbucket_url}' +
@@ -160,7 +188,7 @@ class Repository(BitbucketBase):
         return Repository.has_v2_self_url(data)
 
     def __init__(self, data, client=None):
-        client = client or Client()
+        client = client or Client.default()
         super(Repository, self).__init__(data, client=client)
         if data.get('links', {}).get('clone'):
             self.clone = {
@@ -195,12 +223,12 @@ class Repository(BitbucketBase):
         :rtype: Repository
         :raises: ValueError
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or client.get_username()
         repository_name = repository_name or payload.name
         if not (owner and repository_name):
             raise ValueError('owner and repository_name are required')
-        json = payload.validate().build()
+        json = payload.validated()
         api_url = expand(
             cls.templates['create'], {
                 'bitbucket_url': client.get_bitbucket_url(),
@@ -233,12 +261,12 @@ class Repository(BitbucketBase):
         :rtype: Repository
         :raises: ValueError
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or client.get_username()
         repository_name = repository_name or payload.name
         if not (owner and repository_name):
             raise ValueError('owner and repository_name are required')
-        data = payload.validate().build()
+        data = payload.validated()
         api_url = expand(
             cls.templates['fork'], {
                 'bitbucket_url': client.get_bitbucket_url(),
@@ -251,7 +279,8 @@ class Repository(BitbucketBase):
     def find_repository_by_name_and_owner(
             repository_name,
             owner=None,
-            client=None):
+            client=None,
+            fields=None):
         """
         A convenience method for finding a specific repository.
         In contrast to the pure hypermedia driven method on the Bitbucket
@@ -267,18 +296,22 @@ class Repository(BitbucketBase):
         :param client: the configured connection to Bitbucket.
             If not provided, assumes an Anonymous connection.
         :type client: bitbucket.Client
+        :param fields: the attributes to request for a partial response.
+            If not provided, the full repository is returned.
+        :type fields: list
         :returns: the specific repository object.
         :rtype: Repository
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or client.get_username()
         return next(
-            Bitbucket(client=client).repositoryByOwnerAndRepositoryName(
+            client.get_bitbucket().repositoryByOwnerAndRepositoryName(
                 owner=owner,
-                repository_name=repository_name))
+                repository_name=repository_name,
+                fields=fields))
 
     @staticmethod
-    def find_repository_by_full_name(full_name, client=None):
+    def find_repository_by_full_name(full_name, client=None, fields=None):
         """
         A convenience method for finding a specific repository.
         In contrast to the pure hypermedia driven method on the Bitbucket
@@ -291,11 +324,14 @@ class Repository(BitbucketBase):
         :param client: the configured connection to Bitbucket.
             If not provided, assumes an Anonymous connection.
         :type client: bitbucket.Client
+        :param fields: the attributes to request for a partial response.
+            If not provided, the full repository is returned.
+        :type fields: list
         :returns: the specific repository object.
         :rtype: Repository
         :raises: TypeError
         """
-        client = client or Client()
+        client = client or Client.default()
         if '/' not in full_name:
             raise TypeError(
                 "Repository full name must be in the form: username/name")
@@ -303,10 +339,15 @@ class Repository(BitbucketBase):
         return Repository.find_repository_by_name_and_owner(
             owner=owner,
             repository_name=repository_name,
-            client=client)
+            client=client,
+            fields=fields)
 
     @staticmethod
-    def find_public_repositories(client=None):
+    def find_public_repositories(
+            client=None,
+            fields=None,
+            q=None,
+            sort=None):
         """
         A convenience method for finding public repositories.
         The method is a generator Repository objects.
@@ -314,17 +355,31 @@ class Repository(BitbucketBase):
         :param client: the configured connection to Bitbucket.
             If not provided, assumes an Anonymous connection.
         :type client: bitbucket.Client
+        :param fields: the attributes to request for a partial response.
+            If not provided, the full repositories are returned.
+        :type fields: list
+        :param q: a filter expression evaluated by Bitbucket.
+            See pybitbucket.query.QueryBuilder.
+        :type q: str
+        :param sort: the attribute to sort by, prefixed by - to reverse.
+        :type sort: str
         :returns: an iterator over all public repositories.
         :rtype: iterator
         """
-        client = client or Client()
-        return Bitbucket(client=client).repositoriesThatArePublic()
+        client = client or Client.default()
+        return client.get_bitbucket().repositoriesThatArePublic(
+            fields=fields,
+            q=q,
+            sort=sort)
 
     @staticmethod
     def find_repositories_by_owner_and_role(
             owner=None,
             role=RepositoryRole.OWNER,
-            client=None):
+            client=None,
+            fields=None,
+            q=None,
+            sort=None):
         """
         A convenience method for finding a user's repositories.
         The method is a generator Repository objects.
@@ -339,22 +394,33 @@ class Repository(BitbucketBase):
         :param client: the configured connection to Bitbucket.
             If not provided, assumes an Anonymous connection.
         :type client: bitbucket.Client
+        :param fields: the attributes to request for a partial response.
+            If not provided, the full repositories are returned.
+        :type fields: list
+        :param q: a filter expression evaluated by Bitbucket.
+            See pybitbucket.query.QueryBuilder.
+        :type q: str
+        :param sort: the attribute to sort by, prefixed by - to reverse.
+        :type sort: str
         :returns: an iterator over all public repositories.
         :rtype: iterator
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or client.get_username()
         RepositoryRole(role)
-        return Bitbucket(client=client).repositoriesByOwnerAndRole(
+        return client.get_bitbucket().repositoriesByOwnerAndRole(
             owner=owner,
-            role=role)
+            role=role,
+            fields=fields,
+            q=q,
+            sort=sort)
 
 
 class RepositoryAdapter(object):
     """A bridge between 1.0 and 2.0 API representations."""
 
     def __init__(self, data, client=None):
-        self.client = client or Client()
+        self.client = client or Client.default()
         if data.get('full_name') is None:
             # A 1.0 shape has simple owner and name attributes.
             self.owner_name = data.get('owner')
@@ -432,7 +498,7 @@ class RepositoryV1(BitbucketBase):
             (data.get('slug') is not None))
 
     def __init__(self, data, client=None):
-        client = client or Client()
+        client = client or Client.default()
         super(RepositoryV1, self).__init__(data, client)
         self.v2 = RepositoryAdapter(data, client)
         # TODO: Repository src and wiki links are broken.
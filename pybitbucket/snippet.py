@@ -15,7 +15,7 @@ from uritemplate import expand
 from voluptuous import Schema, Optional, In
 
 from pybitbucket.bitbucket import (
-    Bitbucket, BitbucketBase, Client, PayloadBuilder, RepositoryType, Enum)
+    BitbucketBase, Client, PayloadBuilder, RepositoryType, Enum)
 
 
 def open_files(filelist):
@@ -86,6 +86,10 @@ class Snippet(BitbucketBase):
 
     id_attribute = 'id'
     resource_type = 'snippets'
+    record_fields = (
+        'id', 'title', 'is_private', 'scm', 'owner', 'creator', 'created_on',
+        'updated_on', 'type',
+    )
     templates = {
         'create': '{+bitbucket_url}/2.0/snippets'
     }
@@ -116,7 +120,8 @@ class Snippet(BitbucketBase):
         is_v2 = (Snippet.resource_type == url_path[position])
         return is_v2
 
-    def __init__(self, data, client=Client()):
+    def __init__(self, data, client=None):
+        client = client or Client.default()
         super(Snippet, self).__init__(data, client=client)
         if data.get('files'):
             self.filenames = [str(f) for f in data['files']]
@@ -137,9 +142,9 @@ class Snippet(BitbucketBase):
         :rtype: BuildStatus
         :raises: ValueError
         """
-        client = client or Client()
+        client = client or Client.default()
         payload = payload or SnippetPayload()
-        json = payload.validate().build()
+        json = payload.validated()
         api_url = expand(
             cls.templates['create'], {
                 'bitbucket_url': client.get_bitbucket_url(),
@@ -154,7 +159,7 @@ class Snippet(BitbucketBase):
         """
         files = files or open_files([])
         payload = payload or SnippetPayload()
-        json = payload.validate().build()
+        json = payload.validated()
         return self.put(json=json, files=files)
 
     def content(self, filename):
@@ -170,7 +175,12 @@ class Snippet(BitbucketBase):
         return response.content
 
     @staticmethod
-    def find_snippets_for_role(role=SnippetRole.OWNER, client=None):
+    def find_snippets_for_role(
+            role=SnippetRole.OWNER,
+            client=None,
+            fields=None,
+            q=None,
+            sort=None):
         """
         A convenience method for finding snippets by the user's role.
         The method is a generator Snippet objects.
@@ -181,15 +191,27 @@ class Snippet(BitbucketBase):
         :param client: the configured connection to Bitbucket.
             If not provided, assumes an Anonymous connection.
         :type client: bitbucket.Client
+        :param fields: the attributes to request for a partial response.
+            If not provided, the full snippets are returned.
+        :type fields: list
+        :param q: a filter expression evaluated by Bitbucket.
+            See pybitbucket.query.QueryBuilder.
+        :type q: str
+        :param sort: the attribute to sort by, prefixed by - to reverse.
+        :type sort: str
         :returns: an iterator over the selected snippets.
         :rtype: iterator
         """
-        client = client or Client()
+        client = client or Client.default()
         SnippetRole(role)
-        return Bitbucket(client=client).snippetsForRole(role=role)
+        return client.get_bitbucket().snippetsForRole(
+            role=role,
+            fields=fields,
+            q=q,
+            sort=sort)
 
     @staticmethod
-    def find_snippet_by_id_and_owner(id, owner=None, client=None):
+    def find_snippet_by_id_and_owner(id, owner=None, client=None, fields=None):
         """
         A convenience method for finding a specific snippet.
         In contrast to the pure hypermedia driven method on the Bitbucket
@@ -204,14 +226,18 @@ class Snippet(BitbucketBase):
         :param client: the configured connection to Bitbucket.
             If not provided, assumes an Anonymous connection.
         :type client: bitbucket.Client
+        :param fields: the attributes to request for a partial response.
+            If not provided, the full snippet is returned.
+        :type fields: list
         :returns: the snippet referenced by the id.
         :rtype: bitbucket.Snippet
         """
-        client = client or Client()
+        client = client or Client.default()
         owner = owner or client.get_username()
-        return next(Bitbucket(client=client).snippetByOwnerAndSnippetId(
+        return next(client.get_bitbucket().snippetByOwnerAndSnippetId(
             owner=owner,
-            snippet_id=id))
+            snippet_id=id,
+            fields=fields))
 
 
 Client.bitbucket_types.add(Snippet)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Incrementally synchronizes pull requests into a local store.
+
+Each repository has a high-water mark: the newest updated_on seen.
+A sync asks Bitbucket for pull requests sorted by -updated_on,
+newer than the watermark, and stops paging as soon as it reaches it.
+So each poll costs in proportion to what changed,
+not to the number of pull requests.
+
+Classes:
+- PullRequestStore: an in-memory store of pull requests and watermarks
+- PullRequestSync: streams the pull requests changed since the last sync
+"""
+
+from pybitbucket.bitbucket import Client
+from pybitbucket.pullrequest import PullRequest, PullRequestState
+from pybitbucket.query import QueryBuilder, parse_datetime
+from pybitbucket.repository import full_name_of, split_full_name
+
+
+class PullRequestStore(object):
+    """
+    Keeps pull requests and watermarks in memory.
+    Subclass and override the three methods to persist them elsewhere.
+    """
+
+    def __init__(self):
+        self.watermarks = {}
+        self.pullrequests = {}
+
+    def get_watermark(self, repository_full_name):
+        """The updated_on of the newest pull request seen, or None."""
+        return self.watermarks.get(repository_full_name)
+
+    def set_watermark(self, repository_full_name, updated_on):
+        self.watermarks[repository_full_name] = updated_on
+
+    def upsert(self, repository_full_name, pullrequest):
+        self.pullrequests[(repository_full_name, pullrequest.id)] = \
+            pullrequest
+
+
+class PullRequestSync(object):
+    """
+    Streams the pull requests changed since the previous sync,
+    upserting each one into the store as it goes.
+    """
+
+    def __init__(
+            self,
+            client=None,
+            store=None,
+            states=None,
+            fields=None):
+        self.client = client or Client.default()
+        self.store = PullRequestStore() if store is None else store
+        self.states = [
+            PullRequestState(s).value
+            for s in (states or list(PullRequestState))]
+        # A partial response still needs the attributes the sync relies on.
+        if isinstance(fields, (list, tuple)):
+            fields = list(fields) + ['id', 'updated_on']
+        self.fields = fields
+
+    def query_since(self, watermark):
+        query = QueryBuilder().add_sort('updated_on', descending=True)
+        if watermark is not None:
+            query = query.add_updated_since(parse_datetime(watermark))
+        return query.validate().build()
+
+    def changes_for_repository(self, repository):
+        """
+        A generator of the pull requests in one repository
+        updated since its watermark, newest first.
+        The watermark only moves once the generator is exhausted,
+        so a sync that is interrupted is picked up again next time.
+        """
+        full_name = full_name_of(repository)
+        owner, repository_name = split_full_name(full_name)
+        watermark = self.store.get_watermark(full_name)
+        since = None if watermark is None else parse_datetime(watermark)
+        newest = None
+        pullrequests = PullRequest.find_pullrequests_for_repository_by_state(
+            repository_name,
+            owner=owner,
+            state=self.states,
+            client=self.client,
+            fields=self.fields,
+            **self.query_since(watermark))
+        for pullrequest in pullrequests:
+            # The server already filters on updated_on,
+            # but stop at the watermark in case it did not.
+            if since is not None and \
+                    parse_datetime(pullrequest.updated_on) <= since:
+                break
+            newest = newest or pullrequest.updated_on
+            self.store.upsert(full_name, pullrequest)
+            yield pullrequest
+        if newest is not None:
+            self.store.set_watermark(full_name, newest)
+
+    def changes(self, repositories):
+        """
+        A generator of the changed pull requests across repositories.
+        Repositories can be Repository objects or full names.
+        """
+        for repository in repositories:
+            for pullrequest in self.changes_for_repository(repository):
+                yield pullrequest
@@ -6,7 +6,7 @@ from __future__ import unicode_literals
 Provides a class for manipulating Team resources on Bitbucket.
 """
 
-from pybitbucket.bitbucket import Bitbucket, BitbucketBase, Client, Enum
+from pybitbucket.bitbucket import BitbucketBase, Client, Enum
 
 
 class TeamRole(Enum):
@@ -18,30 +18,46 @@ class TeamRole(Enum):
 class Team(BitbucketBase):
     id_attribute = 'username'
     resource_type = 'teams'
+    record_fields = (
+        'username', 'display_name', 'uuid', 'website', 'location',
+        'created_on', 'type',
+    )
 
     @staticmethod
     def is_type(data):
         return (Team.has_v2_self_url(data))
 
     @staticmethod
-    def find_teams_for_role(role=TeamRole.ADMIN, client=Client()):
+    def find_teams_for_role(
+            role=TeamRole.ADMIN,
+            client=None,
+            fields=None,
+            q=None,
+            sort=None):
         """
         A convenience method for finding teams by the user's role.
         The method is a generator Team objects.
         """
+        client = client or Client.default()
         TeamRole(role)
-        return Bitbucket(client=client).teamsForRole(role=role)
+        return client.get_bitbucket().teamsForRole(
+            role=role,
+            fields=fields,
+            q=q,
+            sort=sort)
 
     @staticmethod
-    def find_team_by_username(username, client=Client()):
+    def find_team_by_username(username, client=None, fields=None):
         """
         A convenience method for finding a specific team.
         In contrast to the pure hypermedia driven method on the Bitbucket
         class, this method returns a User object, instead of the
         generator.
         """
-        return next(Bitbucket(client=client).teamByUsername(
-            username=username))
+        client = client or Client.default()
+        return next(client.get_bitbucket().teamByUsername(
+            username=username,
+            fields=fields))
 
 
 Client.bitbucket_types.add(Team)
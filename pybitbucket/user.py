@@ -6,47 +6,56 @@ from __future__ import unicode_literals
 Provides a class for manipulating User resources on Bitbucket.
 """
 
-from pybitbucket.bitbucket import Bitbucket, BitbucketBase, Client
+from pybitbucket.bitbucket import BitbucketBase, Client
 
 
 class User(BitbucketBase):
     id_attribute = 'username'
     resource_type = 'users'
+    record_fields = (
+        'username', 'display_name', 'uuid', 'website', 'location',
+        'created_on', 'type',
+    )
 
     @staticmethod
     def is_type(data):
         return (User.has_v2_self_url(data))
 
-    def __init__(self, data, client=Client()):
+    def __init__(self, data, client=None):
+        client = client or Client.default()
         super(User, self).__init__(data, client=client)
         # Some relationships are only available via the 1.0 API.
         # Create a "mock" UserV1 for those links.
         self.v1 = UserV1(data, client)
 
     @staticmethod
-    def find_current_user(client=Client()):
+    def find_current_user(client=None, fields=None):
         """
         A convenience method for finding the current user.
         In contrast to the pure hypermedia driven method on the Bitbucket
         class, this method returns a User object, instead of the
         generator.
         """
-        return next(Bitbucket(client=client).userForMyself())
+        client = client or Client.default()
+        return next(client.get_bitbucket().userForMyself(fields=fields))
 
     @staticmethod
-    def find_user_by_username(username, client=Client()):
+    def find_user_by_username(username, client=None, fields=None):
         """
         A convenience method for finding a specific user.
         In contrast to the pure hypermedia driven method on the Bitbucket
         class, this method returns a User object, instead of the
         generator.
         """
-        return next(Bitbucket(client=client).userByUsername(
-            username=username))
+        client = client or Client.default()
+        return next(client.get_bitbucket().userByUsername(
+            username=username,
+            fields=fields))
 
 
 class UserAdapter(object):
-    def __init__(self, data, client=Client()):
+    def __init__(self, data, client=None):
+        client = client or Client.default()
         self.client = client
         if data.get('user') is not None:
             # A 1.0 shape has a user container.
@@ -107,7 +116,8 @@ class UserV1(BitbucketBase):
             # Categorize as user, not team
             (data['user'].get('is_team') is False))
 
-    def __init__(self, data, client=Client()):
+    def __init__(self, data, client=None):
+        client = client or Client.default()
         # This completely overrides the base constructor
         # because the user data is a child of the root object.
         self.data = data
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Validates payloads one field at a time, remembering what was valid.
+
+The add methods of a builder copy the previous payload,
+so most of the values of a payload were already in the one before.
+Each Schema of a builder gets one FieldValidator,
+which keeps a bounded memo of the scalar values valid for each field
+and only runs the validators of the fields that are new.
+When a payload is not valid, its Schema is run in full,
+so the errors are the same as without the memo.
+
+Classes:
+- FieldValidator: validates the fields of a payload for one Schema
+
+Functions:
+- validator_for: the FieldValidator of a Schema, compiled once
+"""
+
+from collections import OrderedDict
+from enum import Enum
+from threading import Lock
+
+from six import integer_types, string_types
+from voluptuous import Invalid, Optional, PREVENT_EXTRA, Required, Schema
+
+
+# The values that are remembered, and the lists and dicts made of them.
+remembered_types = string_types + integer_types + (float, bool)
+
+
+def frozen(value):
+    """
+    A hashable snapshot of a value, or None if it cannot be remembered.
+    The type tells apart values that are equal, like 1 and True.
+    """
+    if isinstance(value, Enum):
+        return (type(value), value.value)
+    if isinstance(value, remembered_types):
+        return (type(value), value)
+    if isinstance(value, (dict, list)):
+        items = (
+            sorted(value.items())
+            if isinstance(value, dict)
+            else enumerate(value))
+        parts = []
+        for name, item in items:
+            part = frozen(item)
+            if part is None:
+                return None
+            parts.append((name, part))
+        return (type(value), tuple(parts))
+    return None
+
+
+def memo_key(name, value):
+    """The key of a valid value in the memo, or None to always check it."""
+    value = frozen(value)
+    return None if value is None else (name, value)
+
+
+class FieldValidator(object):
+    """
+    Validates payloads for a Schema of a dict keyed by field names.
+    Any other Schema is run in full every time.
+
+    :param schema: the Schema of the payload.
+    :type schema: voluptuous.Schema
+    :param memo_size: the number of valid values to remember.
+    :type memo_size: int
+    """
+
+    def __init__(self, schema, memo_size=4096):
+        self.schema = schema
+        self.memo_size = memo_size
+        self.memo = OrderedDict()
+        self.lock = Lock()
+        self.fields = {}
+        self.required = set()
+        self.incremental = self.compile()
+
+    def compile(self):
+        """Compile a Schema for each field, if the Schema allows it."""
+        if not isinstance(self.schema.schema, dict):
+            return False
+        if self.schema.extra != PREVENT_EXTRA:
+            return False
+        for key, value in self.schema.schema.items():
+            if not isinstance(key, (Required, Optional)):
+                return False
+            if not isinstance(key.schema, string_types):
+                return False
+            self.fields[key.schema] = Schema(
+                value,
+                required=self.schema.required,
+                extra=self.schema.extra)
+            if isinstance(key, Required):
+                self.required.add(key.schema)
+        return True
+
+    def has_fields(self, payload):
+        return (
+            self.required.issubset(payload) and
+            all(name in self.fields for name in payload))
+
+    def remember(self, key):
+        with self.lock:
+            self.memo[key] = True
+            # Forget the oldest values first.
+            if len(self.memo) > self.memo_size:
+                self.memo.popitem(last=False)
+
+    def validate(self, payload, trusted=False):
+        """
+        Raise MultipleInvalid if the payload is not valid.
+
+        :param trusted: when true, only check that the required fields
+            are there and that there are no others,
+            for payloads made by the add methods of a builder.
+        :type trusted: bool
+        """
+        if not self.incremental:
+            self.schema(payload)
+            return
+        if not self.has_fields(payload):
+            # The Schema may still fill in a default: let it decide.
+            self.schema(payload)
+            return
+        if trusted:
+            return
+        for name, value in payload.items():
+            key = memo_key(name, value)
+            if key is not None and key in self.memo:
+                continue
+            try:
+                self.fields[name](value)
+            except Invalid:
+                # Raise the errors of the whole payload.
+                self.schema(payload)
+                return
+            if key is not None:
+                self.remember(key)
+
+
+# No schema: only the empty payload is valid.
+empty_schema = Schema({})
+
+# The Schemas of the builders are class attributes, so this stays small.
+# The Schema is kept with its validator, so its id is not reused.
+validators = {}
+validators_lock = Lock()
+
+
+def validator_for(schema):
+    """The FieldValidator of a Schema, compiled on first use."""
+    entry = validators.get(id(schema))
+    if entry is None:
+        with validators_lock:
+            entry = validators.setdefault(
+                id(schema),
+                (schema, FieldValidator(schema)))
+    return entry[1]
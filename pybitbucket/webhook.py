@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Receives the webhook requests that Bitbucket sends for a Hook.
+
+Classes:
+- WebhookEvent: a parsed webhook request with typed resources
+- WebhookReceiver: a WSGI application that parses webhook requests
+    and hands the events to a handler
+- OverflowPolicy: enumerates what a full dispatcher queue does
+- HandlerMetrics: counts and latencies of one handler
+- WebhookDispatcher: routes events to handlers on a bounded worker pool
+- WebhookRejectedError: raised when a full dispatcher rejects an event
+
+Functions:
+- parse_event: builds a WebhookEvent from the headers and body of a request
+"""
+
+from collections import OrderedDict
+from json import loads
+import logging
+from threading import Lock, Thread
+from time import time
+
+from six.moves.queue import Queue, Empty, Full
+
+from pybitbucket.bitbucket import Client, Enum
+from pybitbucket.hook import HookEvent
+
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookEvent(object):
+    """
+    A webhook request from Bitbucket.
+
+    The kind of event is the HookEvent decoded from the X-Event-Key header.
+    The top-level entities of the payload (actor, repository, pullrequest,
+    comment, approval, ...) are converted to resources on first access,
+    so a handler only pays for the parts it reads.
+    """
+
+    def __init__(
+            self,
+            event,
+            data,
+            client=None,
+            request_uuid=None,
+            hook_uuid=None,
+            attempt=None):
+        self.event = event
+        self.data = data
+        self.client = client or Client.default()
+        self.request_uuid = request_uuid
+        self.hook_uuid = hook_uuid
+        self.attempt = attempt
+
+    def __getattr__(self, name):
+        # Only called when the attribute is not already set.
+        data = self.__dict__.get('data', {})
+        if name not in data:
+            raise AttributeError(name)
+        value = self.client.convert_to_object(data[name])
+        setattr(self, name, value)
+        return value
+
+    @property
+    def category(self):
+        """The part of the event key before the colon, like pullrequest."""
+        return self.event.value.split(':', 1)[0]
+
+    def changes(self):
+        """
+        For a push, the list of changes to refs.
+        The old and new states of the ref are Branch or Tag resources,
+        or None when the ref was created or deleted.
+        """
+        changes = []
+        for change in self.data.get('push', {}).get('changes', []):
+            change = dict(change)
+            for state in ('old', 'new'):
+                if change.get(state):
+                    change[state] = self.client.convert_to_object(
+                        change[state])
+            changes.append(change)
+        return changes
+
+    def attributes(self):
+        return list(self.data.keys())
+
+    def __repr__(self):
+        return u'{name}({event}, {data})'.format(
+            name=type(self).__name__,
+            event=self.event.value,
+            data=repr(self.data))
+
+
+def parse_event(
+        event_key,
+        body,
+        client=None,
+        request_uuid=None,
+        hook_uuid=None,
+        attempt=None):
+    """
+    Build a WebhookEvent from a webhook request.
+
+    :param event_key: the value of the X-Event-Key header.
+    :type event_key: str
+    :param body: the body of the request, as JSON.
+    :type body: bytes or str
+    :raises: ValueError for an unknown event key or a malformed body.
+    """
+    event = HookEvent(event_key)
+    if isinstance(body, bytes):
+        body = body.decode('utf-8')
+    data = loads(body)
+    if not isinstance(data, dict):
+        raise ValueError('The webhook body is not a JSON object')
+    return WebhookEvent(
+        event,
+        data,
+        client=client,
+        request_uuid=request_uuid,
+        hook_uuid=hook_uuid,
+        attempt=attempt)
+
+
+class WebhookReceiver(object):
+    """
+    A WSGI application for the callback URL of a Hook.
+
+    Each valid request is parsed into a WebhookEvent
+    and passed to the handler before answering.
+    It can be served by any WSGI server, like wsgiref.simple_server.
+    """
+
+    def __init__(self, handler, client=None):
+        self.handler = handler
+        self.client = client or Client.default()
+
+    @staticmethod
+    def respond(start_response, status, text=''):
+        body = text.encode('utf-8')
+        start_response(status, [
+            (str('Content-Type'), str('text/plain; charset=utf-8')),
+            (str('Content-Length'), str(len(body)))])
+        return [body]
+
+    def parse(self, environ):
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        body = environ['wsgi.input'].read(length)
+        return parse_event(
+            environ.get('HTTP_X_EVENT_KEY'),
+            body,
+            client=self.client,
+            request_uuid=environ.get('HTTP_X_REQUEST_UUID'),
+            hook_uuid=environ.get('HTTP_X_HOOK_UUID'),
+            attempt=environ.get('HTTP_X_ATTEMPT_NUMBER'))
+
+    def __call__(self, environ, start_response):
+        if environ.get('REQUEST_METHOD') != 'POST':
+            return self.respond(start_response, str('405 Method Not Allowed'))
+        try:
+            event = self.parse(environ)
+        except ValueError as e:
+            return self.respond(
+                start_response,
+                str('400 Bad Request'),
+                '{0}'.format(e))
+        try:
+            self.handler(event)
+        except WebhookRejectedError as e:
+            # Bitbucket retries the delivery later.
+            return self.respond(
+                start_response,
+                str('503 Service Unavailable'),
+                '{0}'.format(e))
+        return self.respond(start_response, str('200 OK'))
+
+
+class WebhookRejectedError(Exception):
+    """Raise when a full dispatcher rejects an event."""
+    pass
+
+
+class OverflowPolicy(Enum):
+    # Wait for room in the queue, slowing down the receiver.
+    BLOCK = 'block'
+    # Discard the oldest queued event to make room.
+    DROP_OLDEST = 'drop-oldest'
+    # Refuse the event, so the receiver answers 503.
+    REJECT = 'reject'
+
+
+class HandlerMetrics(object):
+    """Counts and latencies of one handler, in seconds."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds, failed=False):
+        with self.lock:
+            self.count += 1
+            self.errors += 1 if failed else 0
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+    @property
+    def mean_seconds(self):
+        return self.total_seconds / self.count if self.count else 0.0
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                'count': self.count,
+                'errors': self.errors,
+                'total_seconds': self.total_seconds,
+                'mean_seconds': self.mean_seconds,
+                'max_seconds': self.max_seconds,
+            }
+
+
+class WebhookDispatcher(object):
+    """
+    Routes each WebhookEvent to the handlers registered for its HookEvent.
+
+    Events wait in a bounded queue for a fixed number of worker threads,
+    so a burst of pushes never creates more threads or unbounded backlog.
+    What happens when the queue is full is the overflow policy.
+    Bitbucket retries deliveries with the same X-Request-UUID,
+    so recently seen request ids are ignored.
+
+    A dispatcher is a handler for WebhookReceiver:
+
+        dispatcher = WebhookDispatcher(workers=4, queue_size=100)
+        dispatcher.register(notify, HookEvent.PULL_REQUEST_CREATED)
+        dispatcher.start()
+        application = WebhookReceiver(dispatcher)
+    """
+
+    def __init__(
+            self,
+            workers=4,
+            queue_size=100,
+            overflow=OverflowPolicy.BLOCK,
+            dedupe_size=1000):
+        self.workers = workers
+        self.queue = Queue(maxsize=queue_size)
+        self.overflow = OverflowPolicy(overflow)
+        self.dedupe_size = dedupe_size
+        self.handlers = []
+        self.metrics = {}
+        self.seen = OrderedDict()
+        self.lock = Lock()
+        self.threads = []
+        self.duplicates = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def register(self, handler, *events):
+        """
+        Call handler for the given HookEvents, or for every event if none.
+        """
+        events = frozenset(HookEvent(e).value for e in events)
+        self.handlers.append((handler, events))
+        self.metrics[handler] = HandlerMetrics()
+        return handler
+
+    def handlers_for(self, event):
+        return [
+            handler
+            for (handler, events)
+            in self.handlers
+            if not events or event.event.value in events]
+
+    def is_duplicate(self, event):
+        """
+        Whether the event was seen already, else hold its request id
+        until it is queued, so a concurrent redelivery is a duplicate.
+        """
+        if event.request_uuid is None:
+            return False
+        with self.lock:
+            if event.request_uuid in self.seen:
+                self.duplicates += 1
+                return True
+            self.seen[event.request_uuid] = True
+            while len(self.seen) > self.dedupe_size:
+                self.seen.popitem(last=False)
+            return False
+
+    def forget(self, event):
+        """
+        Let an event that was never handled be delivered again,
+        because it was rejected or dropped.
+        """
+        if event is None or event.request_uuid is None:
+            return
+        with self.lock:
+            self.seen.pop(event.request_uuid, None)
+
+    def enqueue(self, event):
+        if self.overflow == OverflowPolicy.BLOCK:
+            self.queue.put(event)
+            return
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except Full:
+                if self.overflow == OverflowPolicy.REJECT:
+                    with self.lock:
+                        self.rejected += 1
+                    raise WebhookRejectedError(
+                        'The webhook queue is full')
+            try:
+                self.forget(self.queue.get_nowait())
+                self.queue.task_done()
+                with self.lock:
+                    self.dropped += 1
+            except Empty:
+                pass
+
+    def dispatch(self, event):
+        """
+        Queue the event for its handlers.
+        Returns False when the event is a duplicate.
+        An event that is rejected or dropped is not remembered,
+        so that Bitbucket can deliver it again.
+
+        :raises: WebhookRejectedError when the queue is full
+            and the policy is to reject.
+        """
+        if self.is_duplicate(event):
+            return False
+        try:
+            self.enqueue(event)
+        except WebhookRejectedError:
+            self.forget(event)
+            raise
+        return True
+
+    __call__ = dispatch
+
+    def handle(self, event):
+        for handler in self.handlers_for(event):
+            started = time()
+            failed = False
+            try:
+                handler(event)
+            except Exception:
+                logger.exception(
+                    'Webhook handler %r failed on %s %s',
+                    handler, event.event.value, event.request_uuid)
+                failed = True
+            self.metrics[handler].record(time() - started, failed)
+
+    def work(self):
+        while True:
+            event = self.queue.get()
+            try:
+                if event is None:
+                    return
+                self.handle(event)
+            finally:
+                self.queue.task_done()
+
+    def start(self):
+        while len(self.threads) < self.workers:
+            thread = Thread(target=self.work)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def join(self):
+        """Wait until every queued event has been handled."""
+        self.queue.join()
+
+    def stop(self):
+        """Handle the queued events, then stop the workers."""
+        for thread in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
@@ -250,6 +250,11 @@ if sys.version_info < (2, 7) or (3, 0) <= sys.version_info < (3, 3):
 if sys.version_info < (3, 4):
     python_version_specific_requires.append('enum34')
 
+# concurrent.futures has been introduced to python standard library
+# in python 3.2
+if sys.version_info < (3, 2):
+    python_version_specific_requires.append('futures')
+
 
 # See here for more options:
 # <http://pythonhosted.org/setuptools/setuptools.html>
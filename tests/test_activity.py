@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+from test_bitbucketbase import BitbucketFixture
+from os import path
+import json
+import shutil
+import tempfile
+
+import httpretty
+from pybitbucket.activity import (
+    ActivityFollower, APPROVAL, COMMENT, CursorStore, FileCursorStore, UPDATE)
+
+
+class ActivityFixture(BitbucketFixture):
+    # GIVEN: a repository and the URL of its pull request activity
+    repository = 'teamsinspace/api'
+    activity_url = (
+        'https://api.bitbucket.org' +
+        '/2.0/repositories/teamsinspace/api/pullrequests/activity')
+
+    @staticmethod
+    def approval(pullrequest_id, username, date):
+        return {
+            'approval': {'date': date, 'user': {'username': username}},
+            'pull_request': {'id': pullrequest_id}}
+
+    @staticmethod
+    def comment(pullrequest_id, comment_id, date):
+        return {
+            'comment': {'id': comment_id, 'created_on': date},
+            'pull_request': {'id': pullrequest_id}}
+
+    @staticmethod
+    def update(pullrequest_id, date):
+        return {
+            'update': {
+                'date': date,
+                'state': 'OPEN',
+                'author': {'username': 'tutorials'}},
+            'pull_request': {'id': pullrequest_id}}
+
+    # GIVEN: activity pages, newest first, each linked to the next
+    @classmethod
+    def register_pages(cls, *pages):
+        responses = []
+        for (number, values) in enumerate(pages, 1):
+            page = {'pagelen': 2, 'page': number, 'values': values}
+            if number < len(pages):
+                page['next'] = cls.activity_url + '?page={}'.format(number + 1)
+            responses.append(httpretty.Response(
+                body=json.dumps(page),
+                content_type='application/json',
+                status=200))
+        httpretty.register_uri(
+            httpretty.GET,
+            cls.activity_url,
+            responses=responses)
+
+    @staticmethod
+    def requests():
+        return [
+            r for r in httpretty.latest_requests()
+            if r.path.startswith('/2.0/repositories')]
+
+    # GIVEN: a cursor on an approval of pull request 7
+    @classmethod
+    def store(cls):
+        store = CursorStore()
+        store.set_cursor(cls.repository, {
+            'date': '2017-03-01T10:00:00+00:00',
+            'seen': ['approval/7/evzijst/2017-03-01T10:00:00+00:00']})
+        return store
+
+
+class TestStartingToFollow(ActivityFixture):
+    @httpretty.activate
+    def test_first_poll_only_sets_the_cursor(self):
+        self.register_pages(
+            [self.update(7, '2017-03-02T09:00:00+00:00'),
+             self.approval(7, 'evzijst', '2017-03-01T10:00:00+00:00')],
+            [self.comment(7, 1, '2017-02-28T10:00:00+00:00')])
+        store = CursorStore()
+        follower = ActivityFollower(client=self.test_client, store=store)
+        assert [] == list(follower.poll([self.repository]))
+        assert 1 == len(self.requests())
+        assert '2017-03-02T09:00:00+00:00' == \
+            store.get_cursor(self.repository)['date']
+
+    @httpretty.activate
+    def test_backfill_generates_every_event_oldest_first(self):
+        self.register_pages(
+            [self.update(7, '2017-03-02T09:00:00+00:00'),
+             self.approval(7, 'evzijst', '2017-03-01T10:00:00+00:00')],
+            [self.comment(7, 1, '2017-02-28T10:00:00+00:00')])
+        follower = ActivityFollower(client=self.test_client, backfill=True)
+        events = list(follower.poll([self.repository]))
+        assert [COMMENT, APPROVAL, UPDATE] == [e.kind for e in events]
+        assert [7, 7, 7] == [e.pullrequest_id for e in events]
+
+
+class TestFollowing(ActivityFixture):
+    @httpretty.activate
+    def test_paging_stops_at_the_cursor(self):
+        self.register_pages(
+            [self.comment(7, 2, '2017-03-03T10:00:00+00:00'),
+             self.approval(8, 'tutorials', '2017-03-02T10:00:00+00:00')],
+            [self.approval(7, 'evzijst', '2017-03-01T10:00:00+00:00'),
+             self.comment(7, 1, '2017-02-28T10:00:00+00:00')],
+            [self.update(7, '2017-02-27T10:00:00+00:00')])
+        store = self.store()
+        follower = ActivityFollower(client=self.test_client, store=store)
+        events = list(follower.poll([self.repository]))
+        assert [8, 7] == [e.pullrequest_id for e in events]
+        assert [APPROVAL, COMMENT] == [e.kind for e in events]
+        assert 2 == len(self.requests())
+        assert '2017-03-03T10:00:00+00:00' == \
+            store.get_cursor(self.repository)['date']
+
+    @httpretty.activate
+    def test_events_of_the_same_date_are_not_missed(self):
+        self.register_pages(
+            [self.approval(7, 'tutorials', '2017-03-01T10:00:00+00:00'),
+             self.approval(7, 'evzijst', '2017-03-01T10:00:00+00:00'),
+             self.update(7, '2017-02-27T10:00:00+00:00')])
+        store = self.store()
+        follower = ActivityFollower(client=self.test_client, store=store)
+        events = list(follower.poll([self.repository]))
+        assert ['tutorials'] == [
+            e.activity['approval']['user']['username'] for e in events]
+        assert 2 == len(store.get_cursor(self.repository)['seen'])
+
+    @httpretty.activate
+    def test_other_kinds_still_move_the_cursor(self):
+        self.register_pages(
+            [self.update(7, '2017-03-02T10:00:00+00:00'),
+             self.approval(7, 'evzijst', '2017-03-01T10:00:00+00:00')])
+        store = self.store()
+        follower = ActivityFollower(
+            client=self.test_client, store=store, kinds=[APPROVAL])
+        assert [] == list(follower.poll([self.repository]))
+        assert '2017-03-02T10:00:00+00:00' == \
+            store.get_cursor(self.repository)['date']
+
+    @httpretty.activate
+    def test_an_error_does_not_stop_the_other_repositories(self):
+        self.register_pages(
+            [self.update(7, '2017-03-02T10:00:00+00:00')])
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://api.bitbucket.org' +
+            '/2.0/repositories/teamsinspace/gone/pullrequests/activity',
+            status=404)
+        follower = ActivityFollower(
+            client=self.test_client, store=self.store())
+        events = list(follower.poll([self.repository, 'teamsinspace/gone']))
+        assert [UPDATE] == [e.kind for e in events]
+        assert ['teamsinspace/gone'] == [
+            e.repository for e in follower.errors]
+
+
+class TestKeepingCursorsInAFile(ActivityFixture):
+    @classmethod
+    def setup_class(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.filename = path.join(cls.directory, 'cursors.json')
+
+    @classmethod
+    def teardown_class(cls):
+        shutil.rmtree(cls.directory)
+
+    def test_cursors_are_read_back(self):
+        store = FileCursorStore(self.filename)
+        cursor = {'date': '2017-03-01T10:00:00+00:00', 'seen': ['a']}
+        store.set_cursor(self.repository, cursor)
+        store.save()
+        assert cursor == \
+            FileCursorStore(self.filename).get_cursor(self.repository)
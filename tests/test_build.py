@@ -146,6 +146,26 @@ class TestModifyingBuildStatus(BuildStatusFixture):
             httpretty.last_request().headers.get('Content-Type')
         assert isinstance(response, BuildStatus)
 
+    @httpretty.activate
+    def test_trusted_payloads_are_not_validated_again(self):
+        httpretty.register_uri(
+            httpretty.PUT,
+            self.url,
+            content_type='application/json',
+            body=self.resource_data(),
+            status=200)
+        payload = BuildStatusPayload() \
+            .add_key(self.key) \
+            .add_state(self.state) \
+            .add_url('not a url')
+        try:
+            self.example_object().modify(payload)
+            assert False
+        except MultipleInvalid:
+            pass
+        self.example_object().modify(payload.trusting())
+        assert 'not a url' == httpretty.last_request().parsed_body['url']
+
 
 class TestCreatingDefaultBuildStatusPayload(BuildStatusPayloadFixture):
     @classmethod
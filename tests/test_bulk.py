@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+from test_bitbucketbase import BitbucketFixture
+from threading import Lock
+import json
+import time
+
+import httpretty
+from pybitbucket.bulk import BulkPullRequests, MERGE
+from pybitbucket.pullrequest import PullRequest
+
+
+class BulkPullRequestsFixture(BitbucketFixture):
+    # GIVEN: a class under test
+    class_under_test = 'PullRequest'
+
+    # GIVEN: the URL of an action with the test client
+    @classmethod
+    def action_url(cls, pullrequest_id, action, full_name='atlassian/snippet'):
+        return '{0}/2.0/repositories/{1}/pullrequests/{2}/{3}'.format(
+            cls.test_client.get_bitbucket_url(),
+            full_name,
+            pullrequest_id,
+            action)
+
+    # GIVEN: a pull request into a branch of a repository
+    @classmethod
+    def pullrequest(cls, pullrequest_id, branch='master'):
+        data = json.loads(cls.resource_data())
+        data['id'] = pullrequest_id
+        data['destination']['branch']['name'] = branch
+        return PullRequest(data, client=cls.test_client)
+
+    @classmethod
+    def bulk(cls, **kwargs):
+        return BulkPullRequests(
+            repository_name='snippet',
+            owner='atlassian',
+            client=cls.test_client,
+            **kwargs)
+
+
+class TestApprovingInBulk(BulkPullRequestsFixture):
+    @httpretty.activate
+    def test_each_pullrequest_has_a_result(self):
+        for pullrequest_id in (1, 2):
+            httpretty.register_uri(
+                httpretty.POST,
+                self.action_url(pullrequest_id, 'approve'),
+                content_type='application/json',
+                body=self.resource_data('PullRequest.approve'),
+                status=200)
+        httpretty.register_uri(
+            httpretty.POST,
+            self.action_url(3, 'approve'),
+            status=404)
+        results = {r.target: r for r in self.bulk().approve([1, '2', 3])}
+        assert results[1].ok and results[1].value
+        assert results['2'].ok and results['2'].value
+        assert not results[3].ok
+        assert results[3].value is None
+
+    @httpretty.activate
+    def test_unapprove_deletes_the_approval(self):
+        httpretty.register_uri(
+            httpretty.DELETE,
+            self.action_url(1, 'approve'),
+            status=204)
+        results = list(self.bulk().unapprove([self.pullrequest(1)]))
+        assert [True] == [r.value for r in results]
+
+    @httpretty.activate
+    def test_decline_takes_full_names(self):
+        httpretty.register_uri(
+            httpretty.POST,
+            self.action_url(12, 'decline', 'teamsinspace/api'),
+            content_type='application/json',
+            body=self.resource_data('PullRequest.decline'),
+            status=200)
+        results = list(self.bulk().decline(['teamsinspace/api#12']))
+        assert isinstance(results[0].value, PullRequest)
+
+    def test_targets_that_are_not_pullrequests_fail_alone(self):
+        results = list(BulkPullRequests(
+            client=self.test_client).approve(['snippet', 1]))
+        assert [False, False] == [r.ok for r in results]
+        assert all(isinstance(r.error, ValueError) for r in results)
+
+
+class TestMergingInBulk(BulkPullRequestsFixture):
+    @httpretty.activate
+    def test_merge_by_id_finds_the_destination(self):
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://api.bitbucket.org' +
+            '/2.0/repositories/atlassian/snippet/pullrequests/1',
+            content_type='application/json',
+            body=self.resource_data(),
+            status=200)
+        httpretty.register_uri(
+            httpretty.POST,
+            self.action_url(1, 'merge'),
+            content_type='application/json',
+            body=self.resource_data('PullRequest.merge'),
+            status=200)
+        results = list(self.bulk().merge([1]))
+        assert results[0].ok
+        assert [MERGE] == [r.action for r in results]
+
+    def test_merges_into_a_branch_are_serialized(self):
+        # GIVEN: merges that take a while and count the ones in flight
+        lock = Lock()
+        active = {}
+        most = {'total': 0}
+        order = []
+
+        class SlowBulk(BulkPullRequests):
+            def act(self, target, action):
+                branch = target.destination['branch']['name']
+                with lock:
+                    active[branch] = active.get(branch, 0) + 1
+                    assert active[branch] == 1
+                    most['total'] = max(most['total'], sum(active.values()))
+                    order.append(target.id)
+                time.sleep(0.05)
+                with lock:
+                    active[branch] -= 1
+                return target.id
+
+        targets = [
+            self.pullrequest(1),
+            self.pullrequest(2, 'develop'),
+            self.pullrequest(3),
+            self.pullrequest(4),
+        ]
+        results = list(SlowBulk(client=self.test_client).merge(targets))
+        assert all(r.ok for r in results)
+        assert [1, 3, 4] == [n for n in order if n != 2]
+        # Merges into other branches still run in parallel.
+        assert 2 == most['total']
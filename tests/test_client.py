@@ -81,3 +81,19 @@ class TestClient(object):
         httpretty.register_uri(httpretty.GET, url)
         response = client.session.get(url)
         assert 200 == response.status_code
+
+    def test_bitbucket_root_is_built_once_per_client(self):
+        client = Client(FakeAuth())
+        bitbucket = client.get_bitbucket()
+        assert bitbucket is client.get_bitbucket()
+        assert bitbucket.client is client
+        assert bitbucket is not Client(FakeAuth()).get_bitbucket()
+
+    def test_resources_without_a_client_share_one_default_client(self):
+        from pybitbucket.bitbucket import Bitbucket
+        from pybitbucket.user import User
+        users = [User({'username': str(n)}) for n in range(5)]
+        assert all(u.client is Client.default() for u in users)
+        assert Bitbucket().client.session is Client.default().session
+        assert Client.default().get_bitbucket() is \
+            Client.default().get_bitbucket()
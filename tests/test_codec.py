@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+from test_bitbucketbase import BitbucketFixture
+import httpretty
+import json
+
+from pybitbucket.bitbucket import BitbucketBase, Client
+from pybitbucket.build import BuildStatusStates
+from pybitbucket.codec import (
+    OrJSONCodec, StandardCodec, UltraJSONCodec, default_codec)
+from test_auth import FakeAuth
+
+
+class CountingCodec(StandardCodec):
+    # GIVEN: a codec that counts how often it is used
+    def __init__(self):
+        self.decoded = 0
+        self.encoded = 0
+
+    def loads(self, content):
+        self.decoded += 1
+        return super(CountingCodec, self).loads(content)
+
+    def dumps(self, data):
+        self.encoded += 1
+        return super(CountingCodec, self).dumps(data)
+
+
+class TestCodecs(object):
+    def installed_codecs(self):
+        codecs = [StandardCodec()]
+        for codec in (OrJSONCodec, UltraJSONCodec):
+            try:
+                codecs.append(codec())
+            except ImportError:
+                pass
+        return codecs
+
+    def test_enum_values_are_encoded(self):
+        for codec in self.installed_codecs():
+            data = {'state': BuildStatusStates.FAILED}
+            assert {'state': 'FAILED'} == json.loads(codec.dumps(data))
+
+    def test_bytes_and_text_are_decoded(self):
+        for codec in self.installed_codecs():
+            assert {'a': 'é'} == codec.loads('{"a": "é"}'.encode('utf-8'))
+            assert {'a': 'é'} == codec.loads('{"a": "é"}')
+
+    def test_default_codec_is_shared(self):
+        assert default_codec() is default_codec()
+
+
+class TestClientCodec(BitbucketFixture):
+    url = 'https://api.bitbucket.org/2.0/repositories/teamsinspace/example'
+
+    @httpretty.activate
+    def test_responses_are_decoded_by_the_codec(self):
+        codec = CountingCodec()
+        client = Client(FakeAuth(), codec=codec)
+        httpretty.register_uri(
+            httpretty.GET,
+            self.url,
+            content_type='application/json',
+            body=self.resource_data('Repository'),
+            status=200)
+        list(client.remote_relationship(self.url))
+        assert 1 == codec.decoded
+
+    @httpretty.activate
+    def test_payloads_are_encoded_by_the_codec(self):
+        codec = CountingCodec()
+        client = Client(FakeAuth(), codec=codec)
+        httpretty.register_uri(
+            httpretty.POST,
+            self.url,
+            content_type='application/json',
+            body=self.resource_data('Repository'),
+            status=200)
+        BitbucketBase.post(
+            self.url,
+            json={'scm': 'git', 'state': BuildStatusStates.FAILED},
+            client=client)
+        request = httpretty.last_request()
+        assert 1 == codec.encoded
+        assert 'application/json' == request.headers['Content-Type']
+        assert 'FAILED' == json.loads(request.body.decode('utf-8'))['state']
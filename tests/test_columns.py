@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+from test_bitbucketbase import BitbucketFixture
+import array
+import json
+
+import httpretty
+import pytest
+from six.moves.urllib.parse import parse_qs, urlsplit
+from pybitbucket.columns import (
+    BOOL, Columns, DATE, epoch_seconds, Field, FLOAT, INT, remote_columns,
+    STRING)
+
+
+class ColumnsFixture(BitbucketFixture):
+    # GIVEN: a class under test
+    class_under_test = 'PullRequest'
+
+    # GIVEN: the URL of the pull requests of a repository
+    url = (
+        'https://api.bitbucket.org' +
+        '/2.0/repositories/teamsinspace/api/pullrequests')
+
+    # GIVEN: the columns for cycle time and throughput
+    fields = [
+        ('id', 'id', INT),
+        ('state', 'state'),
+        ('author', 'author.username'),
+        ('branch', 'destination.branch.name'),
+        ('created', 'created_on', DATE),
+        ('updated', 'updated_on', DATE),
+    ]
+
+    # GIVEN: pull requests created one day apart, updated two days later
+    @classmethod
+    def values(cls, count=3):
+        values = []
+        for n in range(count):
+            data = json.loads(cls.resource_data())
+            data['id'] = n + 1
+            data['created_on'] = '2017-03-0{0}T10:00:00+00:00'.format(n + 1)
+            data['updated_on'] = '2017-03-0{0}T10:00:00+00:00'.format(n + 3)
+            values.append(data)
+        return values
+
+
+class TestConvertingToColumns(ColumnsFixture):
+    def test_each_field_is_a_column(self):
+        columns = Columns(self.fields)
+        columns.extend(self.values())
+        assert 3 == len(columns)
+        assert ['id', 'state', 'author', 'branch', 'created', 'updated'] == \
+            columns.names()
+        assert isinstance(columns['id'], array.array)
+        assert [1, 2, 3] == list(columns['id'])
+        assert ['MERGED'] * 3 == columns['state']
+        assert ['MatthewTurk'] * 3 == columns['author']
+        assert ['master'] * 3 == columns['branch']
+
+    def test_dates_are_seconds_since_the_epoch(self):
+        columns = Columns(self.fields)
+        columns.extend(self.values(1))
+        assert 1488362400 == columns['created'][0]
+        assert 1488362400 == epoch_seconds('2017-03-01T12:00:00+02:00')
+
+    def test_cycle_times_and_throughput(self):
+        columns = Columns(self.fields)
+        columns.extend(self.values())
+        assert [2 * 86400] * 3 == list(
+            columns.difference('updated', 'created'))
+        day = 86400
+        assert [1, 1, 1] == list(
+            columns.counts_per_period('updated', day).values())
+        assert [3] == list(
+            columns.counts_per_period('updated', 30 * day).values())
+
+    def test_missing_values(self):
+        columns = Columns([
+            Field('merged', 'merged_on', DATE),
+            Field('count', 'comment_count', INT),
+            Field('ratio', 'ratio', FLOAT),
+            Field('closes', 'close_source_branch', BOOL),
+            Field('reviewer', 'reviewers.0.username', STRING),
+        ], missing=-1)
+        columns.extend(self.values(1))
+        assert [-1] == list(columns['merged'])
+        assert [-1] == list(columns['count'])
+        assert columns['ratio'][0] != columns['ratio'][0]
+        assert [1] == list(columns['closes'])
+        assert [None] == columns['reviewer']
+        assert [-1] == list(columns.difference('merged', 'merged'))
+        assert {} == columns.counts_per_period('merged', 86400)
+
+    def test_float_columns_with_gaps(self):
+        values = self.values()
+        values[0]['ratio'] = 0.5
+        values[0]['target'] = 2.0
+        values[1]['target'] = 1.5
+        values[2]['ratio'] = 0.25
+        columns = Columns([
+            Field('ratio', 'ratio', FLOAT),
+            Field('target', 'target', FLOAT),
+            Field('id', 'id', INT),
+        ])
+        columns.extend(values)
+        differences = columns.difference('target', 'ratio')
+        assert 'd' == differences.typecode
+        assert 1.5 == differences[0]
+        assert differences[1] != differences[1]
+        assert differences[2] != differences[2]
+        mixed = columns.difference('id', 'ratio')
+        assert 'd' == mixed.typecode
+        assert [0.5, 2.75] == [mixed[0], mixed[2]]
+        assert mixed[1] != mixed[1]
+
+    def test_unknown_kinds_are_refused(self):
+        try:
+            Columns([('id', 'id', 'integer')])
+            assert False
+        except ValueError:
+            pass
+
+    def test_numpy_arrays_share_the_columns(self):
+        numpy = pytest.importorskip('numpy')
+        columns = Columns(self.fields)
+        columns.extend(self.values())
+        arrays = columns.to_numpy()
+        assert 2 * 86400 == \
+            (arrays['updated'] - arrays['created']).mean()
+        assert numpy.dtype(object) == arrays['author'].dtype
+
+
+class TestReadingColumnsFromPages(ColumnsFixture):
+    @httpretty.activate
+    def test_every_page_is_read_without_resources(self):
+        values = self.values(4)
+        httpretty.register_uri(
+            httpretty.GET,
+            self.url,
+            responses=[
+                httpretty.Response(
+                    body=json.dumps({
+                        'values': values[:2],
+                        'next': self.url + '?page=2'}),
+                    content_type='application/json'),
+                httpretty.Response(
+                    body=json.dumps({'values': values[2:]}),
+                    content_type='application/json'),
+            ])
+        columns = remote_columns(self.test_client, self.url, self.fields)
+        assert [1, 2, 3, 4] == list(columns['id'])
+        query = parse_qs(urlsplit(
+            httpretty.latest_requests()[0].path).query)
+        fields = query['fields'][0].split(',')
+        assert 'values.destination.branch.name' in fields
+        assert 'values.created_on' in fields
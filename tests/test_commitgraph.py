@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+from test_bitbucketbase import BitbucketFixture
+import httpretty
+import json
+
+from pybitbucket.commit import Commit
+from pybitbucket.commitgraph import (
+    CommitGraph, FrontierLimitError, compact_hash, revision_key)
+
+
+class CommitGraphFixture(BitbucketFixture):
+    # GIVEN: a history where a merge joins two lines of work
+    #   a (release) -> b -> d -> e
+    #   a           -> c -> d
+    parents = {
+        'a': ['b', 'c'],
+        'b': ['d'],
+        'c': ['d'],
+        'd': ['e'],
+        'e': [],
+    }
+    full_name = 'teamsinspace/teamsinspace.bitbucket.org'
+
+    @classmethod
+    def commit_hash(cls, name):
+        return name * 40
+
+    @classmethod
+    def commit_data(cls, name):
+        data = json.loads(cls.resource_data('Commit'))
+        data['hash'] = cls.commit_hash(name)
+        data['message'] = name
+        data['parents'] = [
+            {'hash': cls.commit_hash(p), 'type': 'commit'}
+            for p in cls.parents[name]]
+        return data
+
+    @classmethod
+    def commits_url(cls, revision):
+        return (
+            cls.test_client.get_bitbucket_url() +
+            '/2.0/repositories/' + cls.full_name +
+            '/commits/' + revision)
+
+    # GIVEN: pages of commits that are cut short like the real ones
+    @classmethod
+    def register_page(cls, revision, names):
+        httpretty.register_uri(
+            httpretty.GET,
+            cls.commits_url(revision),
+            content_type='application/json',
+            body=json.dumps({
+                'pagelen': len(names),
+                'values': [cls.commit_data(n) for n in names]}),
+            status=200)
+
+    @classmethod
+    def register_pages(cls):
+        cls.register_page('release', ['a', 'b'])
+        cls.register_page(cls.commit_hash('c'), ['c', 'd', 'e'])
+        cls.register_page(cls.commit_hash('d'), ['d', 'e'])
+
+    @classmethod
+    def graph(cls, **keywords):
+        return CommitGraph(
+            cls.full_name,
+            client=cls.test_client,
+            **keywords)
+
+
+class TestWalkingTheCommitGraph(CommitGraphFixture):
+    @httpretty.activate
+    def test_each_ancestor_is_walked_once(self):
+        self.register_pages()
+        commits = list(self.graph().walk(['release']))
+        assert all(isinstance(c, Commit) for c in commits)
+        assert ['a', 'b', 'c', 'd', 'e'] == [c.message for c in commits]
+
+    @httpretty.activate
+    def test_only_unknown_commits_are_fetched(self):
+        self.register_pages()
+        list(self.graph(workers=1).walk(['release']))
+        paths = [r.path for r in httpretty.latest_requests()]
+        assert 2 == len(paths)
+        assert paths[0].endswith('/commits/release')
+
+    @httpretty.activate
+    def test_exclude_is_sent_to_bitbucket(self):
+        self.register_pages()
+        list(self.graph().walk(['release'], exclude=['master']))
+        assert all(
+            ['master'] == r.querystring['exclude']
+            for r in httpretty.latest_requests())
+
+    @httpretty.activate
+    def test_stop_prunes_the_ancestors_behind_it(self):
+        self.register_pages()
+        commits = self.graph().walk(
+            ['release'],
+            stop=lambda c: c.message in ('b', 'c'))
+        assert ['a'] == [c.message for c in commits]
+
+    @httpretty.activate
+    def test_heads_reached_from_other_heads_are_walked_once(self):
+        self.register_pages()
+        commits = list(self.graph().walk(['release', self.commit_hash('d')]))
+        assert ['a', 'd', 'b', 'c', 'e'] == [c.message for c in commits]
+
+    @httpretty.activate
+    def test_fetched_commits_are_bounded(self):
+        self.register_pages()
+        self.register_page(self.commit_hash('b'), ['b', 'd', 'e'])
+        self.register_page(self.commit_hash('e'), ['e'])
+        for workers in (1, 2):
+            commits = list(self.graph(
+                workers=workers,
+                max_known=1).walk(['release']))
+            assert ['a', 'b', 'c', 'd', 'e'] == [
+                c.message for c in commits]
+
+    @httpretty.activate
+    def test_frontier_is_bounded(self):
+        self.register_pages()
+        try:
+            list(self.graph(max_frontier=1).walk(['release']))
+            assert False
+        except FrontierLimitError:
+            pass
+
+
+class TestCompactHashes(object):
+    def test_hexadecimal_hashes_are_half_the_size(self):
+        commit_hash = 'c021208234c65439f57b8244517a2b850b3ecf44'
+        assert 20 == len(compact_hash(commit_hash))
+
+    def test_other_revisions_are_kept(self):
+        assert b'release' == compact_hash('release')
+
+    def test_names_that_look_hexadecimal_are_not_hashes(self):
+        commit_hash = 'c021208234c65439f57b8244517a2b850b3ecf44'
+        assert revision_key(commit_hash) != compact_hash(commit_hash)
+        assert revision_key('cafe') != compact_hash('cafe')
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+from test_bitbucketbase import BitbucketFixture
+import csv
+import gzip
+import httpretty
+import io
+import json
+import shutil
+import tempfile
+from os import path
+
+import pytest
+from six import PY2
+
+from pybitbucket.commit import Commit
+from pybitbucket.export import Exporter, field_value, record_of
+
+
+class ExportFixture(BitbucketFixture):
+    # GIVEN: a page of two commits
+    commits_path = (
+        '/2.0/repositories/teamsinspace/teamsinspace.bitbucket.org/commits')
+    columns = ['hash', 'author.user.username', 'parents.0.hash', 'missing']
+
+    @classmethod
+    def commits(cls, stream, records=False):
+        httpretty.register_uri(
+            httpretty.GET,
+            cls.test_client.get_bitbucket_url() + cls.commits_path,
+            content_type='application/json',
+            body=cls.resource_list_data('Commit'),
+            status=200)
+        return Commit.find_commits_in_repository(
+            'teamsinspace',
+            'teamsinspace.bitbucket.org',
+            client=cls.test_client,
+            stream=stream,
+            records=records)
+
+    @classmethod
+    def example_values(cls):
+        return json.loads(cls.resource_list_data('Commit'))['values']
+
+
+class TestExporting(ExportFixture):
+    @classmethod
+    def setup_class(cls):
+        cls.directory = tempfile.mkdtemp()
+
+    @classmethod
+    def teardown_class(cls):
+        shutil.rmtree(cls.directory)
+
+    @httpretty.activate
+    def test_streamed_resources_export_their_whole_data(self):
+        out = io.StringIO()
+        stats = Exporter(out).export(self.commits(stream=True))
+        assert 2 == stats.rows
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        values = self.example_values()
+        assert [v['hash'] for v in values] == [r['hash'] for r in rows]
+        assert values[0]['author'] == rows[0]['author']
+
+    @httpretty.activate
+    def test_columns_are_projected(self):
+        out = io.StringIO()
+        Exporter(out, columns=self.columns).export(self.commits(stream=True))
+        row = json.loads(out.getvalue().splitlines()[0])
+        value = self.example_values()[0]
+        assert {
+            'hash': value['hash'],
+            'author.user.username': 'dans9190',
+            'parents.0.hash': value['parents'][0]['hash'],
+            'missing': None,
+        } == row
+
+    @httpretty.activate
+    def test_records_are_exported(self):
+        out = io.StringIO()
+        Exporter(out, columns=self.columns).export(
+            self.commits(stream=True, records=True))
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        values = self.example_values()
+        assert [v['hash'] for v in values] == [r['hash'] for r in rows]
+        assert 'dans9190' == rows[0]['author.user.username']
+        assert values[0]['parents'][0]['hash'] == rows[0]['parents.0.hash']
+
+    @httpretty.activate
+    def test_csv_is_compressed_with_gzip(self):
+        filename = path.join(self.directory, 'commits.csv.gz')
+        Exporter(filename, columns=self.columns).export(
+            self.commits(stream=False))
+        with io.TextIOWrapper(gzip.open(filename), 'utf-8') as f:
+            rows = list(csv.reader(f))
+        assert self.columns == rows[0]
+        assert 3 == len(rows)
+        assert ['dans9190', ''] == rows[1][1:2] + rows[1][3:]
+
+    def test_output_is_flushed_periodically(self):
+        progress = []
+        stats = Exporter(
+            io.StringIO(),
+            flush_every=2,
+            progress=progress.append).export({'n': n} for n in range(5))
+        assert 5 == stats.rows
+        assert [2, 4] == [p.rows for p in progress]
+        assert 0 <= stats.rows_per_second
+
+    def test_flush_every_zero_only_flushes_at_the_end(self):
+        progress = []
+        stats = Exporter(
+            io.StringIO(),
+            flush_every=0,
+            progress=progress.append).export({'n': n} for n in range(3))
+        assert 3 == stats.rows
+        assert [] == progress
+
+    @pytest.mark.skipif(not PY2, reason='the csv module writes text')
+    def test_csv_is_written_to_text_files_on_python_2(self):
+        out = io.StringIO()
+        Exporter(out, format='csv', columns=['name']).export(
+            [{'name': u'caf\xe9'}])
+        assert u'name\r\ncaf\xe9\r\n' == out.getvalue()
+
+    def test_csv_requires_columns(self):
+        try:
+            Exporter(io.StringIO(), format='csv')
+            assert False
+        except ValueError:
+            pass
+
+
+class TestProjecting(object):
+    def test_missing_steps_are_none(self):
+        assert field_value({'a': {'b': 1}}, ('a', 'c', 'd')) is None
+        assert field_value({'a': [1]}, ('a', '3')) is None
+
+    def test_plain_values_are_their_own_record(self):
+        assert {'a': [1, {'b': 2}]} == record_of({'a': [1, {'b': 2}]})
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+from threading import Lock
+import time
+
+from pybitbucket.fanout import FanOut, FanOutResult
+
+
+class FanOutFixture(object):
+    # GIVEN: repositories with a few build dates each
+    builds = {
+        'team/api': ['2016-01-03', '2016-01-01'],
+        'team/web': ['2016-01-04', '2016-01-02'],
+        'team/docs': [],
+    }
+
+    @classmethod
+    def find_builds(cls, repository):
+        return (b for b in cls.builds[repository])
+
+
+class TestFanningOut(FanOutFixture):
+    def test_every_value_is_returned_with_its_repository(self):
+        results = list(FanOut(self.find_builds).results(sorted(self.builds)))
+        assert 4 == len(results)
+        assert FanOutResult('team/api', '2016-01-03') in results
+
+    def test_single_resources_and_none_are_values(self):
+        fanout = FanOut(lambda r: None if r == 'team/docs' else r)
+        results = list(fanout.results(sorted(self.builds)))
+        assert ['team/api', 'team/web'] == sorted(r.value for r in results)
+
+    def test_tuples_are_single_values(self):
+        fanout = FanOut(lambda r: FanOutResult(r, len(self.builds[r])))
+        results = list(fanout.results(sorted(self.builds)))
+        assert [('team/api', 2), ('team/docs', 0), ('team/web', 2)] == \
+            sorted(r.value for r in results)
+
+    def test_errors_are_isolated_per_repository(self):
+        def find(repository):
+            if repository == 'team/web':
+                raise ValueError('no access')
+            return self.find_builds(repository)
+        fanout = FanOut(find)
+        results = list(fanout.results(sorted(self.builds)))
+        assert 2 == len(results)
+        assert ['team/web'] == [e.repository for e in fanout.errors]
+        assert isinstance(fanout.errors[0].error, ValueError)
+
+    def test_results_are_merged_in_order(self):
+        fanout = FanOut(self.find_builds)
+        results = fanout.sorted_results(
+            sorted(self.builds),
+            key=lambda build: build,
+            reverse=True)
+        assert [
+            '2016-01-04', '2016-01-03', '2016-01-02', '2016-01-01'
+        ] == [r.value for r in results]
+
+    def test_concurrency_is_bounded(self):
+        lock = Lock()
+        running = [0, 0]
+
+        def find(repository):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return repository
+
+        results = list(FanOut(find, workers=3).results(range(20)))
+        assert 20 == len(results)
+        assert 3 >= running[1]
+
+    def test_repositories_are_read_lazily(self):
+        read = []
+
+        def repositories():
+            for i in range(100):
+                read.append(i)
+                yield i
+
+        results = FanOut(lambda r: r, workers=2).results(repositories())
+        next(results)
+        results.close()
+        assert len(read) < 100
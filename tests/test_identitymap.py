@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+from util import JsonSampleDataFixture
+from test_auth import FakeAuth
+import gc
+import json
+
+from pybitbucket.bitbucket import Client, IdentityMap
+from pybitbucket.pullrequest import PullRequest
+from pybitbucket.repository import Repository
+from pybitbucket.user import User
+
+
+class IdentityMapFixture(JsonSampleDataFixture):
+    # GIVEN: a class under test
+    class_under_test = 'PullRequest'
+
+    # GIVEN: a page of pull requests by the same author into one repository
+    @classmethod
+    def pullrequests(cls, client, count=3):
+        pullrequests = []
+        for n in range(1, count + 1):
+            data = json.loads(cls.resource_data())
+            data['id'] = n
+            pullrequests.append(client.convert_to_object(data))
+        return pullrequests
+
+    @classmethod
+    def user_data(cls):
+        return json.loads(cls.resource_data())['author']
+
+
+class TestSharingEmbeddedResources(IdentityMapFixture):
+    def test_the_same_author_is_one_object(self):
+        client = Client(FakeAuth(), identity_map=IdentityMap())
+        pullrequests = self.pullrequests(client)
+        assert all(isinstance(p, PullRequest) for p in pullrequests)
+        assert isinstance(pullrequests[0].author, User)
+        assert 1 == len(set(id(p.author) for p in pullrequests))
+        assert 1 == len(set(
+            id(p.destination_repository) for p in pullrequests))
+        assert isinstance(pullrequests[0].destination_repository, Repository)
+
+    def test_without_a_map_each_author_is_a_new_object(self):
+        pullrequests = self.pullrequests(Client(FakeAuth()))
+        assert 3 == len(set(id(p.author) for p in pullrequests))
+
+    def test_the_top_level_resources_are_not_shared(self):
+        client = Client(FakeAuth(), identity_map=IdentityMap())
+        data = json.loads(self.resource_data())
+        assert client.convert_to_object(data) is not \
+            client.convert_to_object(data)
+
+
+class TestResolving(IdentityMapFixture):
+    def test_other_data_is_another_object(self):
+        client = Client(FakeAuth(), identity_map=IdentityMap())
+        data = self.user_data()
+        user = client.convert_embedded(data)
+        data = self.user_data()
+        data['display_name'] = 'Someone else'
+        other = client.convert_embedded(data)
+        assert other is not user
+        assert 'Someone else' == other.display_name
+        assert other is client.convert_embedded(data)
+
+    def test_unused_resources_are_not_kept_alive(self):
+        identity_map = IdentityMap()
+        client = Client(FakeAuth(), identity_map=identity_map)
+        client.convert_embedded(self.user_data())
+        gc.collect()
+        client.convert_embedded(self.user_data())
+        assert 0 == identity_map.hits
+        assert 2 == identity_map.misses
+
+    def test_the_oldest_resources_are_forgotten(self):
+        identity_map = IdentityMap(max_size=2)
+        client = Client(FakeAuth(), identity_map=identity_map)
+        users = []
+        for username in ('a', 'b', 'c'):
+            data = self.user_data()
+            data['username'] = username
+            users.append(client.convert_embedded(data))
+        assert 2 == len(identity_map)
+        data = self.user_data()
+        data['username'] = 'a'
+        assert users[0] is not client.convert_embedded(data)
+        data['username'] = 'c'
+        assert users[2] is client.convert_embedded(data)
+
+
+class TestReleasingData(IdentityMapFixture):
+    def test_shared_resources_keep_their_data(self):
+        client = Client(FakeAuth(), identity_map=IdentityMap())
+        first, second = self.pullrequests(client, count=2)
+        client.release_data(first)
+        assert first.data is None
+        assert second.author is first.author
+        assert self.user_data() == second.author.data
+        assert second.author.username == first.author.username
+
+    def test_without_a_map_embedded_resources_are_released(self):
+        pullrequest = self.pullrequests(Client(FakeAuth()), count=1)[0]
+        Client.release_data(pullrequest)
+        assert pullrequest.author.data is None
+        assert pullrequest.author.username
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+from os import path
+import subprocess
+import sys
+
+import pybitbucket.bitbucket
+from pybitbucket.bitbucket import LegacyModule
+
+# Counts the requests sessions built while importing the library.
+COUNT_SESSIONS = '''
+import requests
+count = [0]
+init = requests.Session.__init__
+
+
+def counting(self, *args, **kwargs):
+    count[0] += 1
+    init(self, *args, **kwargs)
+
+
+requests.Session.__init__ = counting
+import pybitbucket.bitbucket
+import pybitbucket.build
+print(count[0])
+'''
+
+# Lists the modules loaded by importing the core of the library,
+# then by categorizing a repository.
+LOADED_MODULES = '''
+import json
+import sys
+from pybitbucket.bitbucket import Client
+print(' '.join(sorted(sys.modules)))
+with open('tests/Repository.json') as f:
+    resource = Client().convert_to_object(json.load(f))
+print(type(resource).__name__)
+print(' '.join(sorted(sys.modules)))
+'''
+
+# Lists the modules loaded by asking for some fields of the branches.
+FIELDS_MODULES = '''
+import sys
+from pybitbucket.bitbucket import Client
+print(Client.fields_expression(
+    ['target.hash'],
+    'https://api.bitbucket.org/2.0/repositories/a/b/refs/branches'))
+print(' '.join(sorted(sys.modules)))
+'''
+
+
+class TestImportingTheLibrary(object):
+    @classmethod
+    def setup_class(cls):
+        cls.project_dir = path.dirname(path.dirname(path.abspath(__file__)))
+
+    def test_no_session_is_built_at_import_time(self):
+        output = subprocess.check_output(
+            [sys.executable, '-c', COUNT_SESSIONS],
+            cwd=self.project_dir)
+        assert b'0' == output.strip()
+
+    def test_resource_modules_are_loaded_on_first_use(self):
+        output = subprocess.check_output(
+            [sys.executable, '-c', LOADED_MODULES],
+            cwd=self.project_dir).decode('utf-8').splitlines()
+        before = output[0].split()
+        after = output[2].split()
+        assert 'pybitbucket.repository' not in before
+        assert 'pybitbucket.pullrequest' not in before
+        assert 'requests_oauthlib' not in before
+        assert 'voluptuous' not in before
+        assert 'Repository' == output[1]
+        assert 'pybitbucket.repository' in after
+        assert 'pybitbucket.pullrequest' not in after
+
+    def test_fields_only_load_the_modules_of_the_resources_asked_for(self):
+        output = subprocess.check_output(
+            [sys.executable, '-c', FIELDS_MODULES],
+            cwd=self.project_dir).decode('utf-8').splitlines()
+        fields = output[0].split(',')
+        loaded = output[1].split()
+        assert 'values.name' in fields
+        assert 'values.full_name' in fields
+        assert 'values.target.hash' in fields
+        assert 'values.uuid' not in fields
+        assert 'pybitbucket.ref' in loaded
+        assert 'pybitbucket.repository' in loaded
+        assert 'pybitbucket.pullrequest' not in loaded
+        assert 'pybitbucket.hook' not in loaded
+
+    def test_resource_modules_can_be_imported_first(self):
+        subprocess.check_call(
+            [sys.executable, '-c', 'import pybitbucket.build'],
+            cwd=self.project_dir)
+
+    def test_resource_classes_are_read_before_python_3_7(self):
+        module = LegacyModule(sys.modules['pybitbucket.bitbucket'])
+        from pybitbucket.repository import Repository
+        assert Repository is module.Repository
+        assert pybitbucket.bitbucket.Client is module.Client
+        assert 'Snippet' in dir(module)
+        try:
+            module.Unknown
+            assert False
+        except AttributeError:
+            pass
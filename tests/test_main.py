@@ -1,4 +1,8 @@
 # -*- coding: utf-8 -*-
+import io
+import json
+
+import httpretty
 from pytest import raises
 
 # The parametrize function is generated, so this doesn't work:
@@ -9,6 +13,7 @@ import pytest
 
 from pybitbucket import metadata
 from pybitbucket.main import main
+from util import JsonSampleDataFixture
 
 parametrize = pytest.mark.parametrize
 
@@ -39,3 +44,111 @@ class TestMain(object):
             metadata.version)
         # Should exit with zero return code.
         assert exc_info.value.code == 0
+
+
+class CommandFixture(JsonSampleDataFixture):
+    # GIVEN: the API of a team with two repositories
+    api_url = 'https://api.bitbucket.org/2.0/repositories/teamsinspace'
+
+    @classmethod
+    def run(cls, *arguments):
+        out, err = io.StringIO(), io.StringIO()
+        status = main(['progname', '--jobs', '2'] + list(arguments), out, err)
+        return (
+            status,
+            [json.loads(line) for line in out.getvalue().splitlines()],
+            [json.loads(line) for line in err.getvalue().splitlines()])
+
+
+class TestCommands(CommandFixture):
+    def test_no_command_prints_the_epilog(self, capsys):
+        assert 0 == main(['progname'])
+        out, err = capsys.readouterr()
+        assert metadata.url in out
+
+    @httpretty.activate
+    def test_pullrequests_of_every_repository_are_lines(self):
+        for name in ('api', 'web'):
+            httpretty.register_uri(
+                httpretty.GET,
+                '{0}/{1}/pullrequests'.format(self.api_url, name),
+                content_type='application/json',
+                body=self.resource_list_data('PullRequest'),
+                status=200)
+        status, lines, errors = self.run(
+            '--pagelen', '50',
+            'pullrequests', 'teamsinspace/api', 'teamsinspace/web')
+        assert 0 == status
+        assert 2 == len(lines)
+        assert not errors
+        assert '50' == httpretty.last_request().querystring['pagelen'][0]
+
+    @httpretty.activate
+    def test_pullrequests_are_approved(self):
+        httpretty.register_uri(
+            httpretty.POST,
+            self.api_url + '/api/pullrequests/1/approve',
+            content_type='application/json',
+            body=self.resource_data('PullRequest.approve'),
+            status=200)
+        status, lines, errors = self.run('approve', 'teamsinspace/api#1')
+        assert 0 == status
+        assert [{'pullrequest': 'teamsinspace/api#1', 'approved': True}] == (
+            lines)
+
+    @httpretty.activate
+    def test_failures_are_error_lines(self):
+        httpretty.register_uri(
+            httpretty.POST,
+            self.api_url + '/api/pullrequests/1/approve',
+            content_type='application/json',
+            body=self.resource_data('PullRequest.approve'),
+            status=200)
+        httpretty.register_uri(
+            httpretty.POST,
+            self.api_url + '/web/pullrequests/2/approve',
+            status=404)
+        status, lines, errors = self.run(
+            'approve', 'teamsinspace/api#1', 'teamsinspace/web#2', 'web#3')
+        assert 1 == status
+        assert 1 == len(lines)
+        assert ['teamsinspace/web#2', 'web#3'] == sorted(
+            e['target'] for e in errors)
+
+    @httpretty.activate
+    def test_http_failure_is_an_error_line(self):
+        httpretty.register_uri(
+            httpretty.GET,
+            self.api_url + '/api/commits',
+            content_type='application/json',
+            body=json.dumps({'error': {'message': 'Something went wrong'}}),
+            status=500)
+        status, lines, errors = self.run('commits', 'teamsinspace/api')
+        assert 1 == status
+        assert not lines
+        assert ['progname'] == [e['target'] for e in errors]
+        assert '500' in errors[0]['error']
+
+    def test_unknown_pullrequest_state_is_refused(self, capsys):
+        with raises(SystemExit):
+            main(['progname', 'pullrequests', 'teamsinspace/api',
+                  '--state', 'SUPERSEDED'])
+
+    @httpretty.activate
+    def test_build_status_is_posted_on_every_revision(self):
+        for revision in ('abc123', 'def456'):
+            httpretty.register_uri(
+                httpretty.POST,
+                '{0}/api/commit/{1}/statuses/build'.format(
+                    self.api_url, revision),
+                content_type='application/json',
+                body=self.resource_data('BuildStatus'),
+                status=201)
+        status, lines, errors = self.run(
+            'build-status', 'teamsinspace/api', 'abc123', 'def456',
+            '--key', 'ci', '--state', 'SUCCESSFUL',
+            '--url', 'https://ci.example.com/1')
+        assert 0 == status
+        assert 2 == len(lines)
+        assert 'SUCCESSFUL' == json.loads(
+            httpretty.last_request().body.decode('utf-8'))['state']
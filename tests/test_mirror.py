@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+from test_bitbucketbase import BitbucketFixture
+from test_commitgraph import CommitGraphFixture
+import httpretty
+import json
+
+from pybitbucket.build import BuildStatus
+from pybitbucket.commit import Commit
+from pybitbucket.mirror import Mirror
+from pybitbucket.pullrequest import PullRequest
+from pybitbucket.ref import Branch, Tag
+from pybitbucket.repository import Repository
+
+
+class MirrorFixture(BitbucketFixture):
+    # GIVEN: the repository that the example resources belong to
+    full_name = 'MatthewTurk/snippet'
+
+    # GIVEN: an open pull request whose source commit has a failed build
+    @classmethod
+    def pullrequest_data(cls, pullrequest_id, state):
+        data = json.loads(cls.resource_data('PullRequest'))
+        data['id'] = pullrequest_id
+        data['state'] = state
+        data['source']['commit']['hash'] = '61d9e64348f9'
+        return data
+
+    @classmethod
+    def buildstatus_data(cls, key, state):
+        data = json.loads(cls.resource_data('BuildStatus'))
+        data['key'] = key
+        data['state'] = state
+        return data
+
+    @classmethod
+    def example_mirror(cls):
+        mirror = Mirror(client=cls.test_client)
+        mirror.upsert_repositories([
+            json.loads(cls.resource_data('Repository'))])
+        mirror.upsert_pullrequests(cls.full_name, [
+            PullRequest(
+                cls.pullrequest_data(1, 'OPEN'),
+                client=cls.test_client),
+            cls.pullrequest_data(2, 'MERGED')])
+        mirror.upsert_buildstatuses(cls.full_name, [
+            cls.buildstatus_data('BAMBOO-1', 'FAILED'),
+            cls.buildstatus_data('BAMBOO-2', 'SUCCESSFUL')])
+        mirror.upsert_commits(cls.full_name, [
+            json.loads(cls.resource_data('Commit'))])
+        mirror.upsert_refs(cls.full_name, [
+            json.loads(cls.resource_data('Branch'))])
+        return mirror
+
+
+class TestQueryingTheMirror(MirrorFixture):
+    @classmethod
+    def setup_class(cls):
+        cls.mirror = cls.example_mirror()
+
+    def test_repositories_are_repository_objects(self):
+        repositories = self.mirror.repositories(owner='teamsinspace')
+        assert 1 == len(repositories)
+        assert isinstance(repositories[0], Repository)
+        assert self.test_client is repositories[0].client
+
+    def test_pullrequests_are_filtered_by_state(self):
+        pullrequests = self.mirror.pullrequests(state='OPEN')
+        assert [1] == [p.id for p in pullrequests]
+        assert isinstance(pullrequests[0], PullRequest)
+
+    def test_upsert_replaces_existing_rows(self):
+        self.mirror.upsert_pullrequests(self.full_name, [
+            self.pullrequest_data(2, 'DECLINED')])
+        assert 2 == len(self.mirror.pullrequests(self.full_name))
+        assert [] == self.mirror.pullrequests(state='MERGED')
+
+    def test_commits_and_refs_are_resource_objects(self):
+        assert isinstance(self.mirror.commits()[0], Commit)
+        assert isinstance(self.mirror.refs(kind='branch')[0], Branch)
+
+    def test_failing_builds_on_open_pullrequests(self):
+        failing = self.mirror.failing_buildstatuses_on_open_pullrequests()
+        assert ['BAMBOO-1'] == [b.key for b in failing]
+        assert isinstance(failing[0], BuildStatus)
+
+
+class TestUsingTheMirrorAsASyncStore(MirrorFixture):
+    def test_watermarks_are_persisted(self):
+        mirror = Mirror(client=self.test_client)
+        assert mirror.get_watermark(self.full_name) is None
+        mirror.set_watermark(self.full_name, '2015-06-01T00:00:00+00:00')
+        mirror.set_watermark(self.full_name, '2015-06-02T00:00:00+00:00')
+        assert '2015-06-02T00:00:00+00:00' == \
+            mirror.get_watermark(self.full_name)
+
+    def test_upsert_stores_one_pullrequest(self):
+        mirror = Mirror(client=self.test_client)
+        mirror.upsert(self.full_name, PullRequest(
+            self.pullrequest_data(3, 'OPEN'),
+            client=self.test_client))
+        assert [3] == [p.id for p in mirror.pullrequests(self.full_name)]
+
+
+class TestMirroringStreamedResources(MirrorFixture):
+    # GIVEN: resources whose raw data was released by a streaming finder
+    @classmethod
+    def released(cls, resource):
+        return cls.test_client.release_data(resource)
+
+    def test_streamed_resources_are_stored_from_their_attributes(self):
+        mirror = Mirror(client=self.test_client)
+        mirror.upsert_pullrequests(self.full_name, [self.released(
+            PullRequest(
+                self.pullrequest_data(4, 'OPEN'),
+                client=self.test_client))])
+        mirror.upsert_buildstatuses(self.full_name, [self.released(
+            BuildStatus(
+                self.buildstatus_data('BAMBOO-3', 'FAILED'),
+                client=self.test_client))])
+        assert [4] == [p.id for p in mirror.pullrequests(state='OPEN')]
+        failing = mirror.failing_buildstatuses_on_open_pullrequests()
+        assert ['BAMBOO-3'] == [b.key for b in failing]
+
+    def test_build_statuses_without_a_commit_are_skipped(self):
+        mirror = Mirror(client=self.test_client)
+        data = self.buildstatus_data('BAMBOO-4', 'FAILED')
+        del data['links']['commit']
+        mirror.upsert_buildstatuses(self.full_name, [
+            data,
+            self.buildstatus_data('BAMBOO-5', 'FAILED')])
+        keys = [row[0] for row in mirror.connection.execute(
+            'SELECT key FROM build_statuses')]
+        assert ['BAMBOO-5'] == keys
+
+
+class TestRefreshingTheMirror(CommitGraphFixture):
+    @httpretty.activate
+    def test_commits_stop_at_those_already_mirrored(self):
+        self.register_pages()
+        mirror = Mirror(client=self.test_client)
+        mirror.upsert_commits(self.full_name, [
+            self.commit_data('d'),
+            self.commit_data('e')])
+        assert 3 == mirror.refresh_commits(self.full_name, branch='release')
+        assert ['a', 'b', 'c', 'd', 'e'] == sorted(
+            c.message for c in mirror.commits(self.full_name))
+
+    def test_the_kind_of_a_ref_is_its_class(self):
+        # GIVEN: refs read with partial fields, without their type
+        branch = json.loads(self.resource_data('Branch'))
+        del branch['type']
+        tag = json.loads(self.resource_data('Tag'))
+        del tag['type']
+        mirror = Mirror(client=self.test_client)
+        mirror.upsert_refs(self.full_name, [
+            branch,
+            Tag(tag, client=self.test_client)])
+        assert [branch['name']] == [
+            b.name for b in mirror.refs(self.full_name, kind='branch')]
+        assert [tag['name']] == [
+            t.name for t in mirror.refs(self.full_name, kind='tag')]
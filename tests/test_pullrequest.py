@@ -590,3 +590,55 @@ class TestCreatingFullPullRequestPayload(PullRequestPayloadFixture):
 
     def test_full_payload_structure(self):
         assert self.payload.validate().build() == self.expected
+
+
+class TestBuildingNestedPartsWithoutSharingThem(PullRequestPayloadFixture):
+    @classmethod
+    def setup_class(cls):
+        cls.with_source = cls.builder \
+            .add_source_branch_name(cls.source_branch_name) \
+            .add_reviewer_by_username(cls.reviewer)
+        cls.with_commit = cls.with_source \
+            .add_source_commit_by_hash('abc123') \
+            .add_reviewer_by_username('tpettersen')
+
+    def test_earlier_payload_is_unchanged(self):
+        assert {
+            'source': {'branch': {'name': self.source_branch_name}},
+            'reviewers': [{'username': self.reviewer}],
+        } == self.with_source.build()
+
+    def test_later_payload_has_both(self):
+        assert 'abc123' == self.with_commit.build()['source']['commit']['hash']
+        assert 2 == len(self.with_commit.build()['reviewers'])
+
+
+class TestCreatingFullPullRequestPayloadInABatch(PullRequestPayloadFixture):
+    @classmethod
+    def setup_class(cls):
+        cls.original = PullRequestPayload().add_title('REQUIRED title')
+        with cls.original.batch() as batch:
+            batch.add_source_branch_name('REQUIRED name') \
+                .add_source_repository_full_name('owner/repo_slug')
+            batch.add_destination_branch_name('name')
+            batch.add_destination_commit_by_hash('name')
+            batch.add_close_source_branch(True)
+            batch.add_description('description')
+            batch.add_reviewer_by_username('accountname')
+            batch.add_destination_repository_owner('owner')
+        cls.batch = batch
+        cls.expected = json.loads(cls.resource_data(
+            'PullRequestPayload.full'))
+
+    def test_batch_payload_matches_the_chained_one(self):
+        assert self.expected == self.batch.payload.validate().build()
+
+    def test_builder_attributes_are_kept(self):
+        assert 'owner' == self.batch.payload.destination_repository_owner
+
+    def test_original_is_unchanged(self):
+        assert {'title': 'REQUIRED title'} == self.original.build()
+
+    def test_frozen_payload_is_immutable_again(self):
+        self.batch.payload.add_reviewer_by_username('tpettersen')
+        assert 1 == len(self.batch.payload.build()['reviewers'])
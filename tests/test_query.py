@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+from test_bitbucketbase import BitbucketFixture
+from datetime import datetime
+
+import httpretty
+from uritemplate import expand
+from pybitbucket.bitbucket import Bitbucket
+from pybitbucket.pullrequest import PullRequest, PullRequestState
+from pybitbucket.query import QueryBuilder, QueryOperator
+from voluptuous import MultipleInvalid
+
+
+class QueryBuilderFixture(BitbucketFixture):
+    builder = QueryBuilder()
+
+    # GIVEN: Example attributes for a query
+    since = datetime(2017, 1, 1, 12, 30)
+    states = [PullRequestState.OPEN, PullRequestState.MERGED]
+
+
+class TestCreatingDefaultQuery(QueryBuilderFixture):
+    def test_default_query_is_empty(self):
+        assert {} == self.builder.validate().build()
+
+
+class TestAddingConditionsToQuery(QueryBuilderFixture):
+    @classmethod
+    def setup_class(cls):
+        cls.with_condition = cls.builder \
+            .add_condition('source.branch.name', '~', 'feature/') \
+            .add_updated_since(cls.since)
+
+    def test_immutability_on_adding_a_condition(self):
+        assert self.with_condition
+        assert {} == self.builder.build()
+
+    def test_conditions_are_joined_with_and(self):
+        expected = {
+            'q': (
+                'source.branch.name ~ "feature/" AND ' +
+                'updated_on > 2017-01-01T12:30:00')
+        }
+        assert expected == self.with_condition.validate().build()
+
+    def test_literals_are_formatted(self):
+        assert 'null' == QueryBuilder.format_value(None)
+        assert 'true' == QueryBuilder.format_value(True)
+        assert '42' == QueryBuilder.format_value(42)
+        assert '"say \\"hi\\""' == QueryBuilder.format_value('say "hi"')
+
+
+class TestAddingAlternativesToQuery(QueryBuilderFixture):
+    @classmethod
+    def setup_class(cls):
+        cls.with_alternatives = cls.builder \
+            .add_any_of('state', cls.states) \
+            .add_condition('author.username', QueryOperator.NOT_EQUAL, 'x')
+
+    def test_alternatives_are_grouped_with_or(self):
+        expected = {
+            'q': (
+                '(state = "OPEN" OR state = "MERGED") AND ' +
+                'author.username != "x"')
+        }
+        assert expected == self.with_alternatives.validate().build()
+
+
+class TestAddingSortToQuery(QueryBuilderFixture):
+    def test_sort_structure(self):
+        expected = {'sort': '-updated_on'}
+        assert expected == self.builder \
+            .add_sort('updated_on', descending=True) \
+            .validate() \
+            .build()
+
+
+class TestValidatingQuery(QueryBuilderFixture):
+    def test_unknown_operator_is_invalid(self):
+        try:
+            self.builder.add_condition('state', '==', 'OPEN')
+            assert False
+        except Exception as e:
+            assert isinstance(e, ValueError)
+
+    def test_malformed_field_is_invalid(self):
+        try:
+            self.builder \
+                .add_condition('state) OR (1', '=', 'OPEN') \
+                .validate()
+            assert False
+        except Exception as e:
+            assert isinstance(e, MultipleInvalid)
+
+    def test_malformed_sort_is_invalid(self):
+        try:
+            self.builder.add_sort('updated_on desc').validate()
+            assert False
+        except Exception as e:
+            assert isinstance(e, MultipleInvalid)
+
+
+class TestFindingPullRequestsWithQuery(QueryBuilderFixture):
+    class_under_test = 'PullRequest'
+
+    @classmethod
+    def setup_class(cls):
+        template = (
+            Bitbucket(client=cls.test_client)
+            .data
+            .get('_links', {})
+            .get('repositoryPullRequestsInState', {})
+            .get('href'))
+        cls.url = expand(
+            template, {
+                'owner': 'pybitbucket',
+                'repository_name': 'snippet',
+            })
+        cls.query = cls.builder \
+            .add_updated_since(cls.since) \
+            .add_sort('updated_on', descending=True)
+
+    @httpretty.activate
+    def test_query_is_sent_to_the_server(self):
+        httpretty.register_uri(
+            httpretty.GET,
+            self.url,
+            content_type='application/json',
+            body=self.resource_list_data(),
+            status=200)
+        response = PullRequest.find_pullrequests_for_repository_by_state(
+            repository_name='snippet',
+            owner='pybitbucket',
+            client=self.test_client,
+            **self.query.validate().build())
+        assert isinstance(next(response), PullRequest)
+        querystring = httpretty.last_request().querystring
+        assert ['updated_on > 2017-01-01T12:30:00'] == querystring['q']
+        assert ['-updated_on'] == querystring['sort']
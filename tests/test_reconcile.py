@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+from test_bitbucketbase import BitbucketFixture
+import json
+
+import httpretty
+from requests.exceptions import HTTPError
+from requests.models import Response
+from pybitbucket.branchrestriction import (
+    BranchRestrictionKind, BranchRestrictionPayload)
+from pybitbucket.hook import Hook, HookEvent, HookPayload
+from pybitbucket.reconcile import (
+    BranchRestrictionReconciler, CREATE, DELETE, HookReconciler, MODIFY,
+    RateLimit, Reconciler)
+
+
+class BranchRestrictionReconcilerFixture(BitbucketFixture):
+    # GIVEN: a repository with four branch restrictions
+    repository = 'ianbuchanan/example'
+
+    restrictions_url = (
+        'https://api.bitbucket.org' +
+        '/2.0/repositories/ianbuchanan/example/branch-restrictions')
+
+    @classmethod
+    def restriction_url(cls, restriction_id):
+        return '{0}/{1}'.format(cls.restrictions_url, restriction_id)
+
+    # GIVEN: the URL for creating a restriction with the test client
+    @classmethod
+    def create_url(cls):
+        return (
+            cls.test_client.get_bitbucket_url() +
+            '/2.0/repositories/ianbuchanan/example/branch-restrictions')
+
+    @classmethod
+    def register_responses(cls):
+        httpretty.register_uri(
+            httpretty.GET,
+            cls.restrictions_url,
+            content_type='application/json',
+            body=cls.resource_list_data('BranchRestriction'),
+            status=200)
+        httpretty.register_uri(
+            httpretty.POST,
+            cls.create_url(),
+            content_type='application/json',
+            body=cls.resource_data('BranchRestriction'),
+            status=201)
+        httpretty.register_uri(
+            httpretty.PUT,
+            cls.restriction_url(913350),
+            content_type='application/json',
+            body=cls.resource_data('BranchRestriction'),
+            status=200)
+        httpretty.register_uri(
+            httpretty.DELETE,
+            cls.restriction_url(913348),
+            status=204)
+
+    # GIVEN: a policy that keeps two restrictions, changes the users
+    # of a third, adds a fourth and leaves out the last one.
+    desired = [
+        BranchRestrictionPayload()
+        .add_kind(BranchRestrictionKind.PUSH)
+        .add_pattern('master')
+        .add_user_by_username('ianbuchanan'),
+        BranchRestrictionPayload()
+        .add_kind(BranchRestrictionKind.FORCE)
+        .add_pattern('bug/*'),
+        BranchRestrictionPayload()
+        .add_kind(BranchRestrictionKind.FORCE)
+        .add_pattern('feature/*')
+        .add_user_by_username('tpettersen'),
+        BranchRestrictionPayload()
+        .add_kind(BranchRestrictionKind.DELETE)
+        .add_pattern('master'),
+    ]
+
+    # httpretty records a request with a body twice, one after the other.
+    @staticmethod
+    def requests():
+        requests = []
+        for request in httpretty.latest_requests():
+            key = (request.method, request.path, request.body)
+            if not requests or requests[-1][0] != key:
+                requests.append((key, request))
+        return [request for (key, request) in requests]
+
+    @classmethod
+    def reconciler(cls, **kwargs):
+        return BranchRestrictionReconciler(
+            cls.desired,
+            client=cls.test_client,
+            **kwargs)
+
+
+class TestReconcilingBranchRestrictions(BranchRestrictionReconcilerFixture):
+    @httpretty.activate
+    def test_plan_has_only_the_differences(self):
+        self.register_responses()
+        changes = self.reconciler().plan(self.repository)
+        assert [
+            (MODIFY, ('force', 'feature/*')),
+            (CREATE, ('delete', 'master')),
+            (DELETE, ('delete', 'feature*')),
+        ] == [(c.action, c.key) for c in changes]
+
+    @httpretty.activate
+    def test_dry_run_only_lists_the_restrictions(self):
+        self.register_responses()
+        results = list(self.reconciler().reconcile(
+            [self.repository],
+            dry_run=True))
+        assert 1 == len(results)
+        assert not results[0].applied
+        assert 3 == len(results[0].changes)
+        assert ['GET'] == [r.method for r in self.requests()]
+
+    @httpretty.activate
+    def test_changes_are_applied_with_one_call_each(self):
+        self.register_responses()
+        reconciler = self.reconciler()
+        results = list(reconciler.reconcile([self.repository]))
+        assert results[0].applied
+        assert 0 <= results[0].seconds
+        assert not reconciler.errors
+        assert ['GET', 'PUT', 'POST', 'DELETE'] == [
+            r.method for r in self.requests()]
+        assert {
+            'kind': 'force',
+            'pattern': 'feature/*',
+            'users': [{'username': 'tpettersen'}],
+        } == json.loads(
+            self.requests()[1].body.decode('utf-8'))
+
+    @httpretty.activate
+    def test_restrictions_are_kept_without_prune(self):
+        self.register_responses()
+        changes = self.reconciler(prune=False).plan(self.repository)
+        assert DELETE not in [c.action for c in changes]
+
+    @httpretty.activate
+    def test_errors_are_isolated_per_repository(self):
+        self.register_responses()
+        httpretty.register_uri(
+            httpretty.GET,
+            self.restrictions_url.replace('example', 'missing'),
+            status=404)
+        reconciler = self.reconciler()
+        results = list(reconciler.reconcile(
+            [self.repository, 'ianbuchanan/missing'],
+            dry_run=True))
+        assert [self.repository] == [r.repository for r in results]
+        assert ['ianbuchanan/missing'] == [
+            e.repository for e in reconciler.errors]
+
+
+class HookReconcilerFixture(BranchRestrictionReconcilerFixture):
+    # GIVEN: a repository with six hooks
+    repository = 'atlassian/python-bitbucket'
+    hooks_url = (
+        'https://api.bitbucket.org' +
+        '/2.0/repositories/atlassian/python-bitbucket/hooks')
+    jira_url = (
+        'https://api.bitbucket.org/2.0/teams/atlassian/hooks/' +
+        '%7B09fb9f9f-ba7e-40e7-a08a-32320d6fe1af%7D')
+
+    @classmethod
+    def register_responses(cls):
+        httpretty.register_uri(
+            httpretty.GET,
+            cls.hooks_url,
+            content_type='application/json',
+            body=cls.resource_list_data('Hook'),
+            status=200)
+        httpretty.register_uri(
+            httpretty.POST,
+            cls.test_client.get_bitbucket_url() +
+            '/2.0/repositories/atlassian/python-bitbucket/hooks',
+            content_type='application/json',
+            body=cls.resource_data('Hook'),
+            status=201)
+        httpretty.register_uri(
+            httpretty.PUT,
+            cls.jira_url,
+            content_type='application/json',
+            body=cls.resource_data('Hook'),
+            status=200)
+
+    # GIVEN: a fleet policy that keeps one hook with its events reordered,
+    # changes the events of another, and adds a third.
+    desired = [
+        HookPayload()
+        .add_description('Request Bin')
+        .add_callback_url('http://requestb.in/zknmxgzk')
+        .add_events([
+            HookEvent.PULL_REQUEST_DECLINED,
+            HookEvent.PULL_REQUEST_MERGED,
+            HookEvent.PULL_REQUEST_APPROVAL_REMOVED]),
+        HookPayload()
+        .add_description('JIRA')
+        .add_callback_url(
+            'https://product-fabric.atlassian.net' +
+            '/rest/bitbucket/1.0/repository/webhook')
+        .add_events([HookEvent.PULL_REQUEST_CREATED]),
+        HookPayload()
+        .add_description('Continuous integration')
+        .add_callback_url('https://ci.example.com/hook')
+        .add_events([HookEvent.REPOSITORY_PUSH])
+        .activate(),
+    ]
+
+    @classmethod
+    def reconciler(cls, **kwargs):
+        return HookReconciler(cls.desired, client=cls.test_client, **kwargs)
+
+
+class TestReconcilingHooks(HookReconcilerFixture):
+    @httpretty.activate
+    def test_plan_has_only_the_differences(self):
+        self.register_responses()
+        plans = list(self.reconciler().plan_all([self.repository]))
+        assert [
+            (MODIFY, self.desired[1].build()['url']),
+            (CREATE, 'https://ci.example.com/hook'),
+        ] == [(c.action, c.key) for c in plans[0].changes]
+        assert not plans[0].applied
+
+    @httpretty.activate
+    def test_reviewed_plans_are_applied(self):
+        self.register_responses()
+        reconciler = self.reconciler()
+        plans = list(reconciler.plan_all([self.repository]))
+        results = list(reconciler.apply_all(plans))
+        assert [True] == [r.applied for r in results]
+        assert ['GET', 'PUT', 'POST'] == [
+            r.method for r in self.requests()]
+        assert ['pullrequest:created'] == json.loads(
+            self.requests()[1].body.decode('utf-8'))['events']
+
+    def test_fields_bitbucket_does_not_return_are_not_compared(self):
+        data = json.loads(self.resource_list_data('Hook'))['values'][0]
+        del data['skip_cert_verification']
+        hook = Hook(data, client=self.test_client)
+        payload = self.desired[0].disable_cert_verification()
+        reconciler = self.reconciler()
+        assert not reconciler.differs(hook, payload)
+        assert reconciler.differs(hook, payload.add_description('Other'))
+
+
+class TestDefiningAReconciler(object):
+    def test_missing_hooks_fail_at_construction(self):
+        class FindOnly(Reconciler):
+            def find(self, owner, repository_name):
+                return []
+        try:
+            FindOnly([])
+            assert False
+        except TypeError as e:
+            assert 'differs' in str(e)
+
+
+class TestLimitingTheRate(object):
+    # GIVEN: a call rejected as too many requests before it succeeds
+    @staticmethod
+    def rejected_once(retry_after=None):
+        response = Response()
+        response.status_code = 429
+        if retry_after:
+            response.headers['Retry-After'] = retry_after
+        calls = []
+
+        def call():
+            calls.append(1)
+            if len(calls) == 1:
+                raise HTTPError(response=response)
+            return len(calls)
+        return call
+
+    def test_retry_waits_as_long_as_bitbucket_asks(self):
+        waits = []
+        rate_limit = RateLimit(sleep=waits.append)
+        assert 2 == rate_limit.call(self.rejected_once('7'))
+        assert 1 == rate_limit.rejected
+        assert 1 == len(waits)
+        assert 6 < waits[0] <= 7
+
+    def test_retry_backs_off_without_retry_after(self):
+        waits = []
+        rate_limit = RateLimit(backoff=0.5, sleep=waits.append)
+        assert 2 == rate_limit.call(self.rejected_once())
+        assert 0 < waits[0] <= 0.5
+
+    def test_other_errors_are_raised(self):
+        rate_limit = RateLimit(retries=0)
+        try:
+            rate_limit.call(self.rejected_once())
+            assert False
+        except HTTPError:
+            pass
+
+    def test_calls_are_spaced(self):
+        waits = []
+        rate_limit = RateLimit(calls_per_second=10, sleep=waits.append)
+        for n in range(3):
+            rate_limit.call(lambda: n)
+        assert 2 == len(waits)
+        assert 0.1 < sum(waits) <= 0.3
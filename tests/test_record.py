@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+from test_bitbucketbase import BitbucketFixture
+import json
+
+import httpretty
+import pytest
+from pybitbucket.commit import Commit
+from pybitbucket.consumer import Consumer
+from pybitbucket.pullrequest import PullRequest
+from pybitbucket.record import Record, record_class
+
+
+class RecordFixture(BitbucketFixture):
+    # GIVEN: a class under test
+    class_under_test = 'PullRequest'
+
+    # GIVEN: the URL of a page of pull requests
+    url = (
+        'https://api.bitbucket.org' +
+        '/2.0/repositories/teamsinspace/api/pullrequests')
+
+    @classmethod
+    def records(cls):
+        httpretty.register_uri(
+            httpretty.GET,
+            cls.url,
+            content_type='application/json',
+            body=cls.resource_list_data(),
+            status=200)
+        return list(cls.test_client.remote_relationship(
+            cls.url, records=True))
+
+    # GIVEN: the memory kept by the objects made from a list fixture
+    @classmethod
+    def memory_kept(cls, name, convert):
+        # There is no tracemalloc before Python 3.4.
+        tracemalloc = pytest.importorskip('tracemalloc')
+        text = cls.resource_list_data(name)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [convert(value) for value in json.loads(text)['values']]
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert kept
+        return after - before
+
+
+class TestListingRecords(RecordFixture):
+    @httpretty.activate
+    def test_records_have_only_the_record_fields(self):
+        record = self.records()[0]
+        assert isinstance(record, Record)
+        assert not hasattr(record, '__dict__')
+        assert PullRequest.record_fields == tuple(record.attributes())
+        assert 'Update entrypoint handling' == record.title
+        assert 'MatthewTurk' == record.author['username']
+
+    @httpretty.activate
+    def test_only_the_record_fields_can_be_set(self):
+        record = self.records()[0]
+        record.title = 'Renamed'
+        assert 'Renamed' == record.title
+        with pytest.raises(AttributeError) as e:
+            record.watchers = []
+        message = '{0}'.format(e.value)
+        assert 'PullRequestRecord has no field watchers' in message
+        assert 'title' in message
+
+    @httpretty.activate
+    def test_relationships_are_bound_when_used(self):
+        record = self.records()[0]
+        assert 'commits' in record.relationships()
+        assert 'approve' not in record.relationships()
+        assert callable(record.commits)
+        try:
+            record.approve
+            assert False
+        except AttributeError:
+            pass
+
+    @httpretty.activate
+    def test_a_record_upgrades_to_a_resource(self):
+        resource = self.records()[0].to_resource()
+        assert isinstance(resource, PullRequest)
+        assert 'Update entrypoint handling' == resource.title
+        assert callable(resource.approve)
+
+    def test_the_record_class_is_made_once(self):
+        assert record_class(Commit) is record_class(Commit)
+        assert 'CommitRecord' == record_class(Commit).__name__
+
+    def test_types_without_record_fields_are_resources(self):
+        data = json.loads(self.resource_data('Consumer'))
+        assert isinstance(
+            self.test_client.convert_to_record(data), Consumer)
+        assert {} == self.test_client.convert_to_record({})
+
+
+class TestMemoryOfRecords(RecordFixture):
+    def test_records_keep_less_memory_than_resources(self):
+        for name in (
+                'BranchRestriction',
+                'Branch',
+                'Comment',
+                'Commit',
+                'Hook',
+                'PullRequest',
+                'Repository',
+                'Snippet',
+                'Tag',
+                'User'):
+            resources = self.memory_kept(
+                name, self.test_client.convert_to_object)
+            records = self.memory_kept(
+                name, self.test_client.convert_to_record)
+            assert records < resources, name
@@ -99,3 +99,63 @@ class TestRemoteRelationships(object):
         s = "%s" % snippet_list[0]
         assert s.startswith('Snippet id:')
         assert 5 == len(snippet_list)
+
+    @httpretty.activate
+    def test_partial_response_with_fields(self):
+        url = (
+            'https://' +
+            'api.bitbucket.org' +
+            '/2.0/repositories/teamsinspace')
+        example = '''{
+            "pagelen": 10,
+            "values": [{
+                "full_name": "teamsinspace/teamsinspace.bitbucket.org",
+                "updated_on": "2015-10-28T15:39:32.128045+00:00",
+                "links": {"self": {"href": "https://api.bitbucket.org/2.0/repositories/teamsinspace/teamsinspace.bitbucket.org"}}
+            }]
+        }'''  # noqa
+        httpretty.register_uri(
+            httpretty.GET,
+            url,
+            content_type='application/json',
+            body=example,
+            status=200)
+        repo_list = list(self.client.remote_relationship(
+            url,
+            fields=['full_name', 'updated_on']))
+        fields = httpretty.last_request().querystring['fields'][0]
+        assert 'values.updated_on' in fields.split(',')
+        assert 'values.links.self.href' in fields.split(',')
+        assert 'next' in fields.split(',')
+        s = "%s" % repo_list[0]
+        assert s.startswith('Repository full_name:')
+        assert '2015-10-28T15:39:32.128045+00:00' == repo_list[0].updated_on
+
+    def test_fields_expression_passes_strings_through(self):
+        assert '-values.owner' == Client.fields_expression('-values.owner')
+        assert Client.fields_expression(None) is None
+
+    @httpretty.activate
+    def test_streamed_items_do_not_retain_raw_data(self):
+        url = (
+            'https://' +
+            'api.bitbucket.org' +
+            '/2.0/repositories')
+        example = data_from_file(
+            self.test_dir,
+            'Repository_list.json')
+        httpretty.register_uri(
+            httpretty.GET,
+            url,
+            content_type='application/json',
+            body=example,
+            status=200)
+        repo_list = list(self.client.remote_relationship(url, stream=True))
+        assert 2 == len(repo_list)
+        assert repo_list[0].data is None
+        assert repo_list[0].owner.data is None
+        assert 'full_name' in repo_list[0].attributes()
+        assert 'self' in repo_list[0].relationships()
+        s = "%s" % repo_list[0]
+        assert s.startswith('Repository full_name:')
+        assert repr(repo_list[0]).startswith('Repository({')
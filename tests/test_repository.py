@@ -7,7 +7,7 @@ from uritemplate import expand
 from pybitbucket.repository import (
     RepositoryRole, RepositoryType, RepositoryForkPolicy,
     Repository, RepositoryV1,
-    RepositoryPayload)
+    RepositoryPayload, full_name_of, split_full_name)
 from pybitbucket.team import Team
 from pybitbucket.bitbucket import Bitbucket
 from pybitbucket.user import User
@@ -669,3 +669,19 @@ class TestCreatingFullRepositoryPayload(RepositoryPayloadFixture):
 
     def test_full_payload_structure(self):
         assert self.payload.validate().build() == self.expected
+
+
+class TestFullNames(RepositoryFixture):
+    def test_a_repository_or_its_full_name_is_split(self):
+        repository = self.example_object()
+        assert ['teamsinspace', 'teamsinspace.bitbucket.org'] == \
+            split_full_name(repository)
+        assert ['teamsinspace', 'api'] == split_full_name('teamsinspace/api')
+        assert 'teamsinspace/api' == full_name_of('teamsinspace/api')
+
+    def test_a_full_name_without_owner_is_refused(self):
+        try:
+            split_full_name('api')
+            assert False
+        except ValueError:
+            pass
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from test_bitbucketbase import BitbucketFixture
+import json
+
+import httpretty
+from pybitbucket.pullrequest import PullRequest
+from pybitbucket.sync import PullRequestStore, PullRequestSync
+
+
+class PullRequestSyncFixture(BitbucketFixture):
+    # GIVEN: a class under test
+    class_under_test = 'PullRequest'
+
+    # GIVEN: a repository with pull requests
+    full_name = 'atlassian/snippet'
+    url = (
+        'https://api.bitbucket.org/2.0/repositories/' +
+        full_name + '/pullrequests')
+
+    # GIVEN: a page of pull requests sorted by -updated_on
+    @classmethod
+    def page_data(cls, updates):
+        template = json.loads(cls.resource_data())
+        values = []
+        for pullrequest_id, updated_on in updates:
+            value = dict(template)
+            value['id'] = pullrequest_id
+            value['updated_on'] = updated_on
+            value['links'] = dict(template['links'])
+            value['links']['self'] = {'href': cls.url + '/{0}'.format(
+                pullrequest_id)}
+            values.append(value)
+        return json.dumps({'pagelen': 10, 'values': values})
+
+    updates = [
+        (3, '2015-06-03T10:00:00.000000+00:00'),
+        (2, '2015-06-02T10:00:00.000000+00:00'),
+        (1, '2015-06-01T10:00:00.000000+00:00'),
+    ]
+
+
+class TestSyncingForTheFirstTime(PullRequestSyncFixture):
+    @httpretty.activate
+    def test_every_pullrequest_is_a_change(self):
+        httpretty.register_uri(
+            httpretty.GET,
+            self.url,
+            content_type='application/json',
+            body=self.page_data(self.updates),
+            status=200)
+        store = PullRequestStore()
+        sync = PullRequestSync(client=self.test_client, store=store)
+        changes = list(sync.changes([self.full_name]))
+        assert [3, 2, 1] == [c.id for c in changes]
+        assert isinstance(changes[0], PullRequest)
+        assert 3 == len(store.pullrequests)
+        assert self.updates[0][1] == store.get_watermark(self.full_name)
+        querystring = httpretty.last_request().querystring
+        assert ['-updated_on'] == querystring['sort']
+        assert 'q' not in querystring
+        assert ['OPEN', 'MERGED', 'DECLINED'] == querystring['state']
+
+
+class TestSyncingAgain(PullRequestSyncFixture):
+    @httpretty.activate
+    def test_only_newer_pullrequests_are_changes(self):
+        newer = [(4, '2015-06-04T10:00:00.000000+00:00')] + self.updates
+        httpretty.register_uri(
+            httpretty.GET,
+            self.url,
+            content_type='application/json',
+            body=self.page_data(newer),
+            status=200)
+        store = PullRequestStore()
+        store.set_watermark(self.full_name, self.updates[0][1])
+        sync = PullRequestSync(client=self.test_client, store=store)
+        changes = list(sync.changes([self.full_name]))
+        assert [4] == [c.id for c in changes]
+        assert newer[0][1] == store.get_watermark(self.full_name)
+        querystring = httpretty.last_request().querystring
+        assert ['updated_on > 2015-06-03T10:00:00'] == querystring['q']
+
+    @httpretty.activate
+    def test_watermark_is_kept_when_nothing_changed(self):
+        httpretty.register_uri(
+            httpretty.GET,
+            self.url,
+            content_type='application/json',
+            body=self.page_data([]),
+            status=200)
+        store = PullRequestStore()
+        store.set_watermark(self.full_name, self.updates[0][1])
+        sync = PullRequestSync(client=self.test_client, store=store)
+        assert [] == list(sync.changes([self.full_name]))
+        assert self.updates[0][1] == store.get_watermark(self.full_name)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+from voluptuous import All, In, Length, MultipleInvalid, Optional, Required
+from voluptuous import Schema
+
+from pybitbucket.build import BuildStatusPayload, BuildStatusStates
+from pybitbucket.validation import FieldValidator, validator_for
+
+
+class ValidationFixture(object):
+    # GIVEN: a schema with required, optional and nested fields
+    schema = Schema({
+        Required('key'): All(str, Length(min=1)),
+        Required('state'): In(['INPROGRESS', 'SUCCESSFUL']),
+        Optional('tags'): [str],
+    })
+
+    @classmethod
+    def errors(cls, validate, payload):
+        try:
+            validate(payload)
+        except MultipleInvalid as e:
+            return sorted(str(error) for error in e.errors)
+        return []
+
+
+class TestValidatingFieldByField(ValidationFixture):
+    def test_errors_match_the_schema(self):
+        validator = FieldValidator(self.schema)
+        for payload in (
+                {'key': '', 'state': 'SUCCESSFUL'},
+                {'key': 'ci', 'state': 'DONE'},
+                {'key': 'ci'},
+                {'key': 'ci', 'state': 'SUCCESSFUL', 'extra': 1},
+                {'key': 'ci', 'state': 'SUCCESSFUL', 'tags': [1]}):
+            assert self.errors(self.schema, payload)
+            assert self.errors(self.schema, payload) == self.errors(
+                validator.validate, payload)
+
+    def test_valid_values_are_remembered(self):
+        validator = FieldValidator(self.schema)
+        validator.validate({'key': 'ci', 'state': 'SUCCESSFUL', 'tags': []})
+        assert ('key', (str, 'ci')) in validator.memo
+        assert 3 == len(validator.memo)
+
+    def test_memo_is_bounded(self):
+        validator = FieldValidator(self.schema, memo_size=3)
+        for n in range(5):
+            validator.validate({'key': str(n), 'state': 'SUCCESSFUL'})
+        assert 3 == len(validator.memo)
+        assert ('key', (str, '4')) in validator.memo
+
+    def test_trusted_payloads_only_check_the_fields(self):
+        validator = FieldValidator(self.schema)
+        validator.validate({'key': '', 'state': 'DONE'}, trusted=True)
+        assert self.errors(
+            lambda p: validator.validate(p, trusted=True),
+            {'key': 'ci'})
+
+    def test_other_schemas_are_run_in_full(self):
+        validator = FieldValidator(Schema([str]))
+        assert not validator.incremental
+        assert self.errors(validator.validate, [1])
+
+    def test_each_schema_is_compiled_once(self):
+        assert validator_for(self.schema) is validator_for(self.schema)
+
+
+class TestValidatingBuilders(object):
+    # GIVEN: a build status payload made with the add methods
+    payload = BuildStatusPayload() \
+        .add_key('ci') \
+        .add_state(BuildStatusStates.SUCCESSFUL) \
+        .add_url('https://ci.example.com/1')
+
+    def test_enum_values_are_remembered(self):
+        self.payload.validate()
+        assert (
+            'state', (BuildStatusStates, 'SUCCESSFUL')
+        ) in validator_for(BuildStatusPayload.schema).memo
+
+    def test_trusting_builders_skip_the_values(self):
+        trusted = self.payload.add_url('not a url').trusting()
+        assert trusted.validate() is trusted
+        try:
+            self.payload.add_url('not a url').validate()
+            assert False
+        except MultipleInvalid:
+            pass
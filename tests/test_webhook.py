@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+from test_bitbucketbase import BitbucketFixture
+from io import BytesIO
+from threading import Event
+
+
+from pybitbucket.hook import HookEvent
+from pybitbucket.ref import Branch
+from pybitbucket.repository import Repository
+from pybitbucket.user import User
+from pybitbucket.webhook import (
+    OverflowPolicy, WebhookDispatcher, WebhookReceiver,
+    WebhookRejectedError, parse_event)
+
+
+class WebhookFixture(BitbucketFixture):
+    # GIVEN: the body of a repo:push webhook request
+    @classmethod
+    def push_body(cls):
+        return cls.data_from_file('repoPush.json').encode('utf-8')
+
+    # GIVEN: a WSGI environment for a webhook request
+    @classmethod
+    def environ(cls, body, event_key='repo:push', method='POST'):
+        return {
+            'REQUEST_METHOD': method,
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': BytesIO(body),
+            'HTTP_X_EVENT_KEY': event_key,
+            'HTTP_X_REQUEST_UUID': 'afe5e7ac-fd37-4e7e-9e10-b2e7ae3ac7c6',
+        }
+
+
+class TestParsingAPushEvent(WebhookFixture):
+    @classmethod
+    def setup_class(cls):
+        cls.event = parse_event(
+            'repo:push',
+            cls.push_body(),
+            client=cls.test_client)
+
+    def test_event_key_is_a_hook_event(self):
+        assert HookEvent.REPOSITORY_PUSH == self.event.event
+        assert 'repo' == self.event.category
+
+    def test_actor_is_a_user(self):
+        assert isinstance(self.event.actor, User)
+        assert self.event.actor is self.event.actor
+
+    def test_repository_is_a_repository(self):
+        assert isinstance(self.event.repository, Repository)
+
+    def test_changes_have_branches(self):
+        change = self.event.changes()[0]
+        assert isinstance(change['new'], Branch)
+        assert isinstance(change['old'], Branch)
+
+    def test_missing_entity_is_an_attribute_error(self):
+        try:
+            self.event.pullrequest
+            assert False
+        except AttributeError:
+            pass
+
+    def test_unknown_event_key_is_invalid(self):
+        try:
+            parse_event('repo:unknown', self.push_body())
+            assert False
+        except ValueError:
+            pass
+
+
+class TestReceivingWebhooks(WebhookFixture):
+    @classmethod
+    def setup_class(cls):
+        cls.events = []
+        cls.receiver = WebhookReceiver(
+            cls.events.append,
+            client=cls.test_client)
+
+    def call(self, environ):
+        statuses = []
+        self.receiver(
+            environ,
+            lambda status, headers: statuses.append(status))
+        return statuses[0]
+
+    def test_valid_request_is_handled(self):
+        status = self.call(self.environ(self.push_body()))
+        assert '200 OK' == status
+        assert 'afe5e7ac-fd37-4e7e-9e10-b2e7ae3ac7c6' == \
+            self.events[-1].request_uuid
+
+    def test_unknown_event_is_a_bad_request(self):
+        status = self.call(self.environ(self.push_body(), 'repo:unknown'))
+        assert status.startswith('400')
+
+    def test_malformed_body_is_a_bad_request(self):
+        status = self.call(self.environ(b'[1, 2]'))
+        assert status.startswith('400')
+
+    def test_only_post_is_allowed(self):
+        status = self.call(self.environ(b'', method='GET'))
+        assert status.startswith('405')
+
+
+class TestDispatchingWebhooks(WebhookFixture):
+    def event(self, event_key='repo:push', request_uuid=None):
+        return parse_event(
+            event_key,
+            self.push_body(),
+            client=self.test_client,
+            request_uuid=request_uuid)
+
+    def test_events_are_routed_to_registered_handlers(self):
+        pushes = []
+        everything = []
+        dispatcher = WebhookDispatcher(workers=2)
+        dispatcher.register(pushes.append, HookEvent.REPOSITORY_PUSH)
+        dispatcher.register(everything.append)
+        dispatcher.start()
+        dispatcher.dispatch(self.event())
+        dispatcher.dispatch(self.event('repo:fork'))
+        dispatcher.stop()
+        assert [HookEvent.REPOSITORY_PUSH] == [e.event for e in pushes]
+        assert 2 == len(everything)
+        assert 1 == dispatcher.metrics[pushes.append].count
+
+    def test_redelivered_events_are_ignored(self):
+        handled = []
+        dispatcher = WebhookDispatcher(workers=1)
+        dispatcher.register(handled.append)
+        dispatcher.start()
+        assert dispatcher.dispatch(self.event(request_uuid='a'))
+        assert not dispatcher.dispatch(self.event(request_uuid='a'))
+        dispatcher.stop()
+        assert 1 == len(handled)
+        assert 1 == dispatcher.duplicates
+
+    def test_failing_handler_is_counted_and_does_not_stop_workers(self):
+        def fail(event):
+            raise RuntimeError('handler failed')
+        dispatcher = WebhookDispatcher(workers=1)
+        dispatcher.register(fail)
+        dispatcher.start()
+        dispatcher.dispatch(self.event())
+        dispatcher.dispatch(self.event())
+        dispatcher.stop()
+        metrics = dispatcher.metrics[fail].as_dict()
+        assert 2 == metrics['count']
+        assert 2 == metrics['errors']
+
+    def test_failing_handler_is_logged(self, caplog):
+        def fail(event):
+            raise RuntimeError('handler failed')
+        dispatcher = WebhookDispatcher()
+        dispatcher.register(fail)
+        dispatcher.handle(self.event(request_uuid='request-1'))
+        assert 1 == len(caplog.records)
+        assert 'repo:push request-1' in caplog.records[0].getMessage()
+        assert caplog.records[0].exc_info[0] is RuntimeError
+
+    def test_full_queue_drops_the_oldest_event(self):
+        handled = []
+        dispatcher = WebhookDispatcher(
+            workers=1,
+            queue_size=1,
+            overflow=OverflowPolicy.DROP_OLDEST)
+        dispatcher.register(handled.append)
+        dispatcher.dispatch(self.event(request_uuid='old'))
+        dispatcher.dispatch(self.event(request_uuid='new'))
+        dispatcher.start()
+        dispatcher.stop()
+        assert ['new'] == [e.request_uuid for e in handled]
+        assert 1 == dispatcher.dropped
+
+    def test_dropped_event_can_be_delivered_again(self):
+        handled = []
+        dispatcher = WebhookDispatcher(
+            workers=1,
+            queue_size=1,
+            overflow=OverflowPolicy.DROP_OLDEST)
+        dispatcher.register(handled.append)
+        dispatcher.dispatch(self.event(request_uuid='old'))
+        dispatcher.dispatch(self.event(request_uuid='new'))
+        dispatcher.start()
+        dispatcher.join()
+        assert dispatcher.dispatch(self.event(request_uuid='old'))
+        dispatcher.stop()
+        assert ['new', 'old'] == [e.request_uuid for e in handled]
+
+    def test_full_queue_rejects_with_service_unavailable(self):
+        dispatcher = WebhookDispatcher(
+            queue_size=1,
+            overflow=OverflowPolicy.REJECT)
+        dispatcher.dispatch(self.event(request_uuid='first'))
+        try:
+            dispatcher.dispatch(self.event(request_uuid='second'))
+            assert False
+        except WebhookRejectedError:
+            pass
+        receiver = WebhookReceiver(dispatcher, client=self.test_client)
+        statuses = []
+        receiver(
+            self.environ(self.push_body()),
+            lambda status, headers: statuses.append(status))
+        assert statuses[0].startswith('503')
+
+    def test_rejected_event_can_be_delivered_again(self):
+        handled = []
+        dispatcher = WebhookDispatcher(
+            workers=1,
+            queue_size=1,
+            overflow=OverflowPolicy.REJECT)
+        dispatcher.register(handled.append)
+        dispatcher.dispatch(self.event(request_uuid='first'))
+        try:
+            dispatcher.dispatch(self.event(request_uuid='second'))
+            assert False
+        except WebhookRejectedError:
+            pass
+        dispatcher.start()
+        dispatcher.join()
+        assert dispatcher.dispatch(self.event(request_uuid='second'))
+        dispatcher.stop()
+        assert ['first', 'second'] == [e.request_uuid for e in handled]
+        assert 0 == dispatcher.duplicates
+
+    def test_workers_are_bounded(self):
+        release = Event()
+        dispatcher = WebhookDispatcher(workers=2, queue_size=50)
+        dispatcher.register(lambda event: release.wait())
+        dispatcher.start()
+        for i in range(20):
+            dispatcher.dispatch(self.event(request_uuid=str(i)))
+        assert 2 == len(dispatcher.threads)
+        release.set()
+        dispatcher.stop()